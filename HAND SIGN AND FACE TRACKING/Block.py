@@ -1,13 +1,19 @@
 import cv2
+import math
 import mediapipe as mp
-import numpy as np
 import time
+from frame_state import HandFrame
+from hand_tracker import HandTracker
+from inference_backend import create_hand_backend
+from mjpeg_capture import open_camera
 
 class UltimateHandBlock:
-    def __init__(self):
+    def __init__(self, clock=time.time, max_hands=4):
+        # Jam bisa diganti (mis. ReplayClock) agar logika split bisa diputar ulang secara deterministik
+        self.clock = clock
         self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
-            max_num_hands=2,
+        self.hands = create_hand_backend(
+            max_num_hands=max_hands, # Lebih dari 2 agar beberapa orang bisa main bersamaan
             model_complexity=0, # Diatur ke 0 agar FPS bisa mencapai 60
             min_detection_confidence=0.7,
             min_tracking_confidence=0.7
@@ -15,121 +21,164 @@ class UltimateHandBlock:
         
         # Inisialisasi blok pertama
         self.blocks = [
-            {'pos': [540, 260], 'size': 150, 'color': (255, 150, 0), 'id': time.time()}
+            {'pos': [540, 260], 'size': 150, 'color': (255, 150, 0), 'id': self.clock()}
         ]
         self.last_split_time = 0
+        # ID track tangan yang stabil antar frame
+        self.tracker = HandTracker(max_distance=150, max_missed=5)
+        # State tangan per frame dipakai ulang, bukan list of dict baru setiap frame
+        self.frame = HandFrame(max_hands)
 
     def get_hand_data(self, results, w, h):
-        """Mengambil data ujung jari (4, 8, 12, 16, 20) dari kedua tangan"""
-        hands_data = []
-        if results.multi_hand_landmarks:
-            for hand_idx, hand_lms in enumerate(results.multi_hand_landmarks):
-                tips = []
-                for tid in [4, 8, 12, 16, 20]:
-                    lm = hand_lms.landmark[tid]
-                    tips.append((int(lm.x * w), int(lm.y * h)))
-                
-                # Hitung pusat tangan (rata-rata ujung jari)
-                avg_x = int(np.mean([p[0] for p in tips]))
-                avg_y = int(np.mean([p[1] for p in tips]))
-                
-                # Hitung tingkat 'kebukaan' tangan (jarak jempol ke kelingking)
-                span = np.hypot(tips[0][0] - tips[4][0], tips[0][1] - tips[4][1])
-                
-                hands_data.append({
-                    'tips': tips,
-                    'center': (avg_x, avg_y),
-                    'span': span
-                })
-        return hands_data
-
-    def run(self):
-        cap = cv2.VideoCapture(0)
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
-        cap.set(cv2.CAP_PROP_FPS, 60)
+        """Mengambil data ujung jari (4, 8, 12, 16, 20) dari setiap tangan
+
+        Hasilnya HandFrame milik objek ini yang ditimpa frame berikutnya; pakai .copy()
+        bila data perlu disimpan lebih lama.
+        """
+        return self.frame.fill(results, w, h)
+
+    def assign_tracks(self, hands_info):
+        """Beri ID track tetap ke setiap tangan; pusat tangan diganti pusat yang dihaluskan"""
+        tracks = self.tracker.update(hands_info.active_centers())
+        for hand, track in zip(hands_info, tracks):
+            hand.track = track
+            hand.center[:] = track.smoothed
+
+    def near_block(self, block, point, margin=50):
+        bx, by = block['pos']
+        bs = block['size']
+        return bx - margin < point[0] < bx + bs + margin and by - margin < point[1] < by + bs + margin
+
+    def update_blocks(self, hands_info):
+        """Logika manipulasi blok (scale, split, drag) dari data tangan satu frame
+
+        Setiap tangan (track) memegang paling banyak satu blok, jadi beberapa orang
+        bisa memanipulasi blok yang berbeda sekaligus. Pasangan yang memegang blok yang sama
+        tetap memegangnya selama titik tengah keduanya di sekitar blok (seperti versi awal),
+        jadi tangan boleh menjauh dari blok saat ditarik sampai SPLIT.
+        """
+        self.assign_tracks(hands_info)
+        blocks_by_id = {block['id']: block for block in self.blocks}
+
+        # Pasangan dari frame sebelumnya: dinilai dari titik tengah, bukan pusat tiap tangan
+        previous = {}
+        for hand in hands_info:
+            block_id = hand.track.state.get('block')
+            if block_id in blocks_by_id:
+                previous.setdefault(block_id, []).append(hand)
+        holders = {}
+        for block_id, group in previous.items():
+            if len(group) < 2:
+                continue
+            h1, h2 = sorted(group, key=lambda hand: hand.track.id)[:2]
+            mid_point = ((h1.center[0] + h2.center[0]) // 2, (h1.center[1] + h2.center[1]) // 2)
+            if self.near_block(blocks_by_id[block_id], mid_point):
+                holders[block_id] = [h1, h2]
+
+        # Tangan lain: pegang / lepas blok per track, kecuali blok yang sudah dipegang pasangan
+        pair_held = set(holders)
+        paired = {id(hand) for group in holders.values() for hand in group}
+        for hand in hands_info:
+            if id(hand) in paired:
+                continue
+            track = hand.track
+            held = blocks_by_id.get(track.state.get('block'))
+            if held is None or held['id'] in pair_held or not self.near_block(held, hand.center):
+                held = next((b for b in self.blocks
+                             if b['id'] not in pair_held and self.near_block(b, hand.center)), None)
+            track.state['block'] = held['id'] if held is not None else None
+            if held is not None:
+                holders.setdefault(held['id'], []).append(hand)
+
+        for block in list(self.blocks):
+            # Urutkan berdasarkan ID track, bukan urutan MediaPipe yang bisa tertukar
+            group = sorted(holders.get(block['id'], []), key=lambda hand: hand.track.id)
+
+            if len(group) >= 2:
+                h1, h2 = group[0], group[1]
+                x1, y1 = int(h1.center[0]), int(h1.center[1])
+                x2, y2 = int(h2.center[0]), int(h2.center[1])
+                # Jarak antara pusat kedua tangan
+                dist_between_hands = math.hypot(x1 - x2, y1 - y2)
+
+                # 1. SCALE: Ukuran blok mengikuti jarak kedua tangan
+                if dist_between_hands > 50:
+                    block['size'] = int(dist_between_hands * 0.7)
+                    # Update posisi agar tetap di tengah tangan (list pos diubah in-place)
+                    block['pos'][0] = (x1 + x2) // 2 - block['size']//2
+                    block['pos'][1] = (y1 + y2) // 2 - block['size']//2
+
+                # 2. SPLIT: Jika tangan merapat lalu tiba-tiba menjauh sangat cepat
+                if dist_between_hands > 500 and (self.clock() - self.last_split_time) > 1.5:
+                    new_block = block.copy()
+                    new_block['id'] = self.clock()
+                    new_block['pos'] = [x2, y2]
+                    self.blocks.append(new_block)
+                    self.last_split_time = self.clock()
+                    # Tangan kedua sekarang memegang blok hasil split
+                    h2.track.state['block'] = new_block['id']
+            
+            elif len(group) == 1:
+                # Drag sederhana dengan 1 tangan
+                h1 = group[0]
+                bs = block['size']
+                block['pos'][0] = int(h1.center[0]) - bs//2
+                block['pos'][1] = int(h1.center[1]) - bs//2
+
+    def draw_scene(self, img, blocks, hands_info, fps):
+        """Render blok, ujung jari dan UI ke frame"""
+        h = img.shape[0]
+        # Render Blok
+        for block in blocks:
+            cv2.rectangle(img, (block['pos'][0], block['pos'][1]), 
+                          (block['pos'][0] + block['size'], block['pos'][1] + block['size']), 
+                          block['color'], -1)
+            cv2.rectangle(img, (block['pos'][0], block['pos'][1]), 
+                          (block['pos'][0] + block['size'], block['pos'][1] + block['size']), 
+                          (255, 255, 255), 3)
+
+        # Render Jari + ID track
+        for hand in hands_info:
+            for x, y in hand.tips.tolist():
+                cv2.circle(img, (x, y), 10, (0, 255, 255), cv2.FILLED)
+            cv2.putText(img, f"#{hand.track.id}", (int(hand.center[0]), int(hand.center[1])),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+
+        cv2.putText(img, f"FPS: {int(fps)} | Blocks: {len(blocks)}", (10, 30), 
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+        cv2.putText(img, "Gunakan 2 TANGAN: Rapatkan/Renggangkan untuk SCALE | Tarik JAUH untuk SPLIT", 
+                    (10, h-20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+
+    def run(self, recorder=None, infer_reduce=1):
+        # MJPEG 1280x720@60, decode + mirror di thread pool; inferensi memakai frame 1/infer_reduce
+        # (default frame penuh; 2 lebih cepat, tapi landmark tangan jauh/kecil jadi lebih kasar)
+        cap = open_camera(0, 1280, 720, 60, reduce=infer_reduce, flip=True)
 
         p_time = 0
 
         while cap.isOpened():
-            success, img = cap.read()
+            success, img, small = cap.read_pair()
             if not success: break
-            img = cv2.flip(img, 1)
             h, w, _ = img.shape
-            results = self.hands.process(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+            results = self.hands.process(cv2.cvtColor(small, cv2.COLOR_BGR2RGB))
+            if recorder is not None:
+                recorder.record(self.clock(), results, frame_size=(w, h))
             
             hands_info = self.get_hand_data(results, w, h)
 
-            # Logika Manipulasi
-            if len(hands_info) == 2:
-                h1, h2 = hands_info[0], hands_info[1]
-                # Jarak antara pusat kedua tangan
-                dist_between_hands = np.hypot(h1['center'][0] - h2['center'][0], 
-                                              h1['center'][1] - h2['center'][1])
-                
-                mid_point = ((h1['center'][0] + h2['center'][0]) // 2, 
-                             (h1['center'][1] + h2['center'][1]) // 2)
-
-                for block in self.blocks:
-                    bx, by = block['pos']
-                    bs = block['size']
-                    
-                    # Cek apakah kedua tangan berada di sekitar blok
-                    if (bx - 50 < mid_point[0] < bx + bs + 50 and 
-                        by - 50 < mid_point[1] < by + bs + 50):
-                        
-                        # 1. SCALE: Ukuran blok mengikuti jarak kedua tangan
-                        if dist_between_hands > 50:
-                            block['size'] = int(dist_between_hands * 0.7)
-                            # Update posisi agar tetap di tengah tangan
-                            block['pos'] = [mid_point[0] - block['size']//2, 
-                                            mid_y := mid_point[1] - block['size']//2]
-
-                        # 2. SPLIT: Jika tangan merapat lalu tiba-tiba menjauh sangat cepat
-                        if dist_between_hands > 500 and (time.time() - self.last_split_time) > 1.5:
-                            new_block = block.copy()
-                            new_block['id'] = time.time()
-                            new_block['pos'] = [h2['center'][0], h2['center'][1]]
-                            self.blocks.append(new_block)
-                            self.last_split_time = time.time()
-                            break
-            
-            elif len(hands_info) == 1:
-                # Drag sederhana dengan 1 tangan (5 jari merapat)
-                h1 = hands_info[0]
-                for block in self.blocks:
-                    bx, by = block['pos']
-                    bs = block['size']
-                    if bx < h1['center'][0] < bx + bs and by < h1['center'][1] < by + bs:
-                        block['pos'] = [h1['center'][0] - bs//2, h1['center'][1] - bs//2]
-
-            # Render Blok
-            for block in self.blocks:
-                cv2.rectangle(img, (block['pos'][0], block['pos'][1]), 
-                              (block['pos'][0] + block['size'], block['pos'][1] + block['size']), 
-                              block['color'], -1)
-                cv2.rectangle(img, (block['pos'][0], block['pos'][1]), 
-                              (block['pos'][0] + block['size'], block['pos'][1] + block['size']), 
-                              (255, 255, 255), 3)
-
-            # Render 10 Jari
-            for hand in hands_info:
-                for tip in hand['tips']:
-                    cv2.circle(img, tip, 10, (0, 255, 255), cv2.FILLED)
+            self.update_blocks(hands_info)
 
             # FPS & UI
             c_time = time.time()
             fps = 1/(c_time-p_time) if c_time-p_time > 0 else 0
             p_time = c_time
-            cv2.putText(img, f"FPS: {int(fps)} | Blocks: {len(self.blocks)}", (10, 30), 
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-            cv2.putText(img, "Gunakan 2 TANGAN: Rapatkan/Renggangkan untuk SCALE | Tarik JAUH untuk SPLIT", 
-                        (10, h-20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+            self.draw_scene(img, self.blocks, hands_info, fps)
 
             cv2.imshow("10-Finger Master Manipulator", img)
             if cv2.waitKey(1) & 0xFF == 27: break
 
         cap.release()
+        print(cap.report())
         cv2.destroyAllWindows()
 
 if __name__ == "__main__":
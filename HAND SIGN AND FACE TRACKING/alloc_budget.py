@@ -0,0 +1,105 @@
+import argparse
+import gc
+import sys
+import tracemalloc
+
+import numpy as np
+
+from landmark_results import HAND_POINTS, HANDEDNESS_CODES, array_to_hands
+
+# Batas default per frame setelah warm-up (byte)
+PEAK_BUDGET = 16 * 1024     # alokasi sementara tertinggi dalam satu frame
+RETAINED_BUDGET = 4 * 1024  # pertumbuhan memori total selama seluruh pengukuran
+
+
+def synthetic_results(frames=120, hands=2, seed=0):
+    """Hasil tangan sintetis yang bergerak pelan, dibuat sebelum pengukuran lalu dipakai bergiliran"""
+    rng = np.random.default_rng(seed)
+    shape = rng.normal(0, 0.04, size=(hands, HAND_POINTS, 3)).astype(np.float32)
+    # Dua tangan di sekitar blok awal UltimateHandBlock supaya logika scale/drag ikut jalan
+    centers = np.array([[0.45, 0.45, 0.0], [0.55, 0.45, 0.0]], dtype=np.float32)[:hands]
+    handedness = np.array([HANDEDNESS_CODES['Left'], HANDEDNESS_CODES['Right']], dtype=np.int8)[:hands]
+    results = []
+    for i in range(frames):
+        drift = 0.05 * np.sin(2 * np.pi * i / frames)
+        landmarks = shape + centers[:, None, :] + np.float32(drift)
+        results.append(array_to_hands(landmarks, handedness, hands))
+    return results
+
+
+def measure(step, inputs, frames=500, warmup=100):
+    """Jalankan step(input) per frame; hasil (peak sementara per frame, pertumbuhan total, GC)
+
+    gc.collect() dijalankan sebelum warm-up, bukan sesudahnya: collect penuh mengosongkan
+    free list list/dict CPython, dan pengisian ulangnya akan terhitung sebagai "tumbuh".
+    """
+    gc.collect()
+    for i in range(warmup):
+        step(inputs[i % len(inputs)])
+    collections = sum(s['collections'] for s in gc.get_stats())
+
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    peak = 0
+    for i in range(frames):
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        step(inputs[(warmup + i) % len(inputs)])
+        _, frame_peak = tracemalloc.get_traced_memory()
+        peak = max(peak, frame_peak - before)
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    collections = sum(s['collections'] for s in gc.get_stats()) - collections
+    return peak, end - start, collections
+
+
+def block_step():
+    from Block import UltimateHandBlock
+    app = UltimateHandBlock()
+    w, h = 1280, 720
+
+    def step(results):
+        app.update_blocks(app.get_hand_data(results, w, h))
+    return step
+
+
+def cube_step():
+    from kegabutan import SpatialAutoCube
+    app = SpatialAutoCube()
+    img = np.zeros((app.H, app.W, 3), dtype=np.uint8)
+
+    def step(results):
+        app.update_state(app.get_hand_info(results))
+        pts2d = app.project_cube()
+        app.draw_3d_cube(img, pts2d, app.get_rainbow_color(app.curr_angle))
+    return step
+
+
+SCENES = {'block': block_step, 'cube': cube_step}
+
+
+def check(names, frames=500, peak_budget=PEAK_BUDGET, retained_budget=RETAINED_BUDGET):
+    """Cetak tabel alokasi per scene; False bila ada yang melewati budget"""
+    inputs = synthetic_results()
+    ok = True
+    print(f"{'scene':<8} {'peak/frame':>11} {'tumbuh':>9} {'GC':>5}  status")
+    for name in names:
+        peak, retained, collections = measure(SCENES[name](), inputs, frames)
+        passed = peak <= peak_budget and retained <= retained_budget
+        ok &= passed
+        print(f"{name:<8} {peak:>9} B {retained:>7} B {collections:>5}  {'OK' if passed else 'LEWAT BUDGET'}")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cek budget alokasi memori per frame (tracemalloc)")
+    parser.add_argument('scenes', nargs='*', help=f"pilihan: {', '.join(sorted(SCENES))} (default: semua)")
+    parser.add_argument('--frames', type=int, default=500)
+    parser.add_argument('--peak-budget', type=int, default=PEAK_BUDGET)
+    parser.add_argument('--retained-budget', type=int, default=RETAINED_BUDGET)
+    args = parser.parse_args()
+    unknown = set(args.scenes) - set(SCENES)
+    if unknown:
+        parser.error(f"scene tidak dikenal: {', '.join(sorted(unknown))}")
+    sys.exit(0 if check(args.scenes or sorted(SCENES), args.frames, args.peak_budget, args.retained_budget) else 1)
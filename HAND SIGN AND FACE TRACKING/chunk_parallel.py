@@ -0,0 +1,214 @@
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from landmark_results import HAND_POINTS, hands_to_array
+
+
+def plan_chunks(total, chunks, warmup):
+    """Bagi [0, total) jadi potongan (start, end, warm_start); warm_start = start - warmup
+
+    Frame warm-up diproses hanya supaya tracker (static_image_mode=False) sudah mengunci
+    tangan saat frame `start` tiba; hasilnya dibuang saat penyambungan.
+    """
+    chunks = max(1, min(chunks, total))
+    bounds = np.linspace(0, total, chunks + 1).round().astype(int)
+    return [(int(s), int(e), max(0, int(s) - warmup)) for s, e in zip(bounds[:-1], bounds[1:]) if e > s]
+
+
+def count_frames(path):
+    import cv2
+    cap = cv2.VideoCapture(path)
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    if total <= 0:
+        # Container tanpa jumlah frame: hitung dengan grab() (tanpa decode)
+        total = 0
+        while cap.grab():
+            total += 1
+    cap.release()
+    return total, fps, size
+
+
+def _open_at(path, index):
+    """VideoCapture yang frame berikutnya adalah `index` (seek, atau grab() bila seek tidak akurat)"""
+    import cv2
+    cap = cv2.VideoCapture(path)
+    if index and cap.set(cv2.CAP_PROP_POS_FRAMES, index) and int(cap.get(cv2.CAP_PROP_POS_FRAMES)) == index:
+        return cap
+    cap.release()
+    cap = cv2.VideoCapture(path)
+    for _ in range(index):
+        if not cap.grab():
+            break
+    return cap
+
+
+def process_chunk(path, start, end, warm_start, max_hands=2, model_complexity=0):
+    """Jalankan Hands pada frame [warm_start, end); kembalikan array hasil untuk [start, end)"""
+    import cv2
+    from inference_backend import create_hand_backend
+
+    t0 = time.perf_counter()
+    n = end - start
+    landmarks = np.zeros((n, max_hands, HAND_POINTS, 3), dtype=np.float32)
+    handedness = np.full((n, max_hands), -1, dtype=np.int8)
+    count = np.zeros(n, dtype=np.int32)
+    cap = _open_at(path, warm_start)
+    read = 0
+    with create_hand_backend('legacy', cache=False, static_image_mode=False, max_num_hands=max_hands,
+                             model_complexity=model_complexity) as hands:
+        for index in range(warm_start, end):
+            success, frame = cap.read()
+            if not success:
+                break
+            results = hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            if index >= start:
+                i = index - start
+                landmarks[i], handedness[i], count[i] = hands_to_array(results, max_hands)
+                read += 1
+    cap.release()
+    return start, read, landmarks[:read], handedness[:read], count[:read], time.perf_counter() - t0
+
+
+def _process_chunk(args):
+    return process_chunk(*args)
+
+
+class LandmarkStream:
+    """Hasil tangan per frame untuk satu video, berurutan"""
+
+    def __init__(self, landmarks, handedness, count, fps, frame_size=(0, 0)):
+        self.landmarks = landmarks
+        self.handedness = handedness
+        self.count = count
+        self.fps = fps
+        self.frame_size = frame_size
+
+    def __len__(self):
+        return len(self.count)
+
+    def save(self, path):
+        """Format .npz yang sama dengan SessionRecorder, bisa diputar ulang dengan session_replay"""
+        np.savez_compressed(path,
+                            timestamps=np.arange(len(self), dtype=np.float64) / self.fps,
+                            frame_size=np.asarray(self.frame_size, dtype=np.int32),
+                            hand_landmarks=self.landmarks, handedness=self.handedness,
+                            hand_count=self.count)
+
+
+def stitch(parts, total=None, max_hands=2):
+    """Sambung hasil per potongan menurut frame awal; potongan harus bersambung tanpa celah
+
+    Bila jumlah frame dari container kelebihan, video habis di tengah potongan dan potongan
+    sesudahnya mulai melewati akhir file tanpa membaca apa pun; potongan kosong itu dibuang.
+    """
+    joined = []
+    expected = 0
+    for part in sorted(parts, key=lambda p: p[0]):
+        start, read = part[0], part[1]
+        if start != expected:
+            if read == 0:
+                continue
+            raise ValueError(f"potongan tidak bersambung: frame {expected} diharapkan, dapat {start}")
+        joined.append(part)
+        expected = start + read
+    if total is not None and expected != total:
+        raise ValueError(f"hanya {expected} dari {total} frame yang terbaca")
+    if not joined:
+        return (np.zeros((0, max_hands, HAND_POINTS, 3), dtype=np.float32),
+                np.zeros((0, max_hands), dtype=np.int8), np.zeros(0, dtype=np.int32))
+    return (np.concatenate([p[2] for p in joined]), np.concatenate([p[3] for p in joined]),
+            np.concatenate([p[4] for p in joined]))
+
+
+def run_parallel(path, workers=4, chunks=None, warmup=15, max_hands=2, model_complexity=0):
+    """Proses satu video dengan process pool; hasil (LandmarkStream, detik, waktu per potongan)"""
+    total, fps, size = count_frames(path)
+    plan = plan_chunks(total, chunks or workers * 2, warmup if workers > 1 else 0)
+    jobs = [(path, s, e, w, max_hands, model_complexity) for s, e, w in plan]
+    t0 = time.perf_counter()
+    if workers == 1:
+        parts = [_process_chunk(job) for job in jobs]
+    else:
+        # spawn: proses anak tidak mewarisi state graph MediaPipe / thread milik induk
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            parts = list(pool.map(_process_chunk, jobs))
+    elapsed = time.perf_counter() - t0
+    # CAP_PROP_FRAME_COUNT hanya perkiraan untuk sebagian container; percayai jumlah yang terbaca
+    landmarks, handedness, count = stitch(parts, max_hands=max_hands)
+    return LandmarkStream(landmarks, handedness, count, fps, size), elapsed, [p[5] for p in parts]
+
+
+def compare_streams(reference, other, boundaries=(), window=5):
+    """Kesesuaian dua stream: persentase frame dengan jumlah tangan sama dan error landmark
+
+    Error dihitung per frame yang jumlah tangannya sama (dalam koordinat ternormalisasi);
+    `boundaries` (frame awal potongan) dipakai untuk melaporkan error di sekitar sambungan.
+    """
+    n = min(len(reference), len(other))
+    same = reference.count[:n] == other.count[:n]
+    mask = np.arange(reference.landmarks.shape[1])[None, :] < reference.count[:n, None]
+    mask &= same[:, None]
+    diff = np.linalg.norm(reference.landmarks[:n] - other.landmarks[:n], axis=3).mean(axis=2)
+    errors = diff[mask]
+    near = np.zeros(n, dtype=bool)
+    for b in boundaries:
+        near[max(0, b - window):min(n, b + window)] = True
+    near_errors = diff[mask & near[:, None]]
+    return {
+        'frames': n,
+        'length_match': len(reference) == len(other),
+        'count_match': float(same.mean()) if n else 1.0,
+        'mean_error': float(errors.mean()) if errors.size else 0.0,
+        'max_error': float(errors.max()) if errors.size else 0.0,
+        'boundary_error': float(near_errors.mean()) if near_errors.size else 0.0,
+    }
+
+
+def benchmark(path, workers=(2, 4), warmup=15, chunks_per_worker=2, max_hands=2,
+              tolerance=0.01, min_count_match=0.98):
+    """Speedup terhadap jumlah worker, divalidasi terhadap proses sekuensial satu potongan"""
+    reference, base, _ = run_parallel(path, 1, 1, 0, max_hands)
+    print(f"{len(reference)} frame, {os.cpu_count()} CPU, warm-up {warmup} frame")
+    print(f"{'worker':>6} {'detik':>7} {'FPS':>7} {'speedup':>8} {'cocok':>6} {'err':>8} "
+          f"{'err sambungan':>14} {'valid':>6}")
+    print(f"{1:>6} {base:>7.2f} {len(reference) / base:>7.1f} {1.0:>7.2f}x")
+    ok = True
+    for n in workers:
+        chunks = n * chunks_per_worker
+        stream, elapsed, _ = run_parallel(path, n, chunks, warmup, max_hands)
+        boundaries = [s for s, _, _ in plan_chunks(len(reference), chunks, warmup)[1:]]
+        result = compare_streams(reference, stream, boundaries)
+        valid = (result['length_match'] and result['count_match'] >= min_count_match
+                 and result['mean_error'] <= tolerance)
+        ok &= valid
+        print(f"{n:>6} {elapsed:>7.2f} {len(stream) / elapsed:>7.1f} {base / elapsed:>7.2f}x "
+              f"{result['count_match']:>6.1%} {result['mean_error']:>8.5f} "
+              f"{result['boundary_error']:>14.5f} {'ya' if valid else 'TIDAK':>6}")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Proses video rekaman secara paralel per potongan waktu")
+    parser.add_argument('video')
+    parser.add_argument('--workers', type=int, nargs='+', default=[2, 4])
+    parser.add_argument('--warmup', type=int, default=15, help="frame warm-up sebelum tiap potongan")
+    parser.add_argument('--chunks-per-worker', type=int, default=2)
+    parser.add_argument('--max-hands', type=int, default=2)
+    parser.add_argument('--output', help="simpan stream landmark (.npz) dengan worker terbanyak, tanpa benchmark")
+    args = parser.parse_args()
+
+    if args.output:
+        n = max(args.workers)
+        stream, elapsed, _ = run_parallel(args.video, n, n * args.chunks_per_worker, args.warmup, args.max_hands)
+        stream.save(args.output)
+        print(f"{len(stream)} frame dalam {elapsed:.2f} s ({n} worker) -> {args.output}")
+    elif not benchmark(args.video, args.workers, args.warmup, args.chunks_per_worker, args.max_hands):
+        raise SystemExit("hasil paralel berbeda dari proses sekuensial")
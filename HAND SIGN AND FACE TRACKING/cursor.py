@@ -1,30 +1,48 @@
 import cv2
 import mediapipe as mp
 import numpy as np
-import pyautogui
 import time
+from fast_drawing import LandmarkPainter
+from inference_backend import create_hand_backend
+from input_backend import create_input_backend
+from motion_gate import MotionGate, MotionGatedHands
+from latency_trace import LatencyTracer
+from pointer import PointerEngine
+from thread_scheduler import get_scheduler
 
 class HandScrollCursor:
     def __init__(self):
         self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
-            static_image_mode=False,
-            max_num_hands=1,
-            min_detection_confidence=0.7,
-            min_tracking_confidence=0.5
-        )
-        self.mp_drawing = mp.solutions.drawing_utils
+        # THREAD_CONFIG: batas pool thread dan afinitas CPU per stage
+        self.scheduler = get_scheduler().apply_process()
+        # Inferensi dilewati saat adegan diam dan tidak ada tangan yang dilacak
+        # (graph dibuat dengan afinitas inferensi agar thread internalnya tidak berebut core input)
+        with self.scheduler.scope('inference'):
+            self.hands = MotionGatedHands(create_hand_backend(
+                static_image_mode=False,
+                max_num_hands=1,
+                min_detection_confidence=0.7,
+                min_tracking_confidence=0.5
+            ), MotionGate(idle_after=10.0, idle_interval=0.2))
+        self.painter = LandmarkPainter()
         
         # Scroll parameters
         self.scroll_sensitivity = 15
         self.last_scroll_time = 0
         self.scroll_cooldown = 0.1  # seconds
         
+        # Trace ID per frame: capture -> inference -> gesture -> action
+        self.tracer = LatencyTracer()
+        
+        # Pointer/click/scroll output (INPUT_BACKEND: auto, xlib, uinput, pyautogui, fake)
+        self.input = create_input_backend()
+        
         # Cursor parameters
         self.cursor_active = False
-        self.screen_width, self.screen_height = pyautogui.size()
-        self.cursor_smoothing = 0.7
-        self.last_cursor_pos = None
+        self.screen_width, self.screen_height = self.input.size()
+        # Area aktif kamera -> layar penuh, Kalman + prediksi latensi, kurva akselerasi
+        self.pointer = PointerEngine((self.screen_width, self.screen_height),
+                                     active_region=(0.15, 0.15, 0.85, 0.85))
         
     def get_finger_state(self, hand_landmarks):
         """Check which fingers are extended"""
@@ -80,27 +98,19 @@ class HandScrollCursor:
         else:
             return "STOP"
     
-    def move_cursor(self, hand_landmarks, image_width, image_height):
+    def move_cursor(self, hand_landmarks, image_width, image_height, capture_time):
         """Move cursor based on hand position"""
         landmarks = hand_landmarks.landmark
         
         # Use index finger tip for cursor position
         index_tip = landmarks[8]
         
-        # Convert normalized coordinates to screen coordinates
-        cursor_x = int(index_tip.x * self.screen_width)
-        cursor_y = int(index_tip.y * self.screen_height)
-        
-        # Smooth cursor movement
-        if self.last_cursor_pos:
-            smooth_x = int(self.cursor_smoothing * cursor_x + (1 - self.cursor_smoothing) * self.last_cursor_pos[0])
-            smooth_y = int(self.cursor_smoothing * cursor_y + (1 - self.cursor_smoothing) * self.last_cursor_pos[1])
-        else:
-            smooth_x, smooth_y = cursor_x, cursor_y
+        # Predict where the fingertip is now (compensating capture -> dispatch latency)
+        cursor_x, cursor_y = self.pointer.update(index_tip.x, index_tip.y, capture_time)
         
-        # Move cursor
-        pyautogui.moveTo(smooth_x, smooth_y, duration=0.1)
-        self.last_cursor_pos = (smooth_x, smooth_y)
+        # Move cursor (no tween: the predictor already smooths the motion)
+        self.input.move(cursor_x, cursor_y)
+        self.tracer.action('move')
         
         return cursor_x, cursor_y
     
@@ -129,8 +139,10 @@ class HandScrollCursor:
             cv2.putText(image, "RIGHT CLICK", (cursor_x + 40, cursor_y + 10),
                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
     
-    def run(self):
+    def run(self, trace_path=None):
         cap = cv2.VideoCapture(0)
+        # Buffer kecil agar frame setelah jeda idle tidak basi
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
         
         print("🎯 ADVANCED HAND SCROLL + CURSOR CONTROLLER")
         print("📝 Gesture Mapping:")
@@ -146,16 +158,24 @@ class HandScrollCursor:
         cursor_x, cursor_y = 0, 0
         
         while cap.isOpened():
+            # Turunkan laju capture saat idle, langsung normal lagi begitu ada gerak
+            idle_wait = self.hands.gate.frame_interval()
+            if idle_wait:
+                time.sleep(idle_wait)
+            # Timestamp sebelum read(): tunggu frame + decode ikut dihitung sebagai latensi
+            capture_time = time.time()
             success, image = cap.read()
             if not success:
                 continue
+            self.tracer.begin_frame(capture_time)
             
             image = cv2.flip(image, 1)
             image_height, image_width, _ = image.shape
             image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
             image_rgb.flags.writeable = False
             
-            results = self.hands.process(image_rgb)
+            with self.tracer.span('inference'):
+                results = self.hands.process(image_rgb)
             
             image_rgb.flags.writeable = True
             image_bgr = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2BGR)
@@ -166,53 +186,71 @@ class HandScrollCursor:
             
             if results.multi_hand_landmarks:
                 for hand_landmarks in results.multi_hand_landmarks:
-                    self.mp_drawing.draw_landmarks(
-                        image_bgr, hand_landmarks, self.mp_hands.HAND_CONNECTIONS)
+                    self.painter.draw_hand(image_bgr, hand_landmarks, plain=True)
                     
-                    finger_states = self.get_finger_state(hand_landmarks)
-                    gesture = self.detect_gesture(finger_states)
+                    with self.tracer.span('gesture'):
+                        finger_states = self.get_finger_state(hand_landmarks)
+                        gesture = self.detect_gesture(finger_states)
                     current_gesture = gesture
                     
                     current_time = time.time()
                     
+                    # Pointer gestures resume from a fresh filter state, not the last target
+                    # before a scroll/stop (that gap would look like one huge, fast move)
+                    if gesture not in ("CURSOR", "CLICK", "RIGHT_CLICK"):
+                        self.pointer.reset()
+                    
                     # Handle different gestures
                     if gesture == "CURSOR":
-                        cursor_x, cursor_y = self.move_cursor(hand_landmarks, image_width, image_height)
+                        cursor_x, cursor_y = self.move_cursor(hand_landmarks, image_width, image_height, capture_time)
                         cursor_action = "🖱️ CURSOR MOVING"
                         self.draw_cursor_info(image_bgr, cursor_x, cursor_y, gesture)
                         
                     elif gesture == "CLICK":
                         # Move cursor first
-                        cursor_x, cursor_y = self.move_cursor(hand_landmarks, image_width, image_height)
+                        cursor_x, cursor_y = self.move_cursor(hand_landmarks, image_width, image_height, capture_time)
                         # Then click
-                        pyautogui.click()
+                        self.input.click()
+                        self.tracer.action('click')
                         cursor_action = "🖱️ CLICK"
                         self.draw_cursor_info(image_bgr, cursor_x, cursor_y, gesture)
                         time.sleep(0.3)  # Prevent multiple clicks
                         
                     elif gesture == "RIGHT_CLICK":
                         # Move cursor first
-                        cursor_x, cursor_y = self.move_cursor(hand_landmarks, image_width, image_height)
+                        cursor_x, cursor_y = self.move_cursor(hand_landmarks, image_width, image_height, capture_time)
                         # Then right click
-                        pyautogui.rightClick()
+                        self.input.click('right')
+                        self.tracer.action('right_click')
                         cursor_action = "🖱️ RIGHT CLICK"
                         self.draw_cursor_info(image_bgr, cursor_x, cursor_y, gesture)
                         time.sleep(0.3)  # Prevent multiple clicks
                         
                     elif gesture == "SCROLL_UP" and current_time - self.last_scroll_time > self.scroll_cooldown:
-                        pyautogui.scroll(3 * self.scroll_sensitivity)
+                        self.input.scroll(3 * self.scroll_sensitivity)
+                        self.tracer.action('scroll')
                         scroll_action = "🔼 SCROLL UP"
                         self.last_scroll_time = current_time
                         
                     elif gesture == "SCROLL_DOWN" and current_time - self.last_scroll_time > self.scroll_cooldown:
-                        pyautogui.scroll(-3 * self.scroll_sensitivity)
+                        self.input.scroll(-3 * self.scroll_sensitivity)
+                        self.tracer.action('scroll')
                         scroll_action = "🔽 SCROLL DOWN"
                         self.last_scroll_time = current_time
                         
                     elif gesture == "FAST_SCROLL" and current_time - self.last_scroll_time > self.scroll_cooldown:
-                        pyautogui.scroll(8 * self.scroll_sensitivity)
+                        self.input.scroll(8 * self.scroll_sensitivity)
+                        self.tracer.action('scroll')
                         scroll_action = "⚡ FAST SCROLL"
                         self.last_scroll_time = current_time
+            else:
+                # Hand lost: restart the predictor from the next detection
+                self.pointer.reset()
+            
+            # Active region mapped to the full screen
+            x0, y0, x1, y1 = self.pointer.active_region
+            cv2.rectangle(image_bgr, (int(x0 * image_width), int(y0 * image_height)),
+                         (int(x1 * image_width), int(y1 * image_height)), (255, 255, 0), 1)
             
             # Display information panel
             cv2.rectangle(image_bgr, (5, 5), (400, 160), (0, 0, 0), -1)
@@ -238,6 +276,10 @@ class HandScrollCursor:
             if cv2.waitKey(5) & 0xFF == ord('q'):
                 break
         
+        print(self.hands.gate.report())
+        print(self.tracer.summary())
+        if trace_path:
+            self.tracer.export_chrome(trace_path)
         cap.release()
         cv2.destroyAllWindows()
 
@@ -0,0 +1,413 @@
+import argparse
+import time
+
+import numpy as np
+
+from landmark_results import HAND_POINTS, landmarks_to_array
+
+PALM_IDS = [0, 5, 9, 13, 17]
+INDEX_TIP = 8
+
+
+class LandmarkHistory:
+    """Ring buffer landmark tangan (capacity, 21, 3) + timestamp, tanpa alokasi per push"""
+
+    def __init__(self, capacity=64):
+        self.capacity = capacity
+        self.frames = np.zeros((capacity, HAND_POINTS, 3), dtype=np.float32)
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.head = 0   # slot berikutnya yang ditulis
+        self.size = 0
+
+    def push(self, hand_landmarks, timestamp):
+        """hand_landmarks: LandmarkList MediaPipe atau array (21, 3)"""
+        if hasattr(hand_landmarks, 'landmark'):
+            landmarks_to_array(hand_landmarks, self.frames[self.head])
+        else:
+            self.frames[self.head] = hand_landmarks
+        self.timestamps[self.head] = timestamp
+        self.head = (self.head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def clear(self):
+        self.size = 0
+
+    def last(self, n):
+        """n frame terakhir berurutan waktu (salinan)"""
+        n = min(n, self.size)
+        idx = (self.head - n + np.arange(n)) % self.capacity
+        return self.frames[idx], self.timestamps[idx]
+
+
+def trajectory_features(frames, length=32):
+    """(n, 21, 3) -> (length, 4): lintasan pusat telapak + ujung telunjuk
+
+    Dikurangi rata-rata pusat telapak dan dibagi ukuran telapak rata-rata, jadi tidak
+    bergantung posisi tangan di frame maupun jarak ke kamera; di-resample ke panjang tetap
+    agar template dan query bisa dibandingkan dengan LB_Keogh.
+    """
+    palm = frames[:, PALM_IDS, :2].mean(axis=1)
+    tip = frames[:, INDEX_TIP, :2]
+    scale = np.linalg.norm(frames[:, 9, :2] - frames[:, 0, :2], axis=1).mean() + 1e-6
+    origin = palm.mean(axis=0)
+    feats = np.concatenate([palm - origin, tip - origin], axis=1) / scale
+    src = np.linspace(0.0, 1.0, len(feats))
+    dst = np.linspace(0.0, 1.0, length)
+    return np.stack([np.interp(dst, src, feats[:, d]) for d in range(feats.shape[1])], axis=1)
+
+
+def active_range(frames, gap=4, threshold=0.25):
+    """(awal, akhir) gerakan terakhir di jendela, atau None bila tangan diam seluruhnya
+
+    Gerak = pusat telapak berpindah > threshold (satuan ukuran telapak) dalam `gap` frame;
+    dibandingkan antar beberapa frame, bukan frame berurutan, agar noise deteksi tidak ikut.
+    Jeda diam lebih dari `gap` frame memisahkan gerakan, jadi sisa gerakan sebelumnya dan
+    tangan yang diam sebelum gerakan tidak ikut.
+    """
+    if len(frames) <= gap:
+        return None
+    palm = frames[:, PALM_IDS, :2].mean(axis=1)
+    scale = np.linalg.norm(frames[:, 9, :2] - frames[:, 0, :2], axis=1).mean() + 1e-6
+    moving = np.flatnonzero(np.linalg.norm(palm[gap:] - palm[:-gap], axis=1) > threshold * scale)
+    if len(moving) == 0:
+        return None
+    breaks = np.flatnonzero(np.diff(moving) > gap)
+    start = moving[breaks[-1] + 1] if len(breaks) else moving[0]
+    return int(start), int(moving[-1]) + gap + 1
+
+
+def envelope(series, band):
+    """Envelope atas/bawah (L, D) dengan jendela Sakoe-Chiba +-band"""
+    n = len(series)
+    upper = np.empty_like(series)
+    lower = np.empty_like(series)
+    for i in range(n):
+        window = series[max(0, i - band):i + band + 1]
+        upper[i] = window.max(axis=0)
+        lower[i] = window.min(axis=0)
+    return upper, lower
+
+
+def dtw_distance(a, b, band, best=np.inf):
+    """DTW (jarak Euclid kuadrat per langkah) dengan band dan early abandoning terhadap `best`"""
+    n = len(a)
+    cost = ((a[:, None, :] - b[None, :, :]) ** 2).sum(axis=2).tolist()
+    inf = float('inf')
+    prev = [inf] * (n + 1)
+    prev[0] = 0.0
+    for i in range(1, n + 1):
+        curr = [inf] * (n + 1)
+        row = cost[i - 1]
+        lo, hi = max(1, i - band), min(n, i + band)
+        row_min = inf
+        for j in range(lo, hi + 1):
+            d = prev[j - 1]
+            if prev[j] < d:
+                d = prev[j]
+            if curr[j - 1] < d:
+                d = curr[j - 1]
+            d += row[j - 1]
+            curr[j] = d
+            if d < row_min:
+                row_min = d
+        if row_min >= best:
+            return inf
+        prev = curr
+    return prev[n]
+
+
+class TemplateLibrary:
+    """Kumpulan template gerakan; LB_Keogh semua template dihitung sekaligus (vektor)"""
+
+    def __init__(self, length=32, band=4):
+        self.length = length
+        self.band = band
+        self.names = []
+        self.features = np.zeros((0, length, 4))
+        self.upper = np.zeros((0, length, 4))
+        self.lower = np.zeros((0, length, 4))
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, name, frames):
+        """Tambah template dari rekaman landmark (n, 21, 3)"""
+        self.add_features(name, trajectory_features(np.asarray(frames, dtype=np.float32), self.length))
+
+    def add_features(self, name, feats):
+        upper, lower = envelope(feats, self.band)
+        self.names.append(name)
+        self.features = np.concatenate([self.features, feats[None]])
+        self.upper = np.concatenate([self.upper, upper[None]])
+        self.lower = np.concatenate([self.lower, lower[None]])
+
+    def lower_bounds(self, query):
+        """LB_Keogh query terhadap envelope setiap template, (T,)"""
+        above = np.clip(query[None] - self.upper, 0, None)
+        below = np.clip(self.lower - query[None], 0, None)
+        return (above ** 2 + below ** 2).sum(axis=(1, 2))
+
+    def match(self, query, max_distance=np.inf, prune=True):
+        """Template terdekat: (nama, jarak, jumlah DTW yang benar-benar dihitung)"""
+        best, best_idx, computed = max_distance, -1, 0
+        if prune:
+            bounds = self.lower_bounds(query)
+            order = np.argsort(bounds)
+        else:
+            bounds, order = None, range(len(self.names))
+        for idx in order:
+            # Template diurutkan menurut lower bound: begitu LB >= jarak terbaik, sisanya pasti kalah
+            if prune and bounds[idx] >= best:
+                break
+            dist = dtw_distance(query, self.features[idx], self.band, best if prune else np.inf)
+            computed += 1
+            if dist < best:
+                best, best_idx = dist, idx
+        if best_idx < 0:
+            return None, np.inf, computed
+        return self.names[best_idx], best, computed
+
+    def save(self, path):
+        np.savez_compressed(path, names=np.array(self.names), features=self.features,
+                            length=self.length, band=self.band)
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        library = cls(int(data['length']), int(data['band']))
+        for name, feats in zip(data['names'].tolist(), data['features']):
+            library.add_features(name, feats)
+        return library
+
+
+def synthetic_motion(kind, frames=30, rng=None, noise=0.003):
+    """Landmark sintetis: bentuk tangan tetap yang digerakkan sepanjang lintasan gerakan"""
+    rng = rng or np.random.default_rng()
+    shape = np.zeros((HAND_POINTS, 3), dtype=np.float32)
+    shape[:, 0] = np.linspace(-0.04, 0.04, HAND_POINTS)
+    shape[:, 1] = -np.linspace(0.0, 0.15, HAND_POINTS)
+    shape[9, :2] = (0.0, -0.08)
+    t = np.linspace(0.0, 1.0, frames)
+    amp = rng.uniform(0.12, 0.2)
+    paths = {
+        'SWIPE_LEFT': np.stack([0.5 + amp - 2 * amp * t, 0.5 + 0 * t], axis=1),
+        'SWIPE_RIGHT': np.stack([0.5 - amp + 2 * amp * t, 0.5 + 0 * t], axis=1),
+        'SWIPE_UP': np.stack([0.5 + 0 * t, 0.5 + amp - 2 * amp * t], axis=1),
+        'SWIPE_DOWN': np.stack([0.5 + 0 * t, 0.5 - amp + 2 * amp * t], axis=1),
+        'WAVE': np.stack([0.5 + 0.6 * amp * np.sin(2 * np.pi * 2 * t), 0.5 + 0 * t], axis=1),
+        'CIRCLE': np.stack([0.5 + amp * np.cos(2 * np.pi * t), 0.5 + amp * np.sin(2 * np.pi * t)], axis=1),
+    }
+    path = paths[kind]
+    out = np.repeat(shape[None], frames, axis=0)
+    out[:, :, :2] += path[:, None, :]
+    out[:, :, :2] += rng.normal(0, noise, size=(frames, 1, 2))
+    return out
+
+
+MOTIONS = ('SWIPE_LEFT', 'SWIPE_RIGHT', 'SWIPE_UP', 'SWIPE_DOWN', 'WAVE', 'CIRCLE')
+
+
+def synthetic_stream(kinds, rng, idle=(10, 40), frames=30, noise=0.003):
+    """Rekaman kontinu: tangan diam, gerakan, diam lagi, ... -> (landmark, [(awal, akhir, jenis)])"""
+    parts, segments, cursor = [], [], 0
+    for kind in kinds:
+        motion = synthetic_motion(kind, frames, rng, noise)
+        before = int(rng.integers(*idle))
+        # Diam = pose awal gerakan ditahan, hanya noise deteksi
+        still = np.repeat(motion[:1], before, axis=0)
+        still[:, :, :2] += rng.normal(0, noise, size=(before, 1, 2))
+        parts += [still, motion]
+        segments.append((cursor + before, cursor + before + frames, kind))
+        cursor += before + frames
+    tail = np.repeat(parts[-1][-1:], idle[1], axis=0)
+    tail[:, :, :2] += rng.normal(0, noise, size=(idle[1], 1, 2))
+    parts.append(tail)
+    return np.concatenate(parts).astype(np.float32), segments
+
+
+def default_library(per_motion=3, seed=0, length=32, band=4):
+    """Library bawaan dari lintasan sintetis; ganti/tambah dengan rekaman asli via add()"""
+    rng = np.random.default_rng(seed)
+    library = TemplateLibrary(length, band)
+    for kind in MOTIONS:
+        for _ in range(per_motion):
+            library.add(kind, synthetic_motion(kind, int(rng.integers(20, 40)), rng))
+    return library
+
+
+class DynamicGestureRecognizer:
+    """Cocokkan beberapa jendela landmark terakhir ke library setiap frame
+
+    Hanya gerakan terakhir di jendela yang dicocokkan (active_range), jadi tangan yang diam
+    sebelum gerakan tidak ikut membentuk lintasan. Kecocokan tidak langsung dilaporkan:
+    kandidat disimpan dan diganti kecocokan dari bagian gerak yang lebih panjang (mis.
+    awal lingkaran yang mirip swipe diganti CIRCLE), lalu dilaporkan sekali saat tangan
+    berhenti. Setelah itu pencocokan menunggu tangan diam dulu, jadi sisa gerakan yang
+    sama tidak terdeteksi lagi.
+    """
+
+    def __init__(self, library=None, windows=(16, 24, 32), max_distance=20.0,
+                 min_motion=1.5, cooldown=1.0, idle_threshold=0.25, settle=4):
+        self.library = library if library is not None else default_library()
+        self.history = LandmarkHistory(max(windows) * 2)
+        self.windows = windows
+        self.max_distance = max_distance      # jarak DTW maksimum agar dianggap cocok
+        self.min_motion = min_motion          # panjang lintasan minimum (satuan ukuran telapak)
+        self.cooldown = cooldown
+        self.idle_threshold = idle_threshold  # perpindahan telapak per 4 frame yang dianggap gerak
+        self.settle = settle                  # frame diam berturut-turut = gerakan selesai
+        self.min_frames = min(windows) // 2   # bagian gerak terpendek yang dicocokkan
+        self.last_match_time = -np.inf
+        self.last_match = None
+        self._pending = None                  # (panjang bagian gerak, jarak, nama)
+        self._full_frames = 0                 # frame sejak kandidat mengisi jendela terpanjang
+        self._consumed = False                # gerakan sudah dilaporkan, tunggu tangan diam
+
+    def reset(self):
+        self.history.clear()
+        self._pending = None
+        self._full_frames = 0
+        self._consumed = False
+
+    def _best_match(self):
+        """Kecocokan dari bagian gerak terpanjang di antara jendela: (panjang, jarak, nama) atau None"""
+        best = None
+        for n in self.windows:
+            if self.history.size < n:
+                break
+            frames, _ = self.history.last(n)
+            span = active_range(frames, threshold=self.idle_threshold)
+            if span is None or span[1] - span[0] < self.min_frames:
+                continue
+            query = trajectory_features(frames[span[0]:span[1]], self.library.length)
+            if np.linalg.norm(np.diff(query[:, :2], axis=0), axis=1).sum() < self.min_motion:
+                continue
+            length = span[1] - span[0]
+            name, dist, _ = self.library.match(query, self.max_distance)
+            if name is not None and (best is None or (length, -dist) > (best[0], -best[1])):
+                best = (length, dist, name)
+        return best
+
+    def _settled(self):
+        """True bila `settle` frame terakhir tidak ada gerak"""
+        n = min(self.history.size, min(self.windows))
+        if n < self.settle + 4:
+            return False
+        frames, _ = self.history.last(n)
+        span = active_range(frames, threshold=self.idle_threshold)
+        return span is None or span[1] <= n - self.settle
+
+    def update(self, hand_landmarks, timestamp):
+        """Tambahkan frame; hasil nama gerakan saat terdeteksi, selain itu None"""
+        self.history.push(hand_landmarks, timestamp)
+        # Dicek juga selama cooldown, supaya gerakan berikutnya tidak dianggap sisa gerakan ini
+        if self._consumed and self._settled():
+            self._consumed = False
+        if self._consumed or timestamp - self.last_match_time < self.cooldown:
+            return None
+        longest = max(self.windows)
+        match = self._best_match()
+        # Bagian gerak yang lebih panjang menang atas kandidat dari bagian yang lebih pendek
+        if match is not None and (self._pending is None or match[0] >= self._pending[0]):
+            self._pending = match
+        if self._pending is None:
+            return None
+        if self._pending[0] >= longest:
+            self._full_frames += 1
+        # Lapor saat tangan berhenti; gerakan tanpa henti dilaporkan setelah satu jendela penuh lagi
+        if not self._settled() and self._full_frames < longest:
+            return None
+        name = self._pending[2]
+        self._pending = None
+        self._full_frames = 0
+        self._consumed = True
+        self.last_match_time = timestamp
+        self.last_match = name
+        # Gerakan yang sama jangan terdeteksi dua kali dari frame yang tumpang tindih
+        self.history.clear()
+        return name
+
+
+def benchmark(template_counts=(10, 50, 100, 200, 500), queries=200, seed=1):
+    """Match/detik dan rasio pruning terhadap jumlah template, dibanding DTW tanpa pruning"""
+    rng = np.random.default_rng(seed)
+    query_feats = [trajectory_features(synthetic_motion(MOTIONS[i % len(MOTIONS)], 30, rng))
+                   for i in range(queries)]
+    print(f"{'template':>9} {'match/s':>9} {'DTW/query':>10} {'tanpa prune/s':>14} {'akurasi':>8}")
+    for count in template_counts:
+        library = TemplateLibrary()
+        for i in range(count):
+            kind = MOTIONS[i % len(MOTIONS)]
+            library.add(kind, synthetic_motion(kind, int(rng.integers(20, 40)), rng))
+
+        t0 = time.perf_counter()
+        computed, correct = 0, 0
+        for i, q in enumerate(query_feats):
+            name, _, n = library.match(q)
+            computed += n
+            correct += name == MOTIONS[i % len(MOTIONS)]
+        pruned_rate = queries / (time.perf_counter() - t0)
+
+        brute_queries = query_feats[:max(1, queries * 20 // count)]
+        t0 = time.perf_counter()
+        for q in brute_queries:
+            library.match(q, prune=False)
+        brute_rate = len(brute_queries) / (time.perf_counter() - t0)
+
+        print(f"{count:>9} {pruned_rate:>9.0f} {computed / queries:>10.1f} {brute_rate:>14.0f} "
+              f"{correct / queries:>8.0%}")
+
+
+def stream_benchmark(sequences=60, fps=30.0, seed=2, length=30):
+    """Rekaman kontinu lewat DynamicGestureRecognizer.update(), bukan query yang sudah dipotong
+
+    Setiap gerakan (`length` frame) harus terdeteksi tepat sekali dengan nama yang benar,
+    di antara awal gerakan itu dan awal gerakan berikutnya. Hasil: (benar, salah, ganda, terlewat).
+    """
+    rng = np.random.default_rng(seed)
+    kinds = [MOTIONS[i % len(MOTIONS)] for i in range(sequences)]
+    frames, segments = synthetic_stream(kinds, rng, frames=length)
+    recognizer = DynamicGestureRecognizer()
+    detections = []
+    t0 = time.perf_counter()
+    for i, landmarks in enumerate(frames):
+        name = recognizer.update(landmarks, i / fps)
+        if name is not None:
+            detections.append((i, name))
+    per_frame = (time.perf_counter() - t0) / len(frames) * 1e6
+
+    correct = wrong = double = missed = 0
+    delays = []
+    confusion = {}
+    for k, (start, end, kind) in enumerate(segments):
+        until = segments[k + 1][0] if k + 1 < len(segments) else len(frames)
+        hits = [(i, name) for i, name in detections if start <= i < until]
+        if not hits:
+            missed += 1
+            continue
+        double += len(hits) - 1
+        if hits[0][1] == kind:
+            correct += 1
+            delays.append(hits[0][0] - end)
+        else:
+            wrong += 1
+            confusion[(kind, hits[0][1])] = confusion.get((kind, hits[0][1]), 0) + 1
+    early = sum(1 for i, _ in detections if i < segments[0][0])
+    print(f"Stream {len(frames)} frame, {sequences} gerakan @ {length} frame, {per_frame:.0f} us/frame: benar {correct}, "
+          f"salah {wrong}, ganda {double}, terlewat {missed}, palsu saat diam {early}")
+    if delays:
+        print(f"  Deteksi {np.mean(delays):+.1f} frame dari akhir gerakan (min {min(delays)}, maks {max(delays)})")
+    for (kind, name), n in sorted(confusion.items()):
+        print(f"  {kind} -> {name}: {n}")
+    return correct, wrong, double, missed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark pencocokan gerakan DTW + LB_Keogh")
+    parser.add_argument('--templates', type=int, nargs='+', default=[10, 50, 100, 200, 500])
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--stream-lengths', type=int, nargs='+', default=[20, 30, 40])
+    args = parser.parse_args()
+    benchmark(args.templates, args.queries)
+    for length in args.stream_lengths:
+        stream_benchmark(length=length)
@@ -0,0 +1,263 @@
+import argparse
+import time
+
+import numpy as np
+
+from landmark_results import (FACE_POINTS, HAND_POINTS, HANDEDNESS_LABELS,
+                              faces_to_array, hands_to_array)
+
+# Indeks titik FaceMesh per area wajah (topologi kanonik MediaPipe, 478 titik dengan iris)
+FACE_REGIONS = {
+    'mouth': [0, 13, 14, 17, 37, 39, 40, 61, 78, 80, 81, 82, 84, 87, 88, 91, 95, 146, 178, 181,
+              185, 191, 267, 269, 270, 291, 308, 310, 311, 312, 314, 317, 318, 321, 324, 375,
+              402, 405, 409, 415],
+    'chin': [18, 32, 83, 140, 148, 149, 152, 171, 175, 176, 199, 200, 201, 208, 262, 313, 369,
+             377, 378, 396, 400, 421, 428],
+    'forehead': [8, 9, 10, 21, 54, 67, 68, 69, 71, 103, 104, 108, 109, 151, 251, 284, 297, 298,
+                 299, 301, 332, 333, 337, 338],
+    'cheek': [36, 50, 100, 101, 117, 118, 119, 120, 123, 142, 147, 187, 192, 203, 205, 206, 207,
+              213, 214, 216, 266, 280, 329, 330, 346, 347, 348, 349, 352, 371, 376, 411, 416,
+              423, 425, 426, 427, 433, 434, 436],
+}
+REGION_NAMES = list(FACE_REGIONS) + ['face']   # 'face' = titik wajah di luar area di atas
+
+
+def region_lookup(points=FACE_POINTS):
+    """Array (points,) berisi indeks REGION_NAMES untuk setiap titik FaceMesh"""
+    lookup = np.full(points, len(REGION_NAMES) - 1, dtype=np.int8)
+    for code, name in enumerate(FACE_REGIONS):
+        lookup[FACE_REGIONS[name]] = code
+    return lookup
+
+
+class Contact:
+    """Kontak tangan-wajah pada satu frame"""
+    __slots__ = ('hand', 'label', 'face', 'region', 'keypoint', 'face_point', 'distance', 'position')
+
+    def __init__(self, hand, label, face, region, keypoint, face_point, distance, position):
+        self.hand = hand              # indeks tangan di hand_results
+        self.label = label            # handedness ('Left'/'Right')
+        self.face = face
+        self.region = region
+        self.keypoint = keypoint      # titik tangan terdekat (0-20)
+        self.face_point = face_point  # titik wajah terdekat (0-477)
+        self.distance = distance      # relatif terhadap tinggi wajah
+        self.position = position      # (x, y) ternormalisasi titik tangan
+
+    @property
+    def key(self):
+        # Indeks tangan, bukan label: dua tangan berlabel sama/'Unknown' tidak saling menimpa
+        return self.hand, self.face, self.region
+
+
+class ContactEvent:
+    __slots__ = ('kind', 'timestamp', 'contact')
+
+    def __init__(self, kind, timestamp, contact):
+        self.kind = kind              # 'start' atau 'end'
+        self.timestamp = timestamp
+        self.contact = contact
+
+    def __repr__(self):
+        c = self.contact
+        return f"ContactEvent({self.kind}, {c.label} -> {c.region}, t={self.timestamp:.3f})"
+
+
+class FaceContactDetector:
+    """Fusi hasil tangan + wajah: kontak setiap titik tangan dengan 478 titik wajah
+
+    Semua pasangan (tangan x 21) x (wajah x 478) dihitung sekaligus dengan numpy di buffer
+    yang dipakai ulang; ~20 ribu jarak per frame untuk dua tangan dan satu wajah. Jarak diukur
+    2D dalam satuan piksel persegi (x dikali aspek frame) lalu dibagi tinggi wajah, jadi ambang
+    tidak bergantung jarak ke kamera. z tangan dan wajah tidak sebanding (masing-masing relatif
+    terhadap pergelangan / pusat wajah), sehingga tangan tepat di depan wajah ikut terhitung kontak.
+
+    Event 'start'/'end' memakai histeresis frame agar kontak yang berkedip tidak memicu ulang.
+    """
+
+    def __init__(self, max_hands=2, max_faces=1, threshold=0.06, release=0.09,
+                 min_frames=2, max_gap=2):
+        self.max_hands = max_hands
+        self.max_faces = max_faces
+        self.threshold = threshold    # jarak/tinggi wajah untuk mulai kontak
+        self.release = release        # jarak untuk mengakhiri kontak (> threshold)
+        self.min_frames = min_frames  # frame berturut-turut sebelum 'start'
+        self.max_gap = max_gap        # frame tanpa kontak sebelum 'end'
+        self.lookup = region_lookup()
+
+        self._hand_xy = np.zeros((max_hands * HAND_POINTS, 2), dtype=np.float32)
+        self._face_xy = np.zeros((max_faces * FACE_POINTS, 2), dtype=np.float32)
+        self._dist = np.zeros(max_hands * HAND_POINTS * max_faces * FACE_POINTS, dtype=np.float32)
+        self._pending = {}            # key -> jumlah frame kontak berturut-turut
+        self.active = {}              # key -> [Contact, frame tanpa kontak]
+
+    def contacts_from_arrays(self, hands, handedness, hand_count, faces, face_count, aspect=1.0,
+                             face_points=FACE_POINTS):
+        """Kontak dari array hands_to_array/faces_to_array; satu Contact per (tangan, wajah, area)
+
+        face_points = jumlah titik wajah yang sungguhan (468 tanpa refine_landmarks); sisa baris
+        nol dari faces_to_array tidak ikut dihitung.
+        """
+        nh, nf, points = int(hand_count), int(face_count), int(face_points)
+        if nh == 0 or nf == 0:
+            return []
+        hand_xy = self._hand_xy[:nh * HAND_POINTS]
+        face_xy = self._face_xy[:nf * points]
+        hand_xy[:] = hands[:nh, :, :2].reshape(-1, 2)
+        face_xy[:] = faces[:nf, :points, :2].reshape(-1, 2)
+        hand_xy[:, 0] *= aspect
+        face_xy[:, 0] *= aspect
+
+        # |a - b|^2 = |a|^2 + |b|^2 - 2ab, satu perkalian matriks untuk semua pasangan
+        dist = self._dist[:len(hand_xy) * len(face_xy)].reshape(len(hand_xy), len(face_xy))
+        np.matmul(hand_xy, face_xy.T, out=dist)
+        dist *= -2.0
+        dist += (hand_xy ** 2).sum(axis=1)[:, None]
+        dist += (face_xy ** 2).sum(axis=1)[None, :]
+        np.maximum(dist, 0.0, out=dist)
+
+        contacts = []
+        limit = max(self.threshold, self.release)
+        for f in range(nf):
+            face = face_xy[f * points:(f + 1) * points]
+            height = float(face[:, 1].max() - face[:, 1].min()) or 1e-6
+            block = dist[:, f * points:(f + 1) * points]
+            nearest = block.argmin(axis=1)
+            nearest_d = np.sqrt(block[np.arange(len(block)), nearest]) / height
+            for h in range(nh):
+                rows = slice(h * HAND_POINTS, (h + 1) * HAND_POINTS)
+                d = nearest_d[rows]
+                if d.min() > limit:
+                    continue
+                label = HANDEDNESS_LABELS.get(int(handedness[h]), 'Unknown')
+                regions = self.lookup[nearest[rows]]
+                # Satu kontak per area: titik tangan terdekat di area tsb
+                for code in np.unique(regions[d <= limit]):
+                    in_region = np.where(regions == code, d, np.inf)
+                    k = int(in_region.argmin())
+                    contacts.append(Contact(h, label, f, REGION_NAMES[code], k,
+                                            int(nearest[h * HAND_POINTS + k]), float(d[k]),
+                                            (float(hands[h, k, 0]), float(hands[h, k, 1]))))
+        return contacts
+
+    def detect(self, face_results, hand_results, aspect=1.0):
+        """Kontak pada satu frame dari hasil FaceMesh.process() / Hands.process()"""
+        hands, handedness, hand_count = hands_to_array(hand_results, self.max_hands)
+        faces, face_count = faces_to_array(face_results, self.max_faces)
+        points = len(face_results.multi_face_landmarks[0].landmark) if face_count else FACE_POINTS
+        return self.contacts_from_arrays(hands, handedness, hand_count, faces, face_count, aspect,
+                                         min(points, FACE_POINTS))
+
+    def update(self, face_results, hand_results, timestamp, aspect=1.0):
+        """(kontak aktif, event baru) setelah histeresis"""
+        return self.update_contacts(self.detect(face_results, hand_results, aspect), timestamp)
+
+    def update_contacts(self, contacts, timestamp):
+        events = []
+        seen = set()
+        for contact in contacts:
+            key = contact.key
+            if key in self.active:
+                if contact.distance <= self.release:
+                    self.active[key] = [contact, 0]
+                    seen.add(key)
+                continue
+            if contact.distance > self.threshold:
+                continue
+            seen.add(key)
+            count = self._pending.get(key, 0) + 1
+            if count >= self.min_frames:
+                self._pending.pop(key, None)
+                self.active[key] = [contact, 0]
+                events.append(ContactEvent('start', timestamp, contact))
+            else:
+                self._pending[key] = count
+        for key in list(self._pending):
+            if key not in seen:
+                del self._pending[key]
+        for key in list(self.active):
+            if key in seen:
+                continue
+            self.active[key][1] += 1
+            if self.active[key][1] > self.max_gap:
+                events.append(ContactEvent('end', timestamp, self.active.pop(key)[0]))
+        return [state[0] for state in self.active.values()], events
+
+    def reset(self):
+        self._pending.clear()
+        self.active.clear()
+
+
+def synthetic_face(rng, center=(0.5, 0.45), size=0.3):
+    """Titik wajah sintetis (478, 3): elips dengan area mengikuti FACE_REGIONS"""
+    face = np.zeros((FACE_POINTS, 3), dtype=np.float32)
+    angle = rng.uniform(0, 2 * np.pi, FACE_POINTS)
+    radius = np.sqrt(rng.uniform(0, 1, FACE_POINTS))
+    face[:, 0] = center[0] + 0.35 * size * radius * np.cos(angle)
+    face[:, 1] = center[1] + 0.5 * size * radius * np.sin(angle)
+    anchors = {'mouth': (0.0, 0.25), 'chin': (0.0, 0.45), 'forehead': (0.0, -0.4), 'cheek': (0.25, 0.1)}
+    for name, (dx, dy) in anchors.items():
+        idx = FACE_REGIONS[name]
+        side = rng.choice([-1, 1], len(idx)) if dx else 0
+        face[idx, 0] = center[0] + size * (dx * side + rng.normal(0, 0.03, len(idx)))
+        face[idx, 1] = center[1] + size * (dy + rng.normal(0, 0.02, len(idx)))
+    return face
+
+
+def synthetic_hand(rng, tip):
+    """Tangan sintetis (21, 3) dengan ujung telunjuk (titik 8) di `tip`"""
+    hand = np.zeros((HAND_POINTS, 3), dtype=np.float32)
+    hand[:, 0] = tip[0] + rng.normal(0, 0.03, HAND_POINTS)
+    hand[:, 1] = tip[1] + np.linspace(0.15, 0.0, HAND_POINTS)
+    hand[8, :2] = tip
+    return hand
+
+
+def benchmark(face_counts=(1, 2, 4), hand_count=2, frames=2000, fps=30, seed=0):
+    """Waktu fusi per frame (tanpa / dengan konversi dari objek MediaPipe) vs anggaran frame"""
+    from landmark_results import array_to_faces, array_to_hands
+
+    rng = np.random.default_rng(seed)
+    budget = 1000.0 / fps
+    print(f"{hand_count} tangan, {frames} frame, anggaran {budget:.1f} ms/frame ({fps} FPS)")
+    print(f"{'wajah':>6} {'pasangan':>9} {'array ms':>9} {'+objek ms':>10} {'% anggaran':>11} {'event':>6}")
+    for nf in face_counts:
+        detector = FaceContactDetector(max_hands=hand_count, max_faces=nf)
+        faces = np.stack([synthetic_face(rng, (0.2 + 0.6 * i / max(nf - 1, 1), 0.45), 0.3 / np.sqrt(nf))
+                          for i in range(nf)])
+        handedness = np.array([i % 2 for i in range(hand_count)], dtype=np.int8)
+        # Ujung telunjuk berpindah antara mulut, pipi dan jauh dari wajah
+        targets = [faces[0, FACE_REGIONS['mouth'][0], :2], faces[0, FACE_REGIONS['cheek'][0], :2],
+                   np.array([0.9, 0.9], dtype=np.float32)]
+        hand_frames = [np.stack([synthetic_hand(rng, targets[(t // 20 + i) % len(targets)])
+                                 for i in range(hand_count)]) for t in range(60)]
+
+        t0 = time.perf_counter()
+        events = 0
+        for t in range(frames):
+            hands = hand_frames[t % len(hand_frames)]
+            contacts = detector.contacts_from_arrays(hands, handedness, hand_count, faces, nf, 16 / 9)
+            events += len(detector.update_contacts(contacts, t / fps)[1])
+        array_ms = (time.perf_counter() - t0) / frames * 1000
+
+        detector.reset()
+        face_results = array_to_faces(faces, nf)
+        hand_results = [array_to_hands(h, handedness, hand_count) for h in hand_frames]
+        n = max(frames // 10, 1)
+        t0 = time.perf_counter()
+        for t in range(n):
+            detector.update(face_results, hand_results[t % len(hand_results)], t / fps, 16 / 9)
+        object_ms = (time.perf_counter() - t0) / n * 1000
+
+        pairs = hand_count * HAND_POINTS * nf * FACE_POINTS
+        print(f"{nf:>6} {pairs:>9} {array_ms:>9.3f} {object_ms:>10.3f} {object_ms / budget:>10.1%} {events:>6}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark deteksi kontak tangan-wajah")
+    parser.add_argument('--faces', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--hands', type=int, default=2)
+    parser.add_argument('--frames', type=int, default=2000)
+    parser.add_argument('--fps', type=int, default=30)
+    args = parser.parse_args()
+    benchmark(args.faces, args.hands, args.frames, args.fps)
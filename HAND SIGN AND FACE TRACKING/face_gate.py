@@ -0,0 +1,109 @@
+import cv2
+import numpy as np
+
+from landmark_results import array_to_faces, faces_to_array
+
+
+class GatedFaceMesh:
+    """FaceMesh yang hanya dijalankan saat wajah bergerak cukup jauh atau tiap N frame
+
+    Di antara dua run penuh, mesh sebelumnya digeser mengikuti gerak kotak wajah
+    (optical flow Lucas-Kanade pada sebagian titik mesh + transformasi similarity).
+    """
+
+    def __init__(self, face_mesh, max_skip=5, move_threshold=0.08, scale_threshold=0.05,
+                 flow_scale=0.5, track_stride=12):
+        self.face_mesh = face_mesh
+        self.max_skip = max_skip                # paksa run penuh setiap N frame
+        self.move_threshold = move_threshold    # geser kumulatif, relatif terhadap ukuran kotak wajah
+        self.scale_threshold = scale_threshold  # perubahan skala kumulatif
+        self.flow_scale = flow_scale            # optical flow dihitung di gambar yang diperkecil
+        self.track_ids = np.arange(0, 468, track_stride)
+
+        self.prev_gray = None
+        self.mesh = None            # (478, 3) ternormalisasi, hasil run penuh / warp terakhir
+        self.point_count = 0
+        self.skipped = 0
+        self.moved = 0.0
+        self.scaled = 0.0
+
+        # Statistik
+        self.full_runs = 0
+        self.skipped_runs = 0
+
+    @property
+    def avoided_ratio(self):
+        total = self.full_runs + self.skipped_runs
+        return self.skipped_runs / total if total else 0.0
+
+    def _small_gray(self, image_rgb):
+        gray = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2GRAY)
+        if self.flow_scale != 1.0:
+            gray = cv2.resize(gray, None, fx=self.flow_scale, fy=self.flow_scale,
+                              interpolation=cv2.INTER_AREA)
+        return gray
+
+    def _full_run(self, image_rgb, gray):
+        results = self.face_mesh.process(image_rgb)
+        self.full_runs += 1
+        self.prev_gray = gray
+        self.skipped = 0
+        self.moved = 0.0
+        self.scaled = 0.0
+        if results.multi_face_landmarks:
+            landmarks, _ = faces_to_array(results, 1)
+            self.mesh = landmarks[0]
+            self.point_count = len(results.multi_face_landmarks[0].landmark)
+        else:
+            self.mesh = None
+        return results
+
+    def _estimate_motion(self, gray):
+        """Transformasi similarity (2x3, piksel gambar kecil) dari frame lalu ke frame ini"""
+        gh, gw = gray.shape[:2]
+        prev_pts = (self.mesh[self.track_ids, :2] * (gw, gh)).astype(np.float32).reshape(-1, 1, 2)
+        next_pts, status, _ = cv2.calcOpticalFlowPyrLK(self.prev_gray, gray, prev_pts, None,
+                                                       winSize=(15, 15), maxLevel=2)
+        good = status.ravel() == 1
+        if good.sum() < len(self.track_ids) // 2:
+            return None
+        matrix, _ = cv2.estimateAffinePartial2D(prev_pts[good], next_pts[good])
+        return matrix
+
+    def process(self, image_rgb):
+        gray = self._small_gray(image_rgb)
+        if self.mesh is None or self.prev_gray is None or self.skipped >= self.max_skip:
+            return self._full_run(image_rgb, gray)
+
+        matrix = self._estimate_motion(gray)
+        if matrix is None:
+            return self._full_run(image_rgb, gray)
+
+        gh, gw = gray.shape[:2]
+        scale = float(np.hypot(matrix[0, 0], matrix[1, 0]))
+        xy = self.mesh[:, :2] * (gw, gh)
+        box_size = max(float(np.ptp(xy[:, 0])), float(np.ptp(xy[:, 1])), 1.0)
+        center = xy.mean(axis=0)
+        shift = matrix[:, :2] @ center + matrix[:, 2] - center
+        self.moved += float(np.hypot(shift[0], shift[1])) / box_size
+        self.scaled += abs(scale - 1.0)
+        if self.moved > self.move_threshold or self.scaled > self.scale_threshold:
+            return self._full_run(image_rgb, gray)
+
+        # Geser mesh lama dengan gerak kotak wajah, z ikut diskalakan
+        warped = xy @ matrix[:, :2].T + matrix[:, 2]
+        self.mesh[:, 0] = warped[:, 0] / gw
+        self.mesh[:, 1] = warped[:, 1] / gh
+        self.mesh[:, 2] *= scale
+
+        self.prev_gray = gray
+        self.skipped += 1
+        self.skipped_runs += 1
+        return array_to_faces(self.mesh[None, :self.point_count], 1)
+
+    def report(self):
+        return (f"FaceMesh penuh: {self.full_runs}, dilewati: {self.skipped_runs} "
+                f"({self.avoided_ratio * 100:.0f}% dihemat)")
+
+    def close(self):
+        self.face_mesh.close()
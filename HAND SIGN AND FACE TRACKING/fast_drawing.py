@@ -0,0 +1,148 @@
+import argparse
+import time
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from landmark_results import landmarks_to_array
+
+mp_hands = mp.solutions.hands
+mp_face_mesh = mp.solutions.face_mesh
+
+# Warna default MediaPipe (BGR), dikelompokkan per jari
+_PALM = (128, 128, 128)
+_THUMB = (180, 229, 255)
+_INDEX = (128, 64, 128)
+_MIDDLE = (0, 204, 255)
+_RING = (48, 255, 48)
+_PINKY = (192, 101, 21)
+_RED = (48, 48, 255)
+
+_FINGER_GROUPS = [
+    (range(1, 5), _THUMB),
+    (range(5, 9), _INDEX),
+    (range(9, 13), _MIDDLE),
+    (range(13, 17), _RING),
+    (range(17, 21), _PINKY),
+]
+
+
+def edge_array(connections):
+    """frozenset koneksi MediaPipe -> array indeks (E, 2) int32 yang terurut"""
+    return np.array(sorted(connections), dtype=np.int32).reshape(-1, 2)
+
+
+def to_pixels(landmark_list, w, h):
+    """Konversi LandmarkList ke koordinat piksel (N, 2) int32 sekali saja"""
+    pts = landmarks_to_array(landmark_list)
+    return (pts[:, :2] * (w, h)).astype(np.int32)
+
+
+class LandmarkPainter:
+    """Gambar skeleton tangan & face mesh dengan cv2.polylines per kelompok warna"""
+
+    def __init__(self, face_detail='tesselation', decimate=2):
+        # Level of detail wajah: 'tesselation', 'decimated' atau 'contours'
+        self.face_detail = face_detail
+        self.decimate = decimate
+
+        self.face_edges = {
+            'tesselation': edge_array(mp_face_mesh.FACEMESH_TESSELATION),
+            'decimated': edge_array(mp_face_mesh.FACEMESH_TESSELATION)[::decimate],
+            'contours': edge_array(mp_face_mesh.FACEMESH_CONTOURS),
+        }
+        self.face_color = _PALM  # abu-abu, sama dengan style tesselation default
+
+        # Koneksi tangan dipisah per warna supaya satu warna = satu panggilan polylines
+        hand_edges = edge_array(mp_hands.HAND_CONNECTIONS)
+        self.hand_edge_groups = []
+        finger_mask = np.zeros(len(hand_edges), dtype=bool)
+        for points, color in _FINGER_GROUPS:
+            pts = np.array(points)
+            mask = np.isin(hand_edges[:, 0], pts) & np.isin(hand_edges[:, 1], pts)
+            finger_mask |= mask
+            self.hand_edge_groups.append((hand_edges[mask], color))
+        self.hand_edge_groups.insert(0, (hand_edges[~finger_mask], _PALM))
+        self.hand_edges = hand_edges
+
+        # Warna titik per landmark tangan
+        self.hand_point_colors = [_RED] * 21
+        for points, color in _FINGER_GROUPS:
+            for i in points:
+                self.hand_point_colors[i] = color
+
+    def draw_face(self, img, face_landmarks, detail=None):
+        h, w = img.shape[:2]
+        pts = to_pixels(face_landmarks, w, h)
+        edges = self.face_edges[detail or self.face_detail]
+        # Mesh tanpa refine hanya punya 468 titik
+        edges = edges[(edges < len(pts)).all(axis=1)]
+        cv2.polylines(img, pts[edges], False, self.face_color, 1)
+        return pts
+
+    def draw_hand(self, img, hand_landmarks, plain=False):
+        """plain=True meniru gaya default draw_landmarks (garis putih, titik merah)"""
+        h, w = img.shape[:2]
+        pts = to_pixels(hand_landmarks, w, h)
+        if plain:
+            cv2.polylines(img, pts[self.hand_edges], False, (224, 224, 224), 2)
+            for x, y in pts:
+                cv2.circle(img, (int(x), int(y)), 2, (0, 0, 255), -1)
+            return pts
+
+        for edges, color in self.hand_edge_groups:
+            cv2.polylines(img, pts[edges], False, color, 2)
+        for (x, y), color in zip(pts, self.hand_point_colors):
+            cv2.circle(img, (int(x), int(y)), 5, color, -1)
+        return pts
+
+
+def _fake_landmarks(n, rng):
+    from landmark_results import LandmarkList
+    center = rng.uniform(0.3, 0.7, size=2)
+    pts = np.zeros((n, 3), dtype=np.float32)
+    pts[:, :2] = center + rng.normal(0, 0.08, size=(n, 2))
+    return LandmarkList(pts)
+
+
+def benchmark(iterations=200, width=1280, height=720):
+    """Bandingkan mp_drawing.draw_landmarks dengan LandmarkPainter"""
+    mp_drawing = mp.solutions.drawing_utils
+    mp_styles = mp.solutions.drawing_styles
+    rng = np.random.default_rng(0)
+    face = _fake_landmarks(478, rng)
+    hand = _fake_landmarks(21, rng)
+    img = np.zeros((height, width, 3), dtype=np.uint8)
+    painter = LandmarkPainter()
+
+    def timed(fn):
+        fn()  # warm-up
+        t0 = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        return (time.perf_counter() - t0) * 1000 / iterations
+
+    cases = [
+        ("face tesselation (draw_landmarks)", lambda: mp_drawing.draw_landmarks(
+            image=img, landmark_list=face, connections=mp_face_mesh.FACEMESH_TESSELATION,
+            landmark_drawing_spec=None,
+            connection_drawing_spec=mp_styles.get_default_face_mesh_tesselation_style())),
+        ("face tesselation (painter)", lambda: painter.draw_face(img, face, 'tesselation')),
+        ("face decimated (painter)", lambda: painter.draw_face(img, face, 'decimated')),
+        ("face contours (painter)", lambda: painter.draw_face(img, face, 'contours')),
+        ("hand (draw_landmarks)", lambda: mp_drawing.draw_landmarks(
+            img, hand, mp_hands.HAND_CONNECTIONS,
+            mp_styles.get_default_hand_landmarks_style(),
+            mp_styles.get_default_hand_connections_style())),
+        ("hand (painter)", lambda: painter.draw_hand(img, hand)),
+    ]
+    for name, fn in cases:
+        print(f"{name:<36} {timed(fn):7.3f} ms/frame")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark drawing landmark")
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+    benchmark(args.iterations)
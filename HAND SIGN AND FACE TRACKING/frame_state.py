@@ -0,0 +1,88 @@
+import math
+
+import numpy as np
+
+TIP_IDS = (4, 8, 12, 16, 20)  # jempol, telunjuk, tengah, manis, kelingking
+
+
+class HandState:
+    """Data satu tangan dalam satu frame; array dialokasikan sekali lalu ditimpa tiap frame"""
+    __slots__ = ('tips', 'center', 'span', 'label', 'track')
+
+    def __init__(self):
+        self.tips = np.zeros((len(TIP_IDS), 2), dtype=np.int32)  # piksel (x, y) ujung jari
+        self.center = np.zeros(2, dtype=np.int32)                # rata-rata ujung jari
+        self.span = 0.0                                          # jarak jempol ke kelingking
+        self.label = None
+        self.track = None
+
+    def copy_from(self, other):
+        self.tips[:] = other.tips
+        self.center[:] = other.center
+        self.span = other.span
+        self.label = other.label
+        self.track = other.track
+
+
+class HandFrame:
+    """Pool HandState berukuran tetap; hanya `count` tangan pertama yang aktif di frame ini"""
+    __slots__ = ('hands', 'count', 'centers', 'labels')
+
+    def __init__(self, max_hands=2):
+        self.hands = tuple(HandState() for _ in range(max_hands))
+        self.count = 0
+        self.centers = np.zeros((max_hands, 2), dtype=np.float64)  # input HandTracker.update
+        self.labels = [None] * max_hands
+
+    def fill(self, results, w, h):
+        """Isi ulang dari hasil MediaPipe tanpa membuat list/dict/tuple baru per tangan"""
+        self.count = 0
+        if not results.multi_hand_landmarks:
+            return self
+        handedness = results.multi_handedness
+        for i, hand_lms in enumerate(results.multi_hand_landmarks):
+            if i == len(self.hands):
+                break
+            hand = self.hands[i]
+            tips = hand.tips
+            landmarks = hand_lms.landmark
+            for k, tid in enumerate(TIP_IDS):
+                lm = landmarks[tid]
+                tips[k, 0] = int(lm.x * w)
+                tips[k, 1] = int(lm.y * h)
+            # Pusat tangan = rata-rata ujung jari (dibulatkan ke bawah seperti int(np.mean))
+            tips.sum(axis=0, out=hand.center)
+            hand.center //= len(TIP_IDS)
+            hand.span = math.hypot(int(tips[0, 0]) - int(tips[4, 0]), int(tips[0, 1]) - int(tips[4, 1]))
+            hand.label = handedness[i].classification[0].label if handedness else None
+            hand.track = None
+            self.centers[i] = hand.center
+            self.labels[i] = hand.label
+            self.count = i + 1
+        return self
+
+    def active_centers(self):
+        return self.centers[:self.count]
+
+    def copy(self):
+        """Salinan lepas (mis. untuk diteruskan ke thread render di pipeline)"""
+        other = HandFrame(len(self.hands))
+        for src, dst in zip(self.hands, other.hands):
+            dst.copy_from(src)
+        other.count = self.count
+        other.centers[:] = self.centers
+        other.labels[:] = self.labels
+        return other
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return self.hands[index]
+
+    def __iter__(self):
+        return iter(self.hands[:self.count])
@@ -2,24 +2,31 @@ import cv2
 import mediapipe as mp
 import numpy as np
 import time
-import threading
 import os
 import pygame  # Untuk memutar audio
-from gtts import gTTS  # Google Text-to-Speech
+from dynamic_gesture import DynamicGestureRecognizer
+from fast_drawing import LandmarkPainter
+from inference_backend import create_hand_backend
+from latency_trace import LatencyTracer
+from thread_scheduler import get_scheduler
+from tts_assets import TTSAssetCache, create_backend
 
 class BISINDOIntroductionRecognizer:
-    def __init__(self):
+    def __init__(self, tts_backend=None):
         # Inisialisasi MediaPipe Hands
         self.mp_hands = mp.solutions.hands
-        self.mp_drawing = mp.solutions.drawing_utils
-        self.mp_drawing_styles = mp.solutions.drawing_styles
+        self.painter = LandmarkPainter()
+        self.tracer = LatencyTracer()
         
-        self.hands = self.mp_hands.Hands(
-            static_image_mode=False,
-            max_num_hands=1,
-            min_detection_confidence=0.7,
-            min_tracking_confidence=0.5
-        )
+        # THREAD_CONFIG: batas pool thread dan afinitas CPU per stage (inference, audio, ...)
+        self.scheduler = get_scheduler().apply_process()
+        with self.scheduler.scope('inference'):
+            self.hands = create_hand_backend(
+                static_image_mode=False,
+                max_num_hands=1,
+                min_detection_confidence=0.7,
+                min_tracking_confidence=0.5
+            )
         
         # Inisialisasi pygame untuk audio
         pygame.mixer.init()
@@ -34,6 +41,11 @@ class BISINDOIntroductionRecognizer:
         # Text untuk display
         self.display_text = "Mulai dengan gesture: TANGAN TERBUKA"
         
+        # Gesture gerak (swipe, lambaian, lingkaran) dari riwayat landmark
+        self.motion = DynamicGestureRecognizer()
+        self.motion_text = ""
+        self.motion_time = 0
+        
         # Warna untuk tiap state
         self.state_colors = {
             "HALO": (0, 255, 0),       # Hijau
@@ -53,35 +65,33 @@ class BISINDOIntroductionRecognizer:
             "METAL": "Salam kenal"
         }
         
-        # Buat folder untuk menyimpan file audio
-        if not os.path.exists("audio_cache"):
-            os.makedirs("audio_cache")
+        # Cache audio berbasis hash teks di folder audio_cache
+        # Backend: 'gtts' (Google, butuh internet) atau 'offline' (lokal, untuk mesin tanpa internet),
+        # bisa juga diatur lewat environment variable BISINDO_TTS
+        backend_name = tts_backend or os.environ.get("BISINDO_TTS", "gtts")
+        self.tts = TTSAssetCache("audio_cache", create_backend(backend_name), lang='id')
+        self.audio_files = {}
         
         # Pre-generate audio files untuk performa lebih baik
         print("Menyiapkan suara...")
         self.prepare_audio_files()
     
     def prepare_audio_files(self):
-        """Buat file audio terlebih dahulu untuk menghindari delay"""
-        for gesture, text in self.gesture_sounds.items():
-            filename = f"audio_cache/{gesture}.mp3"
-            if not os.path.exists(filename):
-                try:
-                    tts = gTTS(text=text, lang='id', slow=False)
-                    tts.save(filename)
-                    print(f"✅ Suara untuk '{gesture}' siap")
-                except Exception as e:
-                    print(f"⚠️  Gagal membuat suara untuk '{gesture}': {e}")
+        """Buat file audio terlebih dahulu (paralel) untuk menghindari delay"""
+        futures = {gesture: self.tts.submit(text) for gesture, text in self.gesture_sounds.items()}
+        for gesture, future in futures.items():
+            try:
+                self.audio_files[gesture] = future.result()
+                print(f"✅ Suara untuk '{gesture}' siap")
+            except Exception as e:
+                print(f"⚠️  Gagal membuat suara untuk '{gesture}': {e}")
     
     def speak_with_gtts(self, text):
-        """Menggunakan Google TTS dengan threading"""
+        """Sintesis (atau ambil dari cache) lalu putar dengan threading"""
         def speak_thread():
             try:
-                filename = f"audio_cache/temp_{int(time.time())}.mp3"
-                
-                # Buat audio dengan gTTS
-                tts = gTTS(text=text, lang='id', slow=False)
-                tts.save(filename)
+                # File dari cache, disintesis dulu bila belum ada; nama unik per teks
+                filename = self.tts.get(text)
                 
                 # Putar audio dengan pygame
                 pygame.mixer.music.load(filename)
@@ -90,12 +100,6 @@ class BISINDOIntroductionRecognizer:
                 # Tunggu sampai selesai
                 while pygame.mixer.music.get_busy():
                     time.sleep(0.1)
-                
-                # Hapus file sementara
-                try:
-                    os.remove(filename)
-                except:
-                    pass
                     
             except Exception as e:
                 print(f"Error dalam TTS: {e}")
@@ -105,25 +109,29 @@ class BISINDOIntroductionRecognizer:
         # Cek apakah sudah ada suara yang sedang diputar
         if not self.is_speaking:
             self.is_speaking = True
-            thread = threading.Thread(target=speak_thread)
-            thread.daemon = True
+            thread = self.scheduler.thread('audio', speak_thread)
             thread.start()
     
     def speak_prepared_audio(self, gesture):
         """Menggunakan audio yang sudah dipersiapkan sebelumnya"""
+        # Ambil trace frame pemicu sekarang; thread audio baru jalan setelah frame berikutnya
+        trace = self.tracer.current
+        
         def play_audio():
             try:
-                filename = f"audio_cache/{gesture}.mp3"
-                if os.path.exists(filename):
-                    pygame.mixer.music.load(filename)
-                    pygame.mixer.music.play()
-                    
-                    # Tunggu sampai selesai
-                    while pygame.mixer.music.get_busy():
-                        time.sleep(0.1)
-                else:
-                    # Fallback ke gTTS realtime
-                    self.speak_with_gtts(self.gesture_sounds[gesture])
+                filename = self.audio_files.get(gesture)
+                if not (filename and os.path.exists(filename)):
+                    # Fallback ke sintesis realtime lewat cache TTS, langsung di thread ini
+                    # (speak_with_gtts tidak jalan selama is_speaking masih True)
+                    with self.tracer.span('tts', trace):
+                        filename = self.tts.get(self.gesture_sounds[gesture])
+                pygame.mixer.music.load(filename)
+                pygame.mixer.music.play()
+                self.tracer.action('speak', trace)
+                
+                # Tunggu sampai selesai
+                while pygame.mixer.music.get_busy():
+                    time.sleep(0.1)
                     
             except Exception as e:
                 print(f"Error memutar audio: {e}")
@@ -132,8 +140,7 @@ class BISINDOIntroductionRecognizer:
         
         if not self.is_speaking:
             self.is_speaking = True
-            thread = threading.Thread(target=play_audio)
-            thread.daemon = True
+            thread = self.scheduler.thread('audio', play_audio)
             thread.start()
     
     def get_finger_states(self, landmarks):
@@ -223,13 +230,15 @@ class BISINDOIntroductionRecognizer:
         
         return False
     
-    def process_frame(self, frame):
+    def process_frame(self, frame, capture_time=None):
         """Proses frame dan deteksi gesture"""
+        self.tracer.begin_frame(capture_time)
         frame = cv2.flip(frame, 1)
         h, w, _ = frame.shape
         
         rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.hands.process(rgb_frame)
+        with self.tracer.span('inference'):
+            results = self.hands.process(rgb_frame)
         
         # Gambar UI background untuk text
         overlay = frame.copy()
@@ -239,15 +248,15 @@ class BISINDOIntroductionRecognizer:
         if results.multi_hand_landmarks:
             for hand_landmarks in results.multi_hand_landmarks:
                 # Draw hand landmarks
-                self.mp_drawing.draw_landmarks(
-                    frame,
-                    hand_landmarks,
-                    self.mp_hands.HAND_CONNECTIONS,
-                    self.mp_drawing_styles.get_default_hand_landmarks_style(),
-                    self.mp_drawing_styles.get_default_hand_connections_style())
+                self.painter.draw_hand(frame, hand_landmarks)
                 
                 # Detect gesture
-                gesture = self.detect_gesture(hand_landmarks.landmark)
+                with self.tracer.span('gesture'):
+                    gesture = self.detect_gesture(hand_landmarks.landmark)
+                    motion = self.motion.update(hand_landmarks, self.tracer.current.capture_ts)
+                if motion:
+                    self.motion_text = motion
+                    self.motion_time = time.time()
                 
                 # Update state
                 self.update_state(gesture)
@@ -277,6 +286,15 @@ class BISINDOIntroductionRecognizer:
                     if progress > 0:
                         color = self.state_colors.get(gesture, (255, 255, 255))
                         cv2.circle(frame, center, int(radius * progress), color, -1)
+        else:
+            # Riwayat gerak tidak boleh menyambung lintasan dari tangan yang hilang
+            self.motion.reset()
+        
+        # Tampilkan gesture gerak terakhir selama 1.5 detik
+        if self.motion_text and time.time() - self.motion_time < 1.5:
+            cv2.putText(frame, f"Gerakan: {self.motion_text}", 
+                       (w - 350, 70),
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 200, 0), 2)
         
         # Tampilkan sequence progress
         y_offset = h - 180
@@ -338,13 +356,15 @@ def main():
     fps_time = time.time()
     
     while cap.isOpened():
+        # Timestamp sebelum read(): tunggu frame + decode ikut dihitung sebagai latensi
+        capture_time = time.time()
         success, frame = cap.read()
         if not success:
             print("Gagal membaca frame")
             break
         
         # Process frame
-        processed_frame, sequence = recognizer.process_frame(frame)
+        processed_frame, sequence = recognizer.process_frame(frame, capture_time)
         
         # Hitung dan tampilkan FPS
         fps_counter += 1
@@ -370,6 +390,8 @@ def main():
             print("Testing suara...")
             recognizer.speak_with_gtts("Testing suara dari Google Text to Speech")
     
+    print(recognizer.tracer.summary())
+    recognizer.tts.close()
     cap.release()
     cv2.destroyAllWindows()
 
@@ -380,12 +402,14 @@ if __name__ == "__main__":
     # Cek apakah paket sudah terinstall
     try:
         import pygame
-        from gtts import gTTS
+        if os.environ.get("BISINDO_TTS", "gtts") == "gtts":
+            from gtts import gTTS
         print("✅ Semua paket sudah terinstall")
     except ImportError as e:
         print(f"⚠️  Paket belum terinstall: {e}")
         print("\nSilakan install dengan perintah:")
         print("pip install gtts pygame")
+        print("(atau jalankan dengan BISINDO_TTS=offline tanpa gtts)")
         exit()
     
     # Cek kamera
@@ -1,23 +1,42 @@
 import cv2
 import mediapipe as mp
 import numpy as np
-import pyautogui
 import time
+from fast_drawing import LandmarkPainter
+from inference_backend import create_hand_backend
+from motion_gate import MotionGate, MotionGatedHands
+from input_backend import create_input_backend
+from latency_trace import LatencyTracer
+from scroll_engine import ScrollEngine
+from thread_scheduler import get_scheduler
 
 class AdvancedHandScroll:
     def __init__(self):
         self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
-            static_image_mode=False,
-            max_num_hands=1,
-            min_detection_confidence=0.7,
-            min_tracking_confidence=0.5
-        )
-        self.mp_drawing = mp.solutions.drawing_utils
+        # THREAD_CONFIG: batas pool thread dan afinitas CPU per stage
+        self.scheduler = get_scheduler().apply_process()
+        # Inferensi dilewati saat adegan diam dan tidak ada tangan yang dilacak
+        with self.scheduler.scope('inference'):
+            self.hands = MotionGatedHands(create_hand_backend(
+                static_image_mode=False,
+                max_num_hands=1,
+                min_detection_confidence=0.7,
+                min_tracking_confidence=0.5
+            ), MotionGate(idle_after=10.0, idle_interval=0.2))
+        self.painter = LandmarkPainter()
         
         self.scroll_sensitivity = 15
-        self.last_scroll_time = 0
-        self.scroll_cooldown = 0.1  # seconds
+        
+        # Trace ID per frame: capture -> inference -> gesture -> action
+        self.tracer = LatencyTracer()
+        
+        # Continuous scrolling on its own thread; speeds match the old 3/8 clicks per 100 ms bursts
+        s = self.scroll_sensitivity
+        # INPUT_BACKEND: auto (XTest bila ada), xlib, uinput, pyautogui, fake
+        self.scroll = ScrollEngine(create_input_backend(),
+                                   speeds={'SCROLL_UP': 30.0 * s, 'SCROLL_DOWN': -30.0 * s,
+                                           'FAST_SCROLL': 80.0 * s},
+                                   tracer=self.tracer, scheduler=self.scheduler)
         
     def get_finger_state(self, hand_landmarks):
         """Check which fingers are extended"""
@@ -61,8 +80,10 @@ class AdvancedHandScroll:
         else:
             return "STOP"
     
-    def run(self):
+    def run(self, trace_path=None):
         cap = cv2.VideoCapture(0)
+        # Buffer kecil agar frame setelah jeda idle tidak basi
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
         
         print("🎯 ADVANCED HAND SCROLL CONTROLLER")
         print("📝 Gesture Mapping:")
@@ -72,49 +93,53 @@ class AdvancedHandScroll:
         print("   ✊ Kepal = Stop")
         print("   Press 'Q' to quit")
         
+        self.scroll.start()
         while cap.isOpened():
+            # Turunkan laju capture saat idle, langsung normal lagi begitu ada gerak
+            idle_wait = self.hands.gate.frame_interval()
+            if idle_wait:
+                time.sleep(idle_wait)
+            # Timestamp sebelum read(): tunggu frame + decode ikut dihitung sebagai latensi
+            capture_time = time.time()
             success, image = cap.read()
             if not success:
                 continue
+            self.tracer.begin_frame(capture_time)
             
             image = cv2.flip(image, 1)
             image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
             image_rgb.flags.writeable = False
             
-            results = self.hands.process(image_rgb)
+            with self.tracer.span('inference'):
+                results = self.hands.process(image_rgb)
             
             image_rgb.flags.writeable = True
             image_bgr = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2BGR)
             
             current_gesture = "NO HAND"
-            scroll_action = ""
             
             if results.multi_hand_landmarks:
                 for hand_landmarks in results.multi_hand_landmarks:
-                    self.mp_drawing.draw_landmarks(
-                        image_bgr, hand_landmarks, self.mp_hands.HAND_CONNECTIONS)
+                    self.painter.draw_hand(image_bgr, hand_landmarks, plain=True)
                     
-                    finger_states = self.get_finger_state(hand_landmarks)
-                    gesture = self.detect_gesture(finger_states)
+                    with self.tracer.span('gesture'):
+                        finger_states = self.get_finger_state(hand_landmarks)
+                        gesture = self.detect_gesture(finger_states)
                     current_gesture = gesture
                     
-                    current_time = time.time()
-                    if current_time - self.last_scroll_time > self.scroll_cooldown:
-                        
-                        if gesture == "SCROLL_UP":
-                            pyautogui.scroll(3 * self.scroll_sensitivity)
-                            scroll_action = "🔼 SCROLL UP"
-                            self.last_scroll_time = current_time
-                            
-                        elif gesture == "SCROLL_DOWN":
-                            pyautogui.scroll(-3 * self.scroll_sensitivity)
-                            scroll_action = "🔽 SCROLL DOWN"
-                            self.last_scroll_time = current_time
-                            
-                        elif gesture == "FAST_SCROLL":
-                            pyautogui.scroll(8 * self.scroll_sensitivity)
-                            scroll_action = "⚡ FAST SCROLL"
-                            self.last_scroll_time = current_time
+                    # Moving the fingertip up/down while holding the gesture speeds up/slows down
+                    self.scroll.update_hand(gesture, hand_landmarks.landmark[8].y, self.tracer.current)
+            else:
+                # Hand gone: let the momentum coast out
+                self.scroll.release()
+            
+            velocity = self.scroll.velocity
+            if velocity > 0:
+                scroll_action = f"🔼 SCROLL UP {velocity:.0f}/s"
+            elif velocity < 0:
+                scroll_action = f"🔽 SCROLL DOWN {-velocity:.0f}/s"
+            else:
+                scroll_action = ""
             
             # Display information
             cv2.putText(image_bgr, f"Gesture: {current_gesture}", (10, 30),
@@ -133,6 +158,11 @@ class AdvancedHandScroll:
             if cv2.waitKey(5) & 0xFF == ord('q'):
                 break
         
+        self.scroll.stop()
+        print(self.hands.gate.report())
+        print(self.tracer.summary())
+        if trace_path:
+            self.tracer.export_chrome(trace_path)
         cap.release()
         cv2.destroyAllWindows()
 
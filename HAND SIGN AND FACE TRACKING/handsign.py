@@ -1,14 +1,57 @@
 import cv2
 import mediapipe as mp
 import math
+import os
+import time
+from contextlib import contextmanager
+from fast_drawing import LandmarkPainter
+from inference_backend import create_face_backend, create_hand_backend
+from face_contact import FaceContactDetector
+from face_gate import GatedFaceMesh
+from holistic_mode import HolisticTracker
+from landmark_log import LandmarkLogWriter
+from landmark_results import FACE_POINTS, HAND_POINTS
+from stream_server import MjpegStreamer
 
 class CombinedTracker:
-    def __init__(self):
+    def __init__(self, gate_face=True, holistic=False):
         # Inisialisasi MediaPipe
         self.mp_face_mesh = mp.solutions.face_mesh
         self.mp_hands = mp.solutions.hands
-        self.mp_drawing = mp.solutions.drawing_utils
-        self.mp_drawing_styles = mp.solutions.drawing_styles
+        # Drawing vektor (polylines) pengganti draw_landmarks; detail: tesselation/decimated/contours
+        self.painter = LandmarkPainter(face_detail='tesselation')
+        # FaceMesh penuh hanya saat wajah bergerak / tiap beberapa frame
+        self.gate_face = gate_face
+        # Satu graph Holistic untuk wajah + tangan; gating FaceMesh tidak berlaku di mode ini
+        self.holistic = holistic
+        # Fusi tangan-wajah: area wajah yang disentuh (mulut, dagu, dahi, pipi)
+        self.contact = FaceContactDetector(max_hands=2, max_faces=1)
+        
+    @contextmanager
+    def create_trackers(self):
+        """(face_mesh, hands): dua graph terpisah atau dua view dari satu graph Holistic"""
+        if self.holistic:
+            with HolisticTracker(
+                model_complexity=0,
+                refine_face_landmarks=True,
+                min_detection_confidence=0.5,
+                min_tracking_confidence=0.5) as holistic:
+                yield holistic.face, holistic.hands
+            return
+        
+        with create_face_backend(
+            max_num_faces=1,
+            refine_landmarks=True,
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5) as face_mesh, \
+            create_hand_backend(
+                model_complexity=0,
+                min_detection_confidence=0.5,
+                min_tracking_confidence=0.5) as hands:
+            
+            if self.gate_face:
+                face_mesh = GatedFaceMesh(face_mesh)
+            yield face_mesh, hands
         
     def calculate_finger_angles(self, hand_landmarks):
         """Hitung sudut jari"""
@@ -55,19 +98,21 @@ class CombinedTracker:
         else:
             return "UNKNOWN"
     
-    def run(self):
+    def run(self, log_prefix=None, stream_port=None):
         cap = cv2.VideoCapture(0)
         
-        with self.mp_face_mesh.FaceMesh(
-            max_num_faces=1,
-            refine_landmarks=True,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5) as face_mesh, \
-            self.mp_hands.Hands(
-                model_complexity=0,
-                min_detection_confidence=0.5,
-                min_tracking_confidence=0.5) as hands:
-            
+        # Opsional: tonton hasil render di http://<host>:<port>/ (bind ke STREAM_HOST, default 127.0.0.1)
+        streamer = None
+        if stream_port:
+            streamer = MjpegStreamer(port=stream_port).start()
+        
+        # Opsional: simpan stream landmark ke <prefix>_hands.lmk dan <prefix>_face.lmk
+        hand_log = face_log = None
+        if log_prefix:
+            hand_log = LandmarkLogWriter(f"{log_prefix}_hands.lmk", HAND_POINTS * 2)
+            face_log = LandmarkLogWriter(f"{log_prefix}_face.lmk", FACE_POINTS)
+        
+        with self.create_trackers() as (face_mesh, hands):
             while cap.isOpened():
                 success, image = cap.read()
                 if not success:
@@ -81,6 +126,11 @@ class CombinedTracker:
                 face_results = face_mesh.process(image_rgb)
                 hand_results = hands.process(image_rgb)
                 
+                if log_prefix:
+                    timestamp = time.time()
+                    hand_log.write_hands(timestamp, hand_results)
+                    face_log.write_face(timestamp, face_results)
+                
                 # Konversi kembali ke BGR
                 image.flags.writeable = True
                 image = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2BGR)
@@ -89,27 +139,22 @@ class CombinedTracker:
                 face_status = "No face detected"
                 hand_status = "No hand detected"
                 
+                # Kontak tangan ke wajah
+                h, w = image.shape[:2]
+                contacts, contact_events = self.contact.update(face_results, hand_results, time.time(), w / h)
+                for event in contact_events:
+                    print(event)
+                
                 # Gambar landmarks wajah
                 if face_results.multi_face_landmarks:
                     face_status = "Face detected"
                     for face_landmarks in face_results.multi_face_landmarks:
-                        self.mp_drawing.draw_landmarks(
-                            image=image,
-                            landmark_list=face_landmarks,
-                            connections=self.mp_face_mesh.FACEMESH_TESSELATION,
-                            landmark_drawing_spec=None,
-                            connection_drawing_spec=self.mp_drawing_styles
-                            .get_default_face_mesh_tesselation_style())
+                        self.painter.draw_face(image, face_landmarks)
                 
                 # Gambar landmarks tangan dan kenali gesture
                 if hand_results.multi_hand_landmarks:
                     for hand_landmarks in hand_results.multi_hand_landmarks:
-                        self.mp_drawing.draw_landmarks(
-                            image,
-                            hand_landmarks,
-                            self.mp_hands.HAND_CONNECTIONS,
-                            self.mp_drawing_styles.get_default_hand_landmarks_style(),
-                            self.mp_drawing_styles.get_default_hand_connections_style())
+                        self.painter.draw_hand(image, hand_landmarks)
                         
                         angles = self.calculate_finger_angles(hand_landmarks)
                         hand_status = self.recognize_gesture(angles)
@@ -119,16 +164,34 @@ class CombinedTracker:
                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 0, 0), 2)
                 cv2.putText(image, f'Hand: {hand_status}', (10, 60),
                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+                if contacts:
+                    for contact in contacts:
+                        x, y = contact.position
+                        cv2.circle(image, (int(x * w), int(y * h)), 12, (0, 0, 255), 2)
+                    regions = ', '.join(sorted({c.region for c in contacts}))
+                    cv2.putText(image, f'Contact: {regions}', (10, 90),
+                               cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
                 
                 # Tampilkan hasil
+                if streamer:
+                    streamer.publish(image)
                 cv2.imshow('Combined Face & Hand Tracking', image)
                 if cv2.waitKey(5) & 0xFF == 27:
                     break
         
+        if self.gate_face and not self.holistic:
+            print(face_mesh.report())
+        if log_prefix:
+            hand_log.close()
+            face_log.close()
+        if streamer:
+            print(streamer.report())
+            streamer.close()
         cap.release()
         cv2.destroyAllWindows()
 
 # Jalankan combined tracker
 if __name__ == "__main__":
-    tracker = CombinedTracker()
-    tracker.run()
\ No newline at end of file
+    # TRACKING_MODE=holistic: satu graph Holistic menggantikan FaceMesh + Hands
+    tracker = CombinedTracker(holistic=os.environ.get('TRACKING_MODE') == 'holistic')
+    tracker.run(stream_port=int(os.environ.get('STREAM_PORT', 0)) or None)
\ No newline at end of file
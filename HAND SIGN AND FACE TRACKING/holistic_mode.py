@@ -0,0 +1,141 @@
+import argparse
+import time
+
+import numpy as np
+
+from landmark_results import ClassificationList, FaceResults, HandResults
+
+
+class HolisticTracker:
+    """Satu graph MediaPipe Holistic untuk wajah, kedua tangan dan pose
+
+    Deteksi orang dilakukan sekali lalu ROI wajah/tangan diturunkan dari pose, bukan tiga
+    detektor terpisah di seluruh frame. Hasilnya dipetakan ke struktur FaceMesh.process()
+    dan Hands.process(), lewat dua view (`face`, `hands`) yang bisa dipakai sebagai pengganti
+    objek face_mesh dan hands di loop yang sudah ada.
+    """
+
+    def __init__(self, model_complexity=1, refine_face_landmarks=True, min_detection_confidence=0.5,
+                 min_tracking_confidence=0.5, mirrored_labels=True):
+        import mediapipe as mp
+        self._holistic = mp.solutions.holistic.Holistic(
+            model_complexity=model_complexity,
+            refine_face_landmarks=refine_face_landmarks,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence)
+        # Hands memberi label seolah gambar di-mirror (kamera selfie); Holistic memberi tangan kiri/kanan
+        # orang sebenarnya. mirrored_labels=True menyamakan label dengan Hands pada input yang sama.
+        self.mirrored_labels = mirrored_labels
+        self._last_image = None
+        self.face_results = FaceResults()
+        self.hand_results = HandResults()
+        self.pose_landmarks = None
+        self.face = _HolisticView(self, 'face_results')
+        self.hands = _HolisticView(self, 'hand_results')
+        self.runs = 0
+
+    def process(self, image_rgb):
+        """Jalankan graph sekali per frame; panggilan kedua dengan gambar yang sama memakai cache"""
+        if image_rgb is self._last_image:
+            return self.face_results, self.hand_results
+        results = self._holistic.process(image_rgb)
+        self.runs += 1
+        self._last_image = image_rgb
+        self.face_results = FaceResults([results.face_landmarks] if results.face_landmarks else None)
+        left_label, right_label = ('Right', 'Left') if self.mirrored_labels else ('Left', 'Right')
+        hands, labels = [], []
+        for hand, label in ((results.left_hand_landmarks, left_label),
+                            (results.right_hand_landmarks, right_label)):
+            if hand is not None:
+                hands.append(hand)
+                labels.append(ClassificationList(label))
+        self.hand_results = HandResults(hands, labels)
+        self.pose_landmarks = results.pose_landmarks
+        return self.face_results, self.hand_results
+
+    def close(self):
+        if self._holistic is not None:
+            self._holistic.close()
+            self._holistic = None
+            self._last_image = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _HolisticView:
+    """Objek dengan process() seperti FaceMesh/Hands yang membaca hasil graph bersama"""
+
+    def __init__(self, tracker, attr):
+        self._tracker = tracker
+        self._attr = attr
+
+    def process(self, image_rgb):
+        self._tracker.process(image_rgb)
+        return getattr(self._tracker, self._attr)
+
+    def close(self):
+        self._tracker.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _two_graph():
+    from inference_backend import create_face_backend, create_hand_backend
+    face_mesh = create_face_backend(cache=False, max_num_faces=1, refine_landmarks=True)
+    hands = create_hand_backend(cache=False, model_complexity=0)
+
+    def close():
+        face_mesh.close()
+        hands.close()
+    return face_mesh, hands, close
+
+
+def _holistic():
+    tracker = HolisticTracker(model_complexity=0, refine_face_landmarks=True)
+    return tracker.face, tracker.hands, tracker.close
+
+
+def compare(path, limit=None):
+    """Latensi dan CPU per frame: FaceMesh + Hands (dua graph) vs Holistic, klip yang sama
+
+    CPU diukur dengan time.process_time() (semua thread proses), jadi >100% berarti graph
+    memakai lebih dari satu core.
+    """
+    from inference_backend import read_frames
+    frames, _ = read_frames(path, limit)
+    print(f"{len(frames)} frame dari {path}")
+    print(f"{'mode':<10} {'p50 ms':>7} {'p95 ms':>7} {'CPU ms':>7} {'CPU':>6} {'wajah':>6} {'tangan':>7}")
+    for name, factory in (('dua graph', _two_graph), ('holistic', _holistic)):
+        face_mesh, hands, close = factory()
+        wall, faces, hand_count = [], 0, 0
+        cpu0, t_start = time.process_time(), time.perf_counter()
+        for frame in frames:
+            t0 = time.perf_counter()
+            face_results = face_mesh.process(frame)
+            hand_results = hands.process(frame)
+            wall.append(time.perf_counter() - t0)
+            faces += bool(face_results.multi_face_landmarks)
+            hand_count += len(hand_results.multi_hand_landmarks or [])
+        cpu = time.process_time() - cpu0
+        elapsed = time.perf_counter() - t_start
+        close()
+        wall = np.asarray(wall) * 1000
+        print(f"{name:<10} {np.percentile(wall, 50):>7.1f} {np.percentile(wall, 95):>7.1f} "
+              f"{cpu / len(frames) * 1000:>7.1f} {cpu / elapsed:>6.0%} {faces / len(frames):>6.0%} "
+              f"{hand_count / len(frames):>7.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bandingkan Holistic dengan FaceMesh + Hands")
+    parser.add_argument('video', help="klip rekaman")
+    parser.add_argument('--limit', type=int, help="jumlah frame maksimum")
+    args = parser.parse_args()
+    compare(args.video, args.limit)
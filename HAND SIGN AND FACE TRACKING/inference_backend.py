@@ -0,0 +1,360 @@
+import argparse
+import os
+from abc import ABC, abstractmethod
+import threading
+import time
+
+import numpy as np
+
+from landmark_results import ClassificationList, FaceResults, HandResults, LandmarkList
+
+# Backend default untuk semua aplikasi, bisa diganti lewat environment variable
+HAND_BACKEND = os.environ.get('HAND_BACKEND', 'legacy')
+FACE_BACKEND = os.environ.get('FACE_BACKEND', 'legacy')
+
+# Model Tasks API, unduh dari:
+# https://storage.googleapis.com/mediapipe-models/hand_landmarker/hand_landmarker/float16/latest/hand_landmarker.task
+# https://storage.googleapis.com/mediapipe-models/face_landmarker/face_landmarker/float16/latest/face_landmarker.task
+HAND_TASK_MODEL = os.environ.get('HAND_TASK_MODEL', 'models/hand_landmarker.task')
+FACE_TASK_MODEL = os.environ.get('FACE_TASK_MODEL', 'models/face_landmarker.task')
+
+# Cache hasil landmark di disk (path direktori, kosong = nonaktif); RESULT_CACHE_STRICT=1
+# tetap menjalankan model dan memverifikasi setiap hit
+RESULT_CACHE = os.environ.get('RESULT_CACHE')
+RESULT_CACHE_STRICT = os.environ.get('RESULT_CACHE_STRICT') == '1'
+
+
+class LegacyHandBackend:
+    """mp.solutions.hands.Hands apa adanya (process() sinkron)"""
+    name = 'legacy'
+
+    def __init__(self, static_image_mode=False, max_num_hands=2, model_complexity=1,
+                 min_detection_confidence=0.5, min_tracking_confidence=0.5):
+        import mediapipe as mp
+        self._hands = mp.solutions.hands.Hands(
+            static_image_mode=static_image_mode,
+            max_num_hands=max_num_hands,
+            model_complexity=model_complexity,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence)
+
+    def process(self, image_rgb):
+        return self._hands.process(image_rgb)
+
+    def close(self):
+        self._hands.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LegacyFaceBackend:
+    """mp.solutions.face_mesh.FaceMesh apa adanya (process() sinkron)"""
+    name = 'legacy'
+
+    def __init__(self, static_image_mode=False, max_num_faces=1, refine_landmarks=False,
+                 min_detection_confidence=0.5, min_tracking_confidence=0.5):
+        import mediapipe as mp
+        self._face_mesh = mp.solutions.face_mesh.FaceMesh(
+            static_image_mode=static_image_mode,
+            max_num_faces=max_num_faces,
+            refine_landmarks=refine_landmarks,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence)
+
+    def process(self, image_rgb):
+        return self._face_mesh.process(image_rgb)
+
+    def close(self):
+        self._face_mesh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _landmark_list(points):
+    return LandmarkList([(lm.x, lm.y, lm.z) for lm in points])
+
+
+def hand_result_to_legacy(result):
+    """HandLandmarkerResult (Tasks) -> struktur hasil Hands.process()"""
+    hands = [_landmark_list(points) for points in result.hand_landmarks]
+    labels = [ClassificationList(cats[0].category_name, cats[0].score) for cats in result.handedness]
+    return HandResults(hands, labels)
+
+
+def face_result_to_legacy(result):
+    """FaceLandmarkerResult (Tasks) -> struktur hasil FaceMesh.process()"""
+    return FaceResults([_landmark_list(points) for points in result.face_landmarks])
+
+
+TASKS_MODES = ('live_stream', 'video', 'image')
+
+
+class _TasksBackend(ABC):
+    """Dasar backend Tasks API
+
+    mode 'live_stream': process() mengirim frame dengan detect_async lalu langsung
+    mengembalikan hasil terbaru yang sudah selesai (biasanya milik frame sebelumnya), jadi
+    loop aplikasi tidak pernah menunggu inferensi. mode 'video': detect_for_video sinkron,
+    tracking antar frame. mode 'image': detect() sinkron, setiap frame dideteksi ulang
+    (setara static_image_mode=True).
+    """
+
+    def __init__(self, mode='live_stream', clock=time.perf_counter):
+        if mode not in TASKS_MODES:
+            raise ValueError(f"mode tidak dikenal: {mode} (pilihan: {', '.join(TASKS_MODES)})")
+        import mediapipe as mp
+        self._mp = mp
+        self.mode = mode
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._latest = self._empty()
+        self._last_ts = -1
+        self._submitted = {}  # timestamp_ms -> waktu kirim, untuk latensi hasil
+        self.latencies = []
+        self.sent = 0
+        self.completed = 0
+        self._landmarker = None
+
+    @abstractmethod
+    def _empty(self):
+        """Hasil kosong format lama (sebelum hasil pertama tiba)"""
+
+    @abstractmethod
+    def _convert(self, result):
+        """Hasil Tasks API -> format mp.solutions"""
+
+    def _running_mode(self):
+        running = self._mp.tasks.vision.RunningMode
+        return {'live_stream': running.LIVE_STREAM, 'video': running.VIDEO, 'image': running.IMAGE}[self.mode]
+
+    def _timestamp_ms(self):
+        # Tasks API mewajibkan timestamp yang naik terus
+        ts = max(int(self.clock() * 1000), self._last_ts + 1)
+        self._last_ts = ts
+        return ts
+
+    def _on_result(self, result, output_image, timestamp_ms):
+        converted = self._convert(result)
+        done = self.clock()
+        with self._lock:
+            self._latest = converted
+            self.completed += 1
+            sent_at = self._submitted.pop(timestamp_ms, None)
+            if sent_at is not None:
+                self.latencies.append(done - sent_at)
+            # Frame yang dibuang graph (backpressure) tidak pernah dapat callback
+            for ts in [ts for ts in self._submitted if ts < timestamp_ms]:
+                del self._submitted[ts]
+
+    def process(self, image_rgb):
+        image = self._mp.Image(image_format=self._mp.ImageFormat.SRGB, data=np.ascontiguousarray(image_rgb))
+        self.sent += 1
+        if self.mode != 'live_stream':
+            start = self.clock()
+            if self.mode == 'image':
+                result = self._convert(self._landmarker.detect(image))
+            else:
+                result = self._convert(self._landmarker.detect_for_video(image, self._timestamp_ms()))
+            self.latencies.append(self.clock() - start)
+            self.completed += 1
+            self._latest = result
+            return result
+        ts = self._timestamp_ms()
+        with self._lock:
+            self._submitted[ts] = self.clock()
+        self._landmarker.detect_async(image, ts)
+        return self.latest()
+
+    def latest(self):
+        with self._lock:
+            return self._latest
+
+    def close(self):
+        if self._landmarker is not None:
+            self._landmarker.close()
+            self._landmarker = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TasksHandBackend(_TasksBackend):
+    """HandLandmarker (Tasks API) dengan parameter yang sama seperti Hands()"""
+    name = 'tasks'
+
+    def __init__(self, static_image_mode=False, max_num_hands=2, model_complexity=None,
+                 min_detection_confidence=0.5, min_tracking_confidence=0.5,
+                 model_path=None, mode='live_stream', clock=time.perf_counter):
+        # model_complexity tidak ada di Tasks API (model ditentukan oleh file .task)
+        super().__init__('image' if static_image_mode else mode, clock)
+        vision = self._mp.tasks.vision
+        options = vision.HandLandmarkerOptions(
+            base_options=self._mp.tasks.BaseOptions(model_asset_path=model_path or HAND_TASK_MODEL),
+            running_mode=self._running_mode(),
+            num_hands=max_num_hands,
+            min_hand_detection_confidence=min_detection_confidence,
+            min_hand_presence_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+            result_callback=self._on_result if self.mode == 'live_stream' else None)
+        self._landmarker = vision.HandLandmarker.create_from_options(options)
+
+    def _empty(self):
+        return HandResults()
+
+    def _convert(self, result):
+        return hand_result_to_legacy(result)
+
+
+class TasksFaceBackend(_TasksBackend):
+    """FaceLandmarker (Tasks API) dengan parameter yang sama seperti FaceMesh()"""
+    name = 'tasks'
+
+    def __init__(self, static_image_mode=False, max_num_faces=1, refine_landmarks=True,
+                 min_detection_confidence=0.5, min_tracking_confidence=0.5,
+                 model_path=None, mode='live_stream', clock=time.perf_counter):
+        # FaceLandmarker selalu menghasilkan 478 titik (setara refine_landmarks=True)
+        super().__init__('image' if static_image_mode else mode, clock)
+        vision = self._mp.tasks.vision
+        options = vision.FaceLandmarkerOptions(
+            base_options=self._mp.tasks.BaseOptions(model_asset_path=model_path or FACE_TASK_MODEL),
+            running_mode=self._running_mode(),
+            num_faces=max_num_faces,
+            min_face_detection_confidence=min_detection_confidence,
+            min_face_presence_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+            result_callback=self._on_result if self.mode == 'live_stream' else None)
+        self._landmarker = vision.FaceLandmarker.create_from_options(options)
+
+    def _empty(self):
+        return FaceResults()
+
+    def _convert(self, result):
+        return face_result_to_legacy(result)
+
+
+def _onnx_hand_backend(**settings):
+    # Diimpor saat dipakai saja agar onnxruntime tetap opsional
+    from onnx_backend import OnnxHandBackend
+    from thread_scheduler import get_scheduler
+    # Jumlah thread stage 'inference' dari THREAD_CONFIG, bila tidak diberikan langsung
+    threads = get_scheduler().threads('inference', None)
+    if threads is not None:
+        settings.setdefault('threads', threads)
+    return OnnxHandBackend(**settings)
+
+
+HAND_BACKENDS = {
+    'legacy': LegacyHandBackend,
+    'tasks': TasksHandBackend,
+    'tasks-video': lambda **kw: TasksHandBackend(mode='video', **kw),
+    'onnx': _onnx_hand_backend,
+}
+FACE_BACKENDS = {
+    'legacy': LegacyFaceBackend,
+    'tasks': TasksFaceBackend,
+    'tasks-video': lambda **kw: TasksFaceBackend(mode='video', **kw),
+}
+
+
+def _with_cache(backend, result_kind, kind, settings, cache, model=None):
+    """Bungkus dengan CachedBackend bila cache aktif (cache: None = RESULT_CACHE, False = mati)"""
+    directory = RESULT_CACHE if cache is None else cache
+    # live_stream mengembalikan hasil frame sebelumnya tergantung timing, dan smoothing 'tasks-video'
+    # bergantung jarak timestamp jam dinding antar frame: keduanya tidak bisa diulang dari cache.
+    # Dengan static_image_mode keduanya jalan di mode image (detect per frame) dan aman di-cache.
+    if not directory or (kind.startswith('tasks') and not settings.get('static_image_mode', False)):
+        return backend
+    from result_cache import CachedBackend, config_digest, open_cache
+    config = config_digest(result_kind, kind, dict(settings, model=model))
+    return CachedBackend(backend, open_cache(directory), result_kind, config,
+                         chained=not settings.get('static_image_mode', False), strict=RESULT_CACHE_STRICT)
+
+
+def create_hand_backend(kind=None, cache=None, **settings):
+    """Pengganti mp.solutions.hands.Hands(**settings); kind default dari HAND_BACKEND"""
+    kind = kind or HAND_BACKEND
+    if kind not in HAND_BACKENDS:
+        raise ValueError(f"backend tangan tidak dikenal: {kind} (pilihan: {', '.join(HAND_BACKENDS)})")
+    model = HAND_TASK_MODEL if kind.startswith('tasks') else None
+    return _with_cache(HAND_BACKENDS[kind](**settings), 'hand', kind, settings, cache, model)
+
+
+def create_face_backend(kind=None, cache=None, **settings):
+    """Pengganti mp.solutions.face_mesh.FaceMesh(**settings); kind default dari FACE_BACKEND"""
+    kind = kind or FACE_BACKEND
+    if kind not in FACE_BACKENDS:
+        raise ValueError(f"backend wajah tidak dikenal: {kind} (pilihan: {', '.join(FACE_BACKENDS)})")
+    model = FACE_TASK_MODEL if kind.startswith('tasks') else None
+    return _with_cache(FACE_BACKENDS[kind](**settings), 'face', kind, settings, cache, model)
+
+
+def read_frames(path, limit=None):
+    """Baca klip rekaman sekali ke memori (RGB) agar semua backend mendapat input yang sama"""
+    import cv2
+    cap = cv2.VideoCapture(path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    frames = []
+    while limit is None or len(frames) < limit:
+        success, frame = cap.read()
+        if not success:
+            break
+        frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    cap.release()
+    return frames, fps
+
+
+def benchmark(path, kinds=('legacy', 'tasks-video', 'tasks'), max_hands=2, pace=True, limit=None):
+    """Bandingkan waktu blok per frame, throughput dan latensi hasil pada klip yang sama
+
+    pace=True memberi frame sesuai fps klip seperti kamera sungguhan; tanpa pace frame
+    dikirim secepat mungkin (backend async akan membuang frame saat sibuk).
+    """
+    frames, fps = read_frames(path, limit)
+    print(f"{len(frames)} frame dari {path} ({fps:.0f} FPS, pace={'ya' if pace else 'tidak'})")
+    print(f"{'backend':<12} {'blok ms':>8} {'p95':>7} {'FPS':>7} {'hasil':>6} {'latensi ms':>11} {'tangan':>7}")
+    for kind in kinds:
+        backend = create_hand_backend(kind, cache=False, max_num_hands=max_hands, model_complexity=0)
+        blocked = []
+        hands_seen = 0
+        start = time.perf_counter()
+        for i, frame in enumerate(frames):
+            if pace:
+                wait = start + i / fps - time.perf_counter()
+                if wait > 0:
+                    time.sleep(wait)
+            t0 = time.perf_counter()
+            results = backend.process(frame)
+            blocked.append(time.perf_counter() - t0)
+            hands_seen += len(results.multi_hand_landmarks or [])
+        wall = time.perf_counter() - start
+
+        # Legacy selalu sinkron: latensi hasil = waktu blok
+        latencies = getattr(backend, 'latencies', None) or blocked
+        completed = getattr(backend, 'completed', len(frames))
+        backend.close()
+        blocked = np.asarray(blocked) * 1000
+        print(f"{kind:<12} {blocked.mean():>8.2f} {np.percentile(blocked, 95):>7.2f} "
+              f"{len(frames) / wall:>7.1f} {completed:>6} {np.mean(latencies) * 1000:>11.2f} "
+              f"{hands_seen / len(frames):>7.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark backend inferensi tangan")
+    parser.add_argument('video', help="klip rekaman (mis. dari kamera yang sama)")
+    parser.add_argument('--backends', nargs='+', default=['legacy', 'tasks-video', 'tasks'])
+    parser.add_argument('--max-hands', type=int, default=2)
+    parser.add_argument('--no-pace', action='store_true', help="kirim frame secepat mungkin")
+    parser.add_argument('--limit', type=int, help="jumlah frame maksimum")
+    args = parser.parse_args()
+    benchmark(args.video, args.backends, args.max_hands, not args.no_pace, args.limit)
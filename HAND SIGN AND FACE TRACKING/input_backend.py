@@ -0,0 +1,253 @@
+import argparse
+import math
+import os
+import time
+
+# Backend default untuk cursor/scroll, bisa diganti lewat environment variable
+INPUT_BACKEND = os.environ.get('INPUT_BACKEND', 'auto')
+
+# Tombol X11 1/2/3; satu unit scroll = satu klik roda (tombol 4/5), sama dengan pyautogui.scroll()
+BUTTONS = ('left', 'middle', 'right')
+
+
+class PyAutoGuiBackend:
+    """Lewat pyautogui; pause=True mempertahankan sleep pyautogui.PAUSE (0.1 s) tiap panggilan
+
+    Pause diatur per panggilan (_pause), bukan lewat pyautogui.PAUSE global, jadi tidak
+    mengubah perilaku kode lain yang memakai pyautogui di proses yang sama.
+    """
+    name = 'pyautogui'
+
+    def __init__(self, pause=False, failsafe=False):
+        import pyautogui
+        self._gui = pyautogui
+        self._pause = pause
+        # Fail-safe pyautogui melempar FailSafeException bila kursor ada di sudut layar. Kursor di
+        # sini digerakkan tangan dan wajar sampai ke sudut; exception itu akan menghentikan
+        # aplikasi, dan setiap gerakan keluar dari sudut juga ditolak. Aplikasi berhenti lewat
+        # tombol keyboard-nya sendiri, jadi fail-safe dimatikan (global, tidak ada opsi per panggilan).
+        pyautogui.FAILSAFE = failsafe
+        self._size = tuple(pyautogui.size())
+
+    def size(self):
+        return self._size
+
+    def move(self, x, y):
+        self._gui.moveTo(x, y, duration=0, _pause=self._pause)
+
+    def click(self, button='left'):
+        self._gui.click(button=button, _pause=self._pause)
+
+    def scroll(self, units):
+        self._gui.scroll(units, _pause=self._pause)
+
+    def close(self):
+        pass
+
+
+class XlibBackend:
+    """Event XTest langsung ke server X: satu request per aksi, tanpa sleep, tanpa query layar
+
+    Request hanya di-flush (tidak menunggu balasan server), jadi move() tidak blocking.
+    """
+    name = 'xlib'
+
+    def __init__(self, display=None):
+        from Xlib import X, display as xdisplay
+        from Xlib.ext import xtest
+        self._X = X
+        self._fake_input = xtest.fake_input
+        self._display = xdisplay.Display(display)
+        screen = self._display.screen()
+        self._size = (screen.width_in_pixels, screen.height_in_pixels)
+
+    def size(self):
+        return self._size
+
+    def move(self, x, y):
+        self._fake_input(self._display, self._X.MotionNotify, x=int(x), y=int(y))
+        self._display.flush()
+
+    def _press(self, button, count=1):
+        for _ in range(count):
+            self._fake_input(self._display, self._X.ButtonPress, button)
+            self._fake_input(self._display, self._X.ButtonRelease, button)
+        self._display.flush()
+
+    def click(self, button='left'):
+        self._press(BUTTONS.index(button) + 1)
+
+    def scroll(self, units):
+        if units:
+            self._press(4 if units > 0 else 5, abs(int(units)))
+
+    def close(self):
+        self._display.close()
+
+
+class UinputBackend:
+    """Perangkat pointer virtual lewat /dev/uinput (python-evdev); jalan juga di Wayland/konsol
+
+    Posisi absolut dipetakan ke ukuran layar yang diberikan; scroll dikirim sebagai REL_WHEEL.
+    Butuh izin tulis ke /dev/uinput (grup input atau aturan udev).
+    """
+    name = 'uinput'
+
+    def __init__(self, screen_size=(1920, 1080), device_name='hand-tracking-pointer'):
+        from evdev import AbsInfo, UInput, ecodes
+        self._e = ecodes
+        self._size = tuple(screen_size)
+        w, h = self._size
+        capabilities = {
+            ecodes.EV_KEY: [ecodes.BTN_LEFT, ecodes.BTN_MIDDLE, ecodes.BTN_RIGHT],
+            ecodes.EV_ABS: [(ecodes.ABS_X, AbsInfo(0, 0, w - 1, 0, 0, 0)),
+                            (ecodes.ABS_Y, AbsInfo(0, 0, h - 1, 0, 0, 0))],
+            ecodes.EV_REL: [ecodes.REL_WHEEL],
+        }
+        self._buttons = {'left': ecodes.BTN_LEFT, 'middle': ecodes.BTN_MIDDLE, 'right': ecodes.BTN_RIGHT}
+        self._device = UInput(capabilities, name=device_name)
+
+    def size(self):
+        return self._size
+
+    def move(self, x, y):
+        e = self._e
+        self._device.write(e.EV_ABS, e.ABS_X, int(x))
+        self._device.write(e.EV_ABS, e.ABS_Y, int(y))
+        self._device.syn()
+
+    def click(self, button='left'):
+        e, code = self._e, self._buttons[button]
+        self._device.write(e.EV_KEY, code, 1)
+        self._device.syn()
+        self._device.write(e.EV_KEY, code, 0)
+        self._device.syn()
+
+    def scroll(self, units):
+        if units:
+            self._device.write(self._e.EV_REL, self._e.REL_WHEEL, int(units))
+            self._device.syn()
+
+    def close(self):
+        self._device.close()
+
+
+class FakeInputBackend:
+    """Backend tanpa efek samping: catat (waktu, jenis, nilai) untuk uji dan pengukuran
+
+    call_cost (detik) meniru biaya blocking backend sungguhan per panggilan, mis. hasil
+    benchmark() untuk pyautogui, agar pengukuran memperhitungkan backend yang lambat.
+    """
+    name = 'fake'
+
+    def __init__(self, screen_size=(1920, 1080), clock=time.perf_counter, call_cost=0.0):
+        self._size = tuple(screen_size)
+        self.clock = clock
+        self.call_cost = call_cost
+        self.events = []
+        self.position = (0, 0)
+
+    def _record(self, kind, value):
+        self.events.append((self.clock(), kind, value))
+        if self.call_cost:
+            time.sleep(self.call_cost)
+
+    def size(self):
+        return self._size
+
+    def move(self, x, y):
+        self.position = (int(x), int(y))
+        self._record('move', self.position)
+
+    def click(self, button='left'):
+        self._record('click', button)
+
+    def scroll(self, units):
+        self._record('scroll', units)
+
+    def scrolls(self):
+        """[(waktu, unit)], format yang dipakai scroll_engine.smoothness()"""
+        return [(t, value) for t, kind, value in self.events if kind == 'scroll']
+
+    def close(self):
+        pass
+
+
+INPUT_BACKENDS = {
+    'pyautogui': PyAutoGuiBackend,
+    'xlib': XlibBackend,
+    'uinput': UinputBackend,
+    'fake': FakeInputBackend,
+}
+
+
+def create_input_backend(kind=None, **settings):
+    """Backend input; kind default dari INPUT_BACKEND
+
+    'auto' memakai XTest langsung bila ada sesi X dan python-xlib terpasang, selain itu pyautogui
+    tanpa pause. Parameter tiap backend berbeda, jadi settings hanya untuk backend eksplisit.
+    """
+    kind = kind or INPUT_BACKEND
+    if kind == 'auto':
+        if settings:
+            raise ValueError(f"backend 'auto' tidak menerima parameter: {', '.join(settings)}")
+        if os.environ.get('DISPLAY'):
+            try:
+                return XlibBackend()
+            except Exception:
+                pass
+        return PyAutoGuiBackend()
+    if kind not in INPUT_BACKENDS:
+        raise ValueError(f"backend input tidak dikenal: {kind} (pilihan: auto, {', '.join(INPUT_BACKENDS)})")
+    return INPUT_BACKENDS[kind](**settings)
+
+
+def benchmark(kinds=('fake', 'pyautogui-nopause', 'xlib', 'uinput', 'pyautogui'), seconds=1.0,
+              with_scroll=False):
+    """Panggilan move() per detik (lingkaran kecil di tengah layar) untuk setiap backend
+
+    'pyautogui' = jalur lama apa adanya (sleep PAUSE per panggilan); 'pyautogui-nopause' =
+    backend aplikasi sekarang, memisahkan biaya sleep dari biaya abstraksinya. Scroll benar-benar menggulir jendela di bawah pointer,
+    jadi hanya diukur dengan with_scroll=True.
+    """
+    print(f"{'backend':<18} {'move/s':>10} {'us/move':>9} {'scroll/s':>10}")
+    for kind in kinds:
+        try:
+            if kind == 'pyautogui':
+                backend = PyAutoGuiBackend(pause=True)
+            elif kind == 'pyautogui-nopause':
+                backend = PyAutoGuiBackend(pause=False)
+            else:
+                backend = create_input_backend(kind)
+        except Exception as exc:
+            print(f"{kind:<18} tidak tersedia: {exc}")
+            continue
+        w, h = backend.size()
+        calls = 0
+        t0 = time.perf_counter()
+        while time.perf_counter() - t0 < seconds:
+            angle = calls * 0.1
+            backend.move(w / 2 + 50 * math.cos(angle), h / 2 + 50 * math.sin(angle))
+            calls += 1
+        move_rate = calls / (time.perf_counter() - t0)
+
+        scroll_text = '-'
+        if with_scroll:
+            calls = 0
+            t0 = time.perf_counter()
+            while time.perf_counter() - t0 < seconds:
+                backend.scroll(1 if calls % 2 else -1)
+                calls += 1
+            scroll_text = f"{calls / (time.perf_counter() - t0):.0f}"
+        backend.close()
+        print(f"{kind:<18} {move_rate:>10.0f} {1e6 / move_rate:>9.1f} {scroll_text:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Microbenchmark panggilan backend input per detik")
+    parser.add_argument('--backends', nargs='+',
+                        default=['fake', 'pyautogui-nopause', 'xlib', 'uinput', 'pyautogui'])
+    parser.add_argument('--seconds', type=float, default=1.0)
+    parser.add_argument('--with-scroll', action='store_true')
+    args = parser.parse_args()
+    benchmark(args.backends, args.seconds, args.with_scroll)
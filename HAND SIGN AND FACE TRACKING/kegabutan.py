@@ -1,15 +1,19 @@
 import cv2
+import math
 import mediapipe as mp
 import numpy as np
 import time
-from scipy.spatial.transform import Rotation as R
+from frame_state import HandFrame
+from hand_tracker import HandTracker
+from inference_backend import create_hand_backend
+from mjpeg_capture import open_camera
 
 class SpatialAutoCube:
     def __init__(self):
         # 1. Inisialisasi MediaPipe Hands
         self.mp_hands = mp.solutions.hands
         # Model complexity 0 untuk performa maksimal 60 FPS
-        self.hands = self.mp_hands.Hands(
+        self.hands = create_hand_backend(
             max_num_hands=2,
             model_complexity=0, 
             min_detection_confidence=0.8,
@@ -46,144 +50,194 @@ class SpatialAutoCube:
         # Parameter Manipulasi
         self.smoothing = 0.15 # Kehalusan LERP
         self.is_manipulating = False # State apakah tangan sedang memegang
+        # Label Left/Right diambil dari voting per track, tidak terbalik saat tangan bersilangan
+        self.tracker = HandTracker(max_distance=200, max_missed=5)
+
+        # --- BUFFER PER FRAME (dialokasikan sekali, ditimpa tiap frame) ---
+        self.frame = HandFrame(max_hands=2)
+        self._target_pos = np.zeros(3, dtype=np.float32)
+        self._target_scale = np.ones(3, dtype=np.float32)
+        self._delta = np.zeros(3, dtype=np.float32)
+        self._rot = np.eye(3, dtype=np.float32)
+        self._v_deformed = np.zeros_like(self.base_vertices)
+        self._v_final = np.zeros_like(self.base_vertices)
+        self._pts2d = np.zeros((len(self.base_vertices), 2), dtype=np.float32)
+        self._principal = self.cam_matrix[:2, 2].copy()
+        self._pts_int = np.zeros((len(self.base_vertices), 2), dtype=np.int32)
+        self._front, self._back = [self._pts_int[:4]], [self._pts_int[4:]]
+        # Rusuk sebagai array (12, 2, 2) untuk satu panggilan cv2.polylines
+        self._edge_idx = np.array(self.edges, dtype=np.intp)
+        self._edge_pts = np.zeros((len(self.edges), 2, 2), dtype=np.int32)
+        self._edge_lines = list(self._edge_pts)
+        self._overlay = None
+        # Tabel warna pelangi untuk 180 hue, menggantikan konversi HSV satu pixel per frame
+        hsv = np.full((1, 180, 3), 255, dtype=np.uint8)
+        hsv[0, :, 0] = np.arange(180)
+        self._rainbow = [tuple(int(c) for c in bgr) for bgr in cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)[0]]
 
     def lerp(self, start, end, t):
         """Interpolasi Linear untuk gerakan halus"""
         return start + t * (end - start)
 
+    def lerp_into(self, current, target, t):
+        """LERP in-place: current += t * (target - current) tanpa array sementara"""
+        np.subtract(target, current, out=self._delta)
+        self._delta *= t
+        current += self._delta
+
     def get_rainbow_color(self, angle):
         """Menghasilkan warna BGR Pelangi yang berubah sesuai sudut"""
         hue = int(angle % 180) # Gunakan modulo 180 untuk siklus HSV penuh
-        # Membuat image satu pixel HSV untuk diconvert ke BGR
-        hsv = np.uint8([[[hue, 255, 255]]])
-        bgr = cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)[0][0]
-        # Konversi array numpy int64 ke standard python int tuple
-        return (int(bgr[0]), int(bgr[1]), int(bgr[2]))
+        # Tuple python int dari tabel yang dihitung sekali di __init__
+        return self._rainbow[hue]
 
     def draw_3d_cube(self, img, points_2d, color):
         """Menggambar rusuk kubus berdasarkan proyeksi titik 2D"""
-        p = points_2d.astype(int)
+        p = self._pts_int
+        np.copyto(p, points_2d, casting='unsafe')
         
         # Gambar sisi transparan (overlay) agar terlihat hologram
-        overlay = img.copy()
-        cv2.fillPoly(overlay, [p[:4]], color) # Sisi Depan
-        cv2.fillPoly(overlay, [p[4:]], color) # Sisi Belakang
+        if self._overlay is None or self._overlay.shape != img.shape:
+            self._overlay = np.empty_like(img)
+        overlay = self._overlay
+        np.copyto(overlay, img)
+        cv2.fillPoly(overlay, self._front, color) # Sisi Depan
+        cv2.fillPoly(overlay, self._back, color) # Sisi Belakang
         # Gabungkan overlay transparan
         cv2.addWeighted(overlay, 0.3, img, 0.7, 0, img)
         
-        # Gambar rusuk wireframe putih terang agar tajam
-        for edge in self.edges:
-            p1 = tuple(p[edge[0]])
-            p2 = tuple(p[edge[1]])
-            cv2.line(img, p1, p2, (255, 255, 255), 3)
-
-    def run(self):
-        # Setup Kamera 60 FPS
-        cap = cv2.VideoCapture(0)
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.W)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.H)
-        cap.set(cv2.CAP_PROP_FPS, 60)
+        # Gambar rusuk wireframe putih terang agar tajam (12 garis dalam satu panggilan)
+        # mode='clip': dengan 'raise' (default) numpy menulis ke buffer sementara dulu, bukan ke out
+        p.take(self._edge_idx, axis=0, out=self._edge_pts, mode='clip')
+        cv2.polylines(img, self._edge_lines, False, (255, 255, 255), 3)
+
+    def get_hand_info(self, results):
+        """Ambil label, pusat, rentangan dan koordinat ujung jari setiap tangan
+
+        Hasilnya HandFrame yang dipakai ulang: tips = koordinat ujung jari, center = pusat
+        tangan, span = rentangan jempol-kelingking (untuk mendeteksi tarikan).
+        """
+        hand_info = self.frame.fill(results, self.W, self.H)
+        tracks = self.tracker.update(hand_info.active_centers(), hand_info.labels)
+        for h, track in zip(hand_info, tracks):
+            h.track = track
+            h.label = track.label
+        return hand_info
+
+    def update_state(self, hand_info):
+        """Perbarui posisi, skala dan sudut kubus dari data tangan satu frame"""
+        # --- LOGIKA INTERAKSI SPASIAL (MANUAL/AUTO) ---
+        target_pos = self._target_pos
+        target_pos[:] = self.curr_pos
+        target_scale = self._target_scale
+        target_scale.fill(1.0) # Default scale (kotak sempurna)
+
+        if len(hand_info) == 2:
+            # 2 TANGAN TERDETEKSI: MASUK MODE MANUAL CONTROL
+            self.is_manipulating = True
+            h_l = hand_info[1] if hand_info[1].label == 'Left' and hand_info[0].label != 'Left' else hand_info[0]
+            h_r = hand_info[0] if hand_info[0].label == 'Right' else hand_info[1]
+            lx, ly = int(h_l.center[0]), int(h_l.center[1])
+            rx, ry = int(h_r.center[0]), int(h_r.center[1])
+            mid_x, mid_y = (lx + rx) // 2, (ly + ry) // 2
+            
+            # 1. POSISI & DEPTH (KELUAR-MASUK)
+            # Map posisi Y tangan ke kedalaman Z (Maju-Mundur)
+            normalized_y = mid_y / self.H
+            target_pos[2] = 0.5 + (1.5 * normalized_y) # Depth range 0.5m - 2.0m
+            
+            # Update posisi X, Y mengikuti tangan
+            target_pos[0] = (mid_x - self.W/2) / self.W * self.curr_pos[2]
+            target_pos[1] = (mid_y - self.H/2) / self.H * self.curr_pos[2]
+
+            # 2. STRETCHING (PENGENCANGAN KOTAK JADI BALOK)
+            # Tangan kanan kontrol Skala X, tangan kiri kontrol Skala Y
+            s_x = max(0.2, h_r.span / 180.0)
+            s_y = max(0.2, h_l.span / 180.0)
+            # Z-scale otomatis agar volume terlihat konsisten (tidak meledak)
+            s_z = 1.0 / (s_x * s_y + 0.1) # Tambah small value agar tidak div by zero
+            target_scale[0], target_scale[1], target_scale[2] = s_x, s_y, s_z
+
+            # 3. MANUAL ROTATION 360 DERAJAT
+            # Hitung sudut orientasi tangan kiri ke tangan kanan
+            self.curr_angle = math.degrees(math.atan2(ry - ly, rx - lx)) # Z-axis (Roll)
+            
+        else:
+            # TANGAN DILEPAS: MASUK MODE AUTO-ROTATE
+            # (target_scale sudah kembali ke kotak sempurna)
+            self.is_manipulating = False
+
+        # --- LOGIKA AUTO-ROTATE (360 Derajat Pelangi) ---
+        if not self.is_manipulating:
+            self.auto_angle += 2.0 # Kecepatan putar otomatis (2 drajat per frame)
+            self.curr_angle = self.auto_angle
+        
+        # --- SMOOTHING (LERP) UNTUK SEMUA STATE ---
+        self.lerp_into(self.curr_pos, target_pos, self.smoothing)
+        self.lerp_into(self.curr_scale, target_scale, self.smoothing)
+
+    def project_cube(self):
+        """Deformasi, rotasi dan proyeksi 8 titik kubus ke layar 2D"""
+        # --- TRANSFORMASI MESH 3D ---
+        # 1. Terapkan Scaling/Stretching ke 8 titik kubus dasar
+        v_deformed = self._v_deformed
+        np.multiply(self.base_vertices, self.curr_scale, out=v_deformed)
+        
+        # 2. Terapkan Rotasi 360 derajat (Manual atau Auto) di sumbu Z
+        theta = math.radians(self.curr_angle)
+        c, s = math.cos(theta), math.sin(theta)
+        r = self._rot
+        r[0, 0], r[0, 1], r[1, 0], r[1, 1] = c, -s, s, c
+        v_final = self._v_final
+        np.dot(v_deformed, r.T, out=v_final)
+        
+        # 3. Terapkan Posisi (Keluar-Masuk & Geser)
+        v_final += self.curr_pos
+        
+        # 4. Proyeksikan titik-titik 3D ke layar 2D (pinhole tanpa distorsi, rvec = tvec = 0,
+        #    sama dengan cv2.projectPoints tapi menulis ke buffer yang sama setiap frame)
+        pts2d = self._pts2d
+        np.divide(v_final[:, :2], v_final[:, 2:], out=pts2d)
+        pts2d *= self.cam_matrix[0, 0]
+        pts2d += self._principal
+        return pts2d
+
+    def run(self, recorder=None, infer_reduce=1):
+        # Setup Kamera 60 FPS (MJPEG); decode + mirroring di thread pool,
+        # inferensi memakai frame 1/infer_reduce (landmark ternormalisasi, tetap dipetakan ke W x H).
+        # Default frame penuh; 2 lebih cepat, tapi landmark tangan jauh/kecil jadi lebih kasar
+        cap = open_camera(0, self.W, self.H, 60, reduce=infer_reduce, flip=True)
 
         p_time = 0
 
         while cap.isOpened():
-            success, img = cap.read()
+            success, img, small = cap.read_pair()
             if not success: break
             
-            # Mirroring & Konversi warna
-            img = cv2.flip(img, 1)
-            img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+            # Konversi warna (mirroring sudah dilakukan di thread decode)
+            img_rgb = cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
             
             # Proses deteksi tangan
             results = self.hands.process(img_rgb)
+            if recorder is not None:
+                recorder.record(time.time(), results, frame_size=(self.W, self.H))
             
-            hand_info = []
-            if results.multi_hand_landmarks:
-                for hand_idx, hand_lms in enumerate(results.multi_hand_landmarks):
-                    # Data tangan: Label (Left/Right) & Koordinat Ujung Jari
-                    label = results.multi_handedness[hand_idx].classification[0].label
-                    tips = [hand_lms.landmark[i] for i in [4, 8, 12, 16, 20]]
-                    coords_2d = [(int(t.x * self.W), int(t.y * self.H)) for t in tips]
-                    
-                    # Hitung pusat tangan & rentangan jari (untuk mendeteksi tarikan)
-                    center_2d = np.mean(coords_2d, axis=0).astype(int)
-                    span_2d = np.hypot(coords_2d[0][0] - coords_2d[4][0], coords_2d[0][1] - coords_2d[4][1])
-                    
-                    hand_info.append({'label': label, 'center': center_2d, 'span': span_2d, 'coords': coords_2d})
-
-            # --- LOGIKA INTERAKSI SPASIAL (MANUAL/AUTO) ---
-            target_pos = self.curr_pos.copy()
-            target_scale = np.array([1.0, 1.0, 1.0]) # Default scale (kotak sempurna)
-
-            if len(hand_info) == 2:
-                # 2 TANGAN TERDETEKSI: MASUK MODE MANUAL CONTROL
-                self.is_manipulating = True
-                h_l = next((h for h in hand_info if h['label'] == 'Left'), hand_info[0])
-                h_r = next((h for h in hand_info if h['label'] == 'Right'), hand_info[1])
-                c_l, c_r = h_l['center'], h_r['center']
-                mid_2d = (c_l + c_r) // 2
-                
-                # 1. POSISI & DEPTH (KELUAR-MASUK)
-                # Map posisi Y tangan ke kedalaman Z (Maju-Mundur)
-                normalized_y = mid_2d[1] / self.H
-                target_pos[2] = 0.5 + (1.5 * normalized_y) # Depth range 0.5m - 2.0m
-                
-                # Update posisi X, Y mengikuti tangan
-                target_pos[0] = (mid_2d[0] - self.W/2) / self.W * self.curr_pos[2]
-                target_pos[1] = (mid_2d[1] - self.H/2) / self.H * self.curr_pos[2]
-
-                # 2. STRETCHING (PENGENCANGAN KOTAK JADI BALOK)
-                # Tangan kanan kontrol Skala X, tangan kiri kontrol Skala Y
-                s_x = max(0.2, h_r['span'] / 180.0)
-                s_y = max(0.2, h_l['span'] / 180.0)
-                # Z-scale otomatis agar volume terlihat konsisten (tidak meledak)
-                s_z = 1.0 / (s_x * s_y + 0.1) # Tambah small value agar tidak div by zero
-                target_scale = np.array([s_x, s_y, s_z])
-
-                # 3. MANUAL ROTATION 360 DERAJAT
-                # Hitung sudut orientasi tangan kiri ke tangan kanan
-                vec = c_r - c_l
-                self.curr_angle = np.degrees(np.arctan2(vec[1], vec[0])) # Z-axis (Roll)
-                
+            hand_info = self.get_hand_info(results)
+            self.update_state(hand_info)
+
+            if self.is_manipulating:
                 # Visualisasi kursor jari neon (Cyan) saat memegang
                 for h in hand_info:
-                    for pt in h['coords']:
-                        cv2.circle(img, pt, 5, (255, 255, 255), -1)
-                        cv2.circle(img, pt, 8, (0, 255, 255), 2)
-            else:
-                # TANGAN DILEPAS: MASUK MODE AUTO-ROTATE
-                self.is_manipulating = False
-                # Kembali ke bentuk kotak sempurna
-                target_scale = np.array([1.0, 1.0, 1.0])
-
-            # --- LOGIKA AUTO-ROTATE (360 Derajat Pelangi) ---
-            if not self.is_manipulating:
-                self.auto_angle += 2.0 # Kecepatan putar otomatis (2 drajat per frame)
-                self.curr_angle = self.auto_angle
-            
-            # --- SMOOTHING (LERP) UNTUK SEMUA STATE ---
-            self.curr_pos = self.lerp(self.curr_pos, target_pos, self.smoothing)
-            self.curr_scale = self.lerp(self.curr_scale, target_scale, self.smoothing)
+                    for x, y in h.tips.tolist():
+                        cv2.circle(img, (x, y), 5, (255, 255, 255), -1)
+                        cv2.circle(img, (x, y), 8, (0, 255, 255), 2)
+
+            pts2d = self.project_cube()
 
-            # --- TRANSFORMASI MESH 3D ---
-            # 1. Terapkan Scaling/Stretching ke 8 titik kubus dasar
-            v_deformed = self.base_vertices * self.curr_scale
-            
-            # 2. Terapkan Rotasi 360 derajat (Manual atau Auto)
-            r = R.from_euler('z', self.curr_angle, degrees=True).as_matrix()
-            v_rotated = np.dot(v_deformed, r.T)
-            
-            # 3. Terapkan Posisi (Keluar-Masuk & Geser)
-            v_final = v_rotated + self.curr_pos
-            
-            # 4. Proyeksikan titik-titik 3D yang sudah dideformasi ke layar 2D
-            pts2d, _ = cv2.projectPoints(v_final, np.zeros((3,1)), np.zeros((3,1)), 
-                                         self.cam_matrix, np.zeros((4,1)))
-            
             # --- RENDER KOTAK BERWARNA (PELANGI DINAMIS) ---
             # Dapatkan warna pelangi sesuai sudut rotasi saat ini
             dynamic_color = self.get_rainbow_color(self.curr_angle)
-            self.draw_3d_cube(img, pts2d.squeeze(), dynamic_color)
+            self.draw_3d_cube(img, pts2d, dynamic_color)
 
             # --- UI & FPS ---
             curr_time = time.time()
@@ -206,6 +260,7 @@ class SpatialAutoCube:
                 break
 
         cap.release()
+        print(cap.report())
         cv2.destroyAllWindows()
 
 if __name__ == "__main__":
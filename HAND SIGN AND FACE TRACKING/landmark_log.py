@@ -0,0 +1,303 @@
+import argparse
+import bisect
+import os
+import struct
+import tempfile
+import time
+
+import numpy as np
+
+from landmark_results import FACE_POINTS, HAND_POINTS, faces_to_array, hands_to_array
+
+# Format file (little endian, append-only):
+#   header  : MAGIC, versi, jumlah titik per frame, offset[3] f32, scale[3] f32
+#   chunk*  : CHUNK_MAGIC, n_frame, tipe delta, t_awal, t_akhir, lalu
+#             timestamps f64[n], valid u8[n] (pad 8), keyframe i16[P,3], delta int8/int16[n-1,P,3]
+#   footer  : tabel index (offset, n_frame, t_awal, t_akhir) + INDEX_MAGIC, jumlah, offset tabel
+# Footer ditulis saat close(); kalau tidak ada (crash), index dibangun ulang dengan scan chunk.
+MAGIC = b'LMKLOG\x00\x01'
+CHUNK_MAGIC = b'CHNK'
+INDEX_MAGIC = b'LMKIDX\x00\x01'
+HEADER = struct.Struct('<8sHH6f4x')
+CHUNK_HEADER = struct.Struct('<4sIB7xdd')
+INDEX_ENTRY = np.dtype([('offset', '<u8'), ('frames', '<u4'), ('t0', '<f8'), ('t1', '<f8')])
+FOOTER = struct.Struct('<8sQQ')
+
+DELTA_INT8 = 1
+DELTA_INT16 = 2
+
+# Koordinat ternormalisasi MediaPipe kira-kira di [-0.5, 1.5] untuk x/y dan [-0.5, 0.5] untuk z
+DEFAULT_OFFSET = (0.5, 0.5, 0.0)
+DEFAULT_SCALE = (32767.0, 32767.0, 65534.0)
+
+
+def _pad8(n):
+    return (n + 7) & ~7
+
+
+class LandmarkLogWriter:
+    """Tulis stream landmark (P titik per frame) terkuantisasi int16 + delta antar frame"""
+
+    def __init__(self, path, points, chunk_frames=64, append=False,
+                 offset=DEFAULT_OFFSET, scale=DEFAULT_SCALE):
+        self.path = path
+        self.points = points
+        self.chunk_frames = chunk_frames
+        self.index = []
+
+        if append and os.path.exists(path):
+            reader = LandmarkLogReader(path)
+            if reader.points != points:
+                raise ValueError(f"jumlah titik berbeda: file {reader.points}, diminta {points}")
+            self.offset, self.scale = reader.offset, reader.scale
+            self.index = [tuple(e) for e in reader.index]
+            end = reader.data_end
+            reader.close()
+            self.file = open(path, 'r+b')
+            # Buang footer lama, chunk baru ditulis setelah chunk terakhir
+            self.file.truncate(end)
+            self.file.seek(end)
+        else:
+            self.offset = np.asarray(offset, dtype=np.float32)
+            self.scale = np.asarray(scale, dtype=np.float32)
+            self.file = open(path, 'wb')
+            self.file.write(HEADER.pack(MAGIC, 1, points, *self.offset, *self.scale))
+
+        self.timestamps = []
+        self.valid = []
+        self.frames = np.zeros((chunk_frames, points, 3), dtype=np.int16)
+        self.last_frame = np.zeros((points, 3), dtype=np.int16)
+
+    def quantize(self, points, out):
+        q = np.rint((points - self.offset) * self.scale)
+        np.clip(q, -32767, 32767, out=q)
+        out[:] = q
+
+    def write(self, timestamp, points):
+        """points: array (P, 3) koordinat ternormalisasi, atau None jika tidak ada deteksi"""
+        i = len(self.timestamps)
+        if points is None:
+            # Ulangi frame sebelumnya supaya delta tetap kecil, ditandai tidak valid
+            self.frames[i] = self.frames[i - 1] if i else self.last_frame
+            self.valid.append(0)
+        else:
+            self.quantize(np.asarray(points, dtype=np.float32).reshape(self.points, 3), self.frames[i])
+            self.valid.append(1)
+        self.timestamps.append(timestamp)
+        if len(self.timestamps) >= self.chunk_frames:
+            self.flush()
+
+    def write_hands(self, timestamp, hand_results, max_hands=2):
+        """Tulis hasil Hands.process(); stream harus dibuat dengan points = max_hands * 21"""
+        landmarks, _, count = hands_to_array(hand_results, max_hands)
+        self.write(timestamp, landmarks.reshape(-1, 3) if count else None)
+
+    def write_face(self, timestamp, face_results):
+        """Tulis hasil FaceMesh.process(); stream harus dibuat dengan points = 478"""
+        landmarks, count = faces_to_array(face_results, 1)
+        self.write(timestamp, landmarks[0] if count else None)
+
+    def flush(self):
+        n = len(self.timestamps)
+        if n == 0:
+            return
+        frames = self.frames[:n]
+        # Selisih int16 dengan wraparound: tetap lossless saat di-cumsum balik
+        deltas = np.diff(frames, axis=0)
+        delta_type = DELTA_INT16
+        if n > 1 and deltas.min() >= -128 and deltas.max() <= 127:
+            deltas = deltas.astype(np.int8)
+            delta_type = DELTA_INT8
+
+        t0, t1 = self.timestamps[0], self.timestamps[-1]
+        offset = self.file.tell()
+        valid = np.asarray(self.valid, dtype=np.uint8).tobytes()
+        self.file.write(CHUNK_HEADER.pack(CHUNK_MAGIC, n, delta_type, t0, t1))
+        self.file.write(np.asarray(self.timestamps, dtype='<f8').tobytes())
+        self.file.write(valid + b'\x00' * (_pad8(n) - n))
+        self.file.write(frames[0].astype('<i2').tobytes())
+        self.file.write(deltas.tobytes())
+        self.file.write(b'\x00' * (_pad8(self.file.tell()) - self.file.tell()))
+        self.index.append((offset, n, t0, t1))
+
+        self.last_frame[:] = frames[-1]
+        self.timestamps = []
+        self.valid = []
+
+    def close(self):
+        self.flush()
+        index_offset = self.file.tell()
+        self.file.write(np.array(self.index, dtype=INDEX_ENTRY).tobytes())
+        self.file.write(FOOTER.pack(INDEX_MAGIC, len(self.index), index_offset))
+        self.file.close()
+
+
+class LandmarkLogReader:
+    """Baca log lewat numpy.memmap; hanya chunk yang diminta yang didekode"""
+
+    def __init__(self, path):
+        self.mm = np.memmap(path, dtype=np.uint8, mode='r')
+        magic, _version, self.points, *params = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} bukan landmark log")
+        self.offset = np.asarray(params[:3], dtype=np.float32)
+        self.scale = np.asarray(params[3:], dtype=np.float32)
+        self.index, self.data_end = self._load_index()
+        self.frame_starts = np.concatenate([[0], np.cumsum(self.index['frames'])]).astype(np.int64)
+
+    def _load_index(self):
+        size = len(self.mm)
+        if size >= HEADER.size + FOOTER.size:
+            magic, count, index_offset = FOOTER.unpack_from(self.mm, size - FOOTER.size)
+            if magic == INDEX_MAGIC:
+                index = np.frombuffer(self.mm, dtype=INDEX_ENTRY, count=count, offset=index_offset)
+                return index, index_offset
+        # Footer tidak ada: scan header chunk satu per satu
+        entries = []
+        pos = HEADER.size
+        while pos + CHUNK_HEADER.size <= size:
+            magic, n, delta_type, t0, t1 = CHUNK_HEADER.unpack_from(self.mm, pos)
+            if magic != CHUNK_MAGIC:
+                break
+            end = self._chunk_end(pos, n, delta_type)
+            if end > size:
+                break  # chunk terakhir terpotong
+            entries.append((pos, n, t0, t1))
+            pos = end
+        return np.array(entries, dtype=INDEX_ENTRY), pos
+
+    def _chunk_end(self, pos, n, delta_type):
+        body = 8 * n + _pad8(n) + self.points * 3 * 2 + (n - 1) * self.points * 3 * delta_type
+        return pos + CHUNK_HEADER.size + _pad8(body)
+
+    def __len__(self):
+        return int(self.frame_starts[-1])
+
+    def _chunk_views(self, c):
+        pos, n = int(self.index['offset'][c]), int(self.index['frames'][c])
+        _, _, delta_type, _, _ = CHUNK_HEADER.unpack_from(self.mm, pos)
+        pos += CHUNK_HEADER.size
+        timestamps = np.frombuffer(self.mm, dtype='<f8', count=n, offset=pos)
+        pos += 8 * n
+        valid = np.frombuffer(self.mm, dtype=np.uint8, count=n, offset=pos)
+        pos += _pad8(n)
+        key = np.frombuffer(self.mm, dtype='<i2', count=self.points * 3, offset=pos)
+        pos += self.points * 3 * 2
+        dtype = np.int8 if delta_type == DELTA_INT8 else np.int16
+        deltas = np.frombuffer(self.mm, dtype=dtype, count=(n - 1) * self.points * 3, offset=pos)
+        return timestamps, valid, key.reshape(self.points, 3), deltas.reshape(n - 1, self.points, 3)
+
+    def _decode_chunk(self, c):
+        timestamps, valid, key, deltas = self._chunk_views(c)
+        q = np.empty((len(timestamps), self.points, 3), dtype=np.int16)
+        q[0] = key
+        np.cumsum(deltas, axis=0, dtype=np.int16, out=q[1:])
+        q[1:] += key
+        return timestamps, valid, q
+
+    @property
+    def timestamps(self):
+        return np.concatenate([self._chunk_views(c)[0] for c in range(len(self.index))]) \
+            if len(self.index) else np.zeros(0)
+
+    def read(self, start=0, stop=None):
+        """Frame [start, stop) -> (timestamps, valid, landmarks (frames, P, 3) float32)"""
+        stop = len(self) if stop is None else min(stop, len(self))
+        if start >= stop:
+            return np.zeros(0), np.zeros(0, np.uint8), np.zeros((0, self.points, 3), np.float32)
+        first = int(np.searchsorted(self.frame_starts, start, side='right')) - 1
+        last = int(np.searchsorted(self.frame_starts, stop, side='left'))
+        ts, valid, quant = [], [], []
+        for c in range(first, last):
+            t, v, q = self._decode_chunk(c)
+            lo = max(start - self.frame_starts[c], 0)
+            hi = min(stop - self.frame_starts[c], len(t))
+            ts.append(t[lo:hi])
+            valid.append(v[lo:hi])
+            quant.append(q[lo:hi])
+        quant = np.concatenate(quant)
+        landmarks = quant.astype(np.float32) / self.scale + self.offset
+        return np.concatenate(ts), np.concatenate(valid), landmarks
+
+    def read_time(self, t_start, t_end):
+        """Semua frame dengan t_start <= timestamp < t_end, lewat index chunk"""
+        c = max(bisect.bisect_right(self.index['t0'].tolist(), t_start) - 1, 0)
+        start = None
+        stop = len(self)
+        for chunk in range(c, len(self.index)):
+            if self.index['t0'][chunk] >= t_end:
+                stop = int(self.frame_starts[chunk])
+                break
+            t = self._chunk_views(chunk)[0]
+            if start is None and t[-1] >= t_start:
+                start = int(self.frame_starts[chunk]) + int(np.searchsorted(t, t_start))
+            if t[-1] >= t_end:
+                stop = int(self.frame_starts[chunk]) + int(np.searchsorted(t, t_end))
+                break
+        if start is None:
+            start = stop
+        return self.read(start, stop)
+
+    def close(self):
+        self.index = None
+        self.mm = None
+
+
+def _synthetic_stream(frames, points, motion, seed=0):
+    rng = np.random.default_rng(seed)
+    base = rng.uniform(0.3, 0.7, size=(points, 3)).astype(np.float32)
+    base[:, 2] = rng.normal(0, 0.05, size=points)
+    drift = np.cumsum(rng.normal(0, motion, size=(frames, 1, 3)), axis=0).astype(np.float32)
+    jitter = rng.normal(0, motion / 10, size=(frames, points, 3)).astype(np.float32)
+    return base + drift + jitter
+
+
+def benchmark(frames=3000, fps=30.0):
+    """Bandingkan ukuran & kecepatan baca dengan float32 mentah"""
+    tmp = tempfile.mkdtemp()
+    cases = [('face 478', FACE_POINTS, 0.0005), ('2 tangan 42', HAND_POINTS * 2, 0.004)]
+    for name, points, motion in cases:
+        data = _synthetic_stream(frames, points, motion)
+        timestamps = np.arange(frames) / fps
+
+        raw_path = os.path.join(tmp, 'raw.f32')
+        data.tofile(raw_path)
+        log_path = os.path.join(tmp, 'log.lmk')
+        t0 = time.perf_counter()
+        writer = LandmarkLogWriter(log_path, points)
+        for t, frame in zip(timestamps, data):
+            writer.write(float(t), frame)
+        writer.close()
+        write_ms = (time.perf_counter() - t0) * 1000
+
+        reader = LandmarkLogReader(log_path)
+        t0 = time.perf_counter()
+        _, _, decoded = reader.read()
+        full_ms = (time.perf_counter() - t0) * 1000
+        t0 = time.perf_counter()
+        reads = 200
+        for i in range(reads):
+            start = (i * 7919) % (frames - int(fps))
+            reader.read_time(start / fps, start / fps + 1.0)
+        window_us = (time.perf_counter() - t0) / reads * 1e6
+
+        raw = np.memmap(raw_path, dtype=np.float32, mode='r').reshape(frames, points, 3)
+        t0 = time.perf_counter()
+        np.array(raw)
+        raw_ms = (time.perf_counter() - t0) * 1000
+
+        err = float(np.abs(decoded - data).max())
+        raw_size = os.path.getsize(raw_path)
+        log_size = os.path.getsize(log_path)
+        print(f"{name}: raw {raw_size / 1e6:.2f} MB, log {log_size / 1e6:.2f} MB "
+              f"({raw_size / log_size:.1f}x lebih kecil), error maks {err:.2e}")
+        print(f"  tulis {write_ms:.0f} ms, baca penuh {full_ms:.1f} ms (raw {raw_ms:.1f} ms), "
+              f"baca 1 detik acak {window_us:.0f} us")
+        reader.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark format log landmark")
+    parser.add_argument('--frames', type=int, default=3000)
+    args = parser.parse_args()
+    benchmark(args.frames)
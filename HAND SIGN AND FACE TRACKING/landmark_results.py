@@ -0,0 +1,124 @@
+import numpy as np
+
+# Jumlah titik per struktur landmark MediaPipe
+HAND_POINTS = 21
+FACE_POINTS = 478  # FaceMesh dengan refine_landmarks=True
+
+# Kode handedness di array (label MediaPipe -> int)
+HANDEDNESS_CODES = {'Left': 0, 'Right': 1}
+HANDEDNESS_LABELS = {0: 'Left', 1: 'Right'}
+
+
+class Landmark:
+    """Pengganti ringan NormalizedLandmark (x, y, z)"""
+    __slots__ = ('x', 'y', 'z')
+
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        self.x = x
+        self.y = y
+        self.z = z
+
+    def HasField(self, name):
+        # Dipanggil mp_drawing.draw_landmarks untuk visibility/presence
+        return False
+
+
+class LandmarkList:
+    """Pengganti NormalizedLandmarkList, atribut .landmark seperti MediaPipe"""
+    __slots__ = ('landmark',)
+
+    def __init__(self, points):
+        self.landmark = [Landmark(float(p[0]), float(p[1]), float(p[2])) for p in points]
+
+
+class Classification:
+    __slots__ = ('index', 'label', 'score')
+
+    def __init__(self, label, score=1.0):
+        self.index = HANDEDNESS_CODES.get(label, -1)
+        self.label = label
+        self.score = score
+
+
+class ClassificationList:
+    __slots__ = ('classification',)
+
+    def __init__(self, label, score=1.0):
+        self.classification = [Classification(label, score)]
+
+
+class HandResults:
+    """Struktur hasil yang sama dengan output Hands.process()"""
+
+    def __init__(self, multi_hand_landmarks=None, multi_handedness=None):
+        # MediaPipe mengembalikan None (bukan list kosong) saat tidak ada tangan
+        self.multi_hand_landmarks = multi_hand_landmarks or None
+        self.multi_handedness = multi_handedness or None
+        self.multi_hand_world_landmarks = None
+
+
+class FaceResults:
+    """Struktur hasil yang sama dengan output FaceMesh.process()"""
+
+    def __init__(self, multi_face_landmarks=None):
+        self.multi_face_landmarks = multi_face_landmarks or None
+
+
+def landmarks_to_array(landmark_list, out=None):
+    """Konversi LandmarkList MediaPipe ke array (N, 3) float32"""
+    lms = landmark_list.landmark
+    if out is None:
+        out = np.empty((len(lms), 3), dtype=np.float32)
+    for i, lm in enumerate(lms):
+        out[i, 0] = lm.x
+        out[i, 1] = lm.y
+        out[i, 2] = lm.z
+    return out
+
+
+def hands_to_array(results, max_hands=2):
+    """Ubah hasil Hands.process() menjadi (landmarks, handedness, count)
+
+    landmarks: (max_hands, 21, 3) float32, handedness: (max_hands,) int8 (-1 = kosong)
+    """
+    landmarks = np.zeros((max_hands, HAND_POINTS, 3), dtype=np.float32)
+    handedness = np.full(max_hands, -1, dtype=np.int8)
+    count = 0
+    if results is not None and results.multi_hand_landmarks:
+        labels = results.multi_handedness or []
+        for i, hand_lms in enumerate(results.multi_hand_landmarks[:max_hands]):
+            landmarks_to_array(hand_lms, landmarks[i])
+            if i < len(labels):
+                handedness[i] = HANDEDNESS_CODES.get(labels[i].classification[0].label, -1)
+            count += 1
+    return landmarks, handedness, count
+
+
+def array_to_hands(landmarks, handedness, count):
+    """Kebalikan dari hands_to_array: bangun lagi objek mirip hasil MediaPipe"""
+    hand_list = []
+    label_list = []
+    for i in range(int(count)):
+        hand_list.append(LandmarkList(landmarks[i]))
+        label_list.append(ClassificationList(HANDEDNESS_LABELS.get(int(handedness[i]), 'Unknown')))
+    return HandResults(hand_list, label_list)
+
+
+def faces_to_array(results, max_faces=1):
+    """Ubah hasil FaceMesh.process() menjadi (landmarks, count)
+
+    landmarks: (max_faces, 478, 3) float32. Mesh tanpa refine (468 titik) diisi nol di akhir.
+    """
+    landmarks = np.zeros((max_faces, FACE_POINTS, 3), dtype=np.float32)
+    count = 0
+    if results is not None and results.multi_face_landmarks:
+        for i, face_lms in enumerate(results.multi_face_landmarks[:max_faces]):
+            # landmarks_to_array hanya menulis sebanyak titik yang ada
+            landmarks_to_array(face_lms, landmarks[i])
+            count += 1
+    return landmarks, count
+
+
+def array_to_faces(landmarks, count):
+    """Kebalikan dari faces_to_array"""
+    return FaceResults([LandmarkList(landmarks[i]) for i in range(int(count))])
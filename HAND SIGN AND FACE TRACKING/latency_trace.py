@@ -0,0 +1,96 @@
+import itertools
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+
+class FrameTrace:
+    """Jejak satu frame: timestamp capture, span per stage dan aksi yang dipicunya"""
+    __slots__ = ('trace_id', 'capture_ts', 'spans', 'actions')
+
+    def __init__(self, trace_id, capture_ts):
+        self.trace_id = trace_id
+        self.capture_ts = capture_ts
+        self.spans = []     # (nama, mulai, selesai, thread)
+        self.actions = []   # (tipe aksi, waktu dispatch, thread)
+
+
+class LatencyTracer:
+    """Korelasikan frame kamera dengan aksi (scroll, klik, suara) untuk latensi end-to-end"""
+
+    def __init__(self, max_traces=20000, clock=time.time):
+        self.clock = clock
+        self.traces = deque(maxlen=max_traces)
+        self.ids = itertools.count()
+        self.current = None
+
+    def begin_frame(self, capture_ts=None):
+        """Mulai jejak frame baru; capture_ts sebaiknya diambil sebelum cap.read()"""
+        trace = FrameTrace(next(self.ids), capture_ts if capture_ts is not None else self.clock())
+        self.traces.append(trace)
+        self.current = trace
+        return trace
+
+    @contextmanager
+    def span(self, name, trace=None):
+        trace = trace or self.current
+        start = self.clock()
+        try:
+            yield trace
+        finally:
+            if trace is not None:
+                trace.spans.append((name, start, self.clock(), threading.current_thread().name))
+
+    def action(self, action_type, trace=None):
+        """Catat dispatch aksi; panggil tepat saat aksi dikirim (boleh dari thread lain)"""
+        trace = trace or self.current
+        if trace is not None:
+            trace.actions.append((action_type, self.clock(), threading.current_thread().name))
+
+    def latencies(self):
+        """{tipe aksi: array latensi capture -> dispatch (detik)}"""
+        result = {}
+        for trace in list(self.traces):
+            for action_type, ts, _ in trace.actions:
+                result.setdefault(action_type, []).append(ts - trace.capture_ts)
+        return {k: np.asarray(v) for k, v in result.items()}
+
+    def summary(self):
+        lines = [f"{'aksi':<14} {'n':>6} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}  (ms)"]
+        for action_type, lat in sorted(self.latencies().items()):
+            p50, p90, p99 = np.percentile(lat, [50, 90, 99]) * 1000
+            lines.append(f"{action_type:<14} {len(lat):>6} {p50:>8.1f} {p90:>8.1f} {p99:>8.1f} "
+                         f"{lat.max() * 1000:>8.1f}")
+        return "\n".join(lines)
+
+    def export_chrome(self, path):
+        """Simpan sebagai Chrome trace-event JSON (buka di chrome://tracing atau Perfetto)"""
+        events = []
+        threads = {}
+
+        def tid(name):
+            return threads.setdefault(name, len(threads) + 1)
+
+        for trace in list(self.traces):
+            args = {'trace_id': trace.trace_id}
+            end = max([s[2] for s in trace.spans] + [a[1] for a in trace.actions] + [trace.capture_ts])
+            events.append({'name': f'frame {trace.trace_id}', 'cat': 'frame', 'ph': 'X',
+                           'ts': trace.capture_ts * 1e6, 'dur': (end - trace.capture_ts) * 1e6,
+                           'pid': 1, 'tid': tid('frames'), 'args': args})
+            for name, start, stop, thread in trace.spans:
+                events.append({'name': name, 'cat': 'stage', 'ph': 'X', 'ts': start * 1e6,
+                               'dur': (stop - start) * 1e6, 'pid': 1, 'tid': tid(thread), 'args': args})
+            for action_type, ts, thread in trace.actions:
+                events.append({'name': action_type, 'cat': 'action', 'ph': 'i', 's': 't',
+                               'ts': ts * 1e6, 'pid': 1, 'tid': tid(thread),
+                               'args': dict(args, latency_ms=(ts - trace.capture_ts) * 1000)})
+
+        for name, thread_id in threads.items():
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': thread_id,
+                           'args': {'name': name}})
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
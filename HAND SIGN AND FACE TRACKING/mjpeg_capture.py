@@ -0,0 +1,312 @@
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+# Decode langsung di skala kecil: libjpeg cukup melewati koefisien DCT frekuensi tinggi,
+# jauh lebih murah daripada decode penuh lalu cv2.resize
+REDUCED_FLAGS = {1: cv2.IMREAD_COLOR, 2: cv2.IMREAD_REDUCED_COLOR_2,
+                 4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8}
+
+SOI = b'\xff\xd8\xff'
+
+
+def fourcc_to_str(value):
+    value = int(value)
+    return ''.join(chr((value >> (8 * i)) & 0xFF) for i in range(4))
+
+
+class CameraSource:
+    """Kamera USB yang dinegosiasikan ke MJPEG; read() memberi bytes JPEG mentah bila bisa
+
+    FOURCC harus di-set sebelum resolusi/FPS: tanpa itu banyak kamera UVC jatuh ke YUYV yang
+    dibatasi bandwidth USB (mis. 1280x720 hanya 10 FPS). CAP_PROP_CONVERT_RGB=0 membuat backend
+    V4L2 mengembalikan buffer terkompresi (1, N) sehingga decode bisa dipindah ke thread lain.
+    """
+    live = True
+
+    def __init__(self, index=0, width=1280, height=720, fps=60, fourcc='MJPG'):
+        self.cap = cv2.VideoCapture(index)
+        self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        self.cap.set(cv2.CAP_PROP_FPS, fps)
+        self.fourcc = fourcc_to_str(self.cap.get(cv2.CAP_PROP_FOURCC))
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or fps
+        # Backend yang tidak mendukung frame mentah tetap memberi BGR; worker menangani keduanya
+        self.compressed = self.fourcc == 'MJPG' and self.cap.set(cv2.CAP_PROP_CONVERT_RGB, 0)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self):
+        return self.cap.read()
+
+    def release(self):
+        self.cap.release()
+
+
+class MjpegFileSource:
+    """File .mjpeg (JPEG bersambung) sebagai pengganti kamera MJPEG untuk uji dan benchmark
+
+    pace=True memberi frame sesuai fps seperti kamera sungguhan (frame dibuang bila decode
+    tertinggal); pace=False secepat mungkin tanpa membuang frame.
+    """
+
+    def __init__(self, path, fps=30.0, pace=True, loop=False):
+        with open(path, 'rb') as f:
+            data = f.read()
+        starts = []
+        pos = data.find(SOI)
+        while pos >= 0:
+            starts.append(pos)
+            pos = data.find(SOI, pos + 1)
+        # Potong per marker SOI; JPEG dari imencode tidak menyimpan thumbnail EXIF di dalamnya
+        buf = np.frombuffer(data, dtype=np.uint8)
+        self.packets = [buf[s:e] for s, e in zip(starts, starts[1:] + [len(data)])]
+        self.fps = fps
+        self.live = pace
+        self.loop = loop
+        self.compressed = True
+        self.fourcc = 'MJPG'
+        self._index = 0
+        self._next_time = None
+
+    def __len__(self):
+        return len(self.packets)
+
+    def isOpened(self):
+        return self.loop or self._index < len(self.packets)
+
+    def read(self):
+        if self._index >= len(self.packets):
+            if not self.loop or not self.packets:
+                return False, None
+            self._index = 0
+        if self.live:
+            now = time.perf_counter()
+            if self._next_time is None:
+                self._next_time = now
+            time.sleep(max(0.0, self._next_time - now))
+            self._next_time += 1.0 / self.fps
+        packet = self.packets[self._index]
+        self._index += 1
+        return True, packet
+
+    def release(self):
+        self._index = len(self.packets)
+        self.loop = False
+
+
+def write_mjpeg(video_path, out_path, quality=85, limit=None):
+    """Buat file uji .mjpeg dari video apa pun"""
+    cap = cv2.VideoCapture(video_path)
+    count = 0
+    with open(out_path, 'wb') as f:
+        while limit is None or count < limit:
+            success, frame = cap.read()
+            if not success:
+                break
+            f.write(cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])[1].tobytes())
+            count += 1
+    cap.release()
+    return count
+
+
+class MjpegCapture:
+    """Pengganti cv2.VideoCapture: ambil frame terkompresi, decode di thread pool
+
+    read() mengembalikan frame penuh untuk tampilan; read_pair() juga mengembalikan frame
+    `reduce` kali lebih kecil yang di-decode langsung dari JPEG untuk cabang inferensi
+    (landmark MediaPipe ternormalisasi, jadi tetap dipetakan ke ukuran frame penuh).
+    Selalu frame terbaru yang dikembalikan; frame yang sudah terlewat dihitung sebagai drop.
+    """
+
+    def __init__(self, source, workers=2, reduce=1, flip=False):
+        if reduce not in REDUCED_FLAGS:
+            raise ValueError(f"reduce harus salah satu dari {sorted(REDUCED_FLAGS)}")
+        self.source = source
+        self.workers = workers
+        self.reduce = reduce
+        self.flip = flip
+
+        self._cond = threading.Condition()
+        self._slots = threading.Semaphore(workers)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='mjpeg-decode')
+        self._latest = None          # (seq, full, small)
+        self._read_seq = 0
+        self._in_flight = 0
+        self._running = True
+        self._grabbing = True
+
+        self.grabbed = 0
+        self.skipped = 0             # paket dibuang karena semua worker decode sibuk
+        self.decoded = 0
+        self.dropped = 0             # frame ter-decode yang tidak sempat dibaca
+        self.delivered = 0
+        self.decode_time = 0.0
+        self.reduced_time = 0.0
+        self.start_time = time.perf_counter()
+
+        self._thread = threading.Thread(target=self._grab_loop, name='mjpeg-grab', daemon=True)
+        self._thread.start()
+
+    def _grab_loop(self):
+        seq = 0
+        try:
+            while self._running and self.source.isOpened():
+                success, packet = self.source.read()
+                if not success:
+                    break
+                self.grabbed += 1
+                # Kamera live: buang paket bila decode tertinggal (latensi tetap rendah);
+                # file tanpa pace: tunggu worker agar semua frame ter-decode
+                if not self._slots.acquire(blocking=not self.source.live):
+                    self.skipped += 1
+                    continue
+                seq += 1
+                with self._cond:
+                    self._in_flight += 1
+                self._executor.submit(self._decode, seq, packet)
+        finally:
+            with self._cond:
+                self._grabbing = False
+                self._cond.notify_all()
+
+    def _decode(self, seq, packet):
+        try:
+            t0 = time.perf_counter()
+            if packet.ndim == 3:
+                full = packet   # backend sudah men-decode (bukan MJPEG mentah)
+            else:
+                full = cv2.imdecode(packet, cv2.IMREAD_COLOR)
+            t1 = time.perf_counter()
+            small = full
+            if self.reduce > 1:
+                if packet.ndim == 3:
+                    small = cv2.resize(full, None, fx=1 / self.reduce, fy=1 / self.reduce,
+                                       interpolation=cv2.INTER_AREA)
+                else:
+                    small = cv2.imdecode(packet, REDUCED_FLAGS[self.reduce])
+            if full is None or small is None:
+                return
+            if self.flip:
+                same = small is full
+                full = cv2.flip(full, 1)
+                small = full if same else cv2.flip(small, 1)
+            t2 = time.perf_counter()
+            with self._cond:
+                self.decoded += 1
+                self.decode_time += t1 - t0
+                self.reduced_time += t2 - t1
+                # Worker paralel bisa selesai tidak berurutan; jangan mundur ke frame lama
+                if self._latest is None or seq > self._latest[0]:
+                    if self._latest is not None and self._latest[0] > self._read_seq:
+                        self.dropped += 1
+                    self._latest = (seq, full, small)
+                    self._cond.notify_all()
+                else:
+                    self.dropped += 1
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+                self._cond.notify_all()
+            self._slots.release()
+
+    def _has_unread(self):
+        return self._latest is not None and self._latest[0] > self._read_seq
+
+    def _finished(self):
+        return not self._grabbing and self._in_flight == 0
+
+    def isOpened(self):
+        with self._cond:
+            return not self._finished() or self._has_unread()
+
+    def read_pair(self, timeout=2.0):
+        """(success, frame penuh, frame kecil) terbaru yang belum pernah dibaca"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._has_unread() or self._finished(), timeout)
+            if not self._has_unread():
+                return False, None, None
+            seq, full, small = self._latest
+            self._read_seq = seq
+            self.delivered += 1
+            return True, full, small
+
+    def read(self):
+        success, full, _ = self.read_pair()
+        return success, full
+
+    def release(self):
+        # Tunggu thread grab keluar dari source.read() dulu: melepas VideoCapture yang sedang
+        # dibaca thread lain tidak terdefinisi di OpenCV (bisa crash di V4L2)
+        self._running = False
+        self._thread.join()
+        self.source.release()
+        self._executor.shutdown(wait=True)
+
+    def report(self):
+        wall = time.perf_counter() - self.start_time
+        full_ms = self.decode_time / self.decoded * 1000 if self.decoded else 0.0
+        reduced_ms = self.reduced_time / self.decoded * 1000 if self.decoded else 0.0
+        return (f"MJPEG ({self.source.fourcc}): decode {full_ms:.2f} ms + kecil/flip {reduced_ms:.2f} ms per frame, "
+                f"{self.delivered / wall:.1f} FPS terkirim, {self.skipped} paket dilewati, {self.dropped} frame drop")
+
+
+def open_camera(index=0, width=1280, height=720, fps=60, workers=2, reduce=1, flip=False):
+    """Kamera MJPEG dengan decode di thread pool; pengganti VideoCapture + cap.set(...)"""
+    source = CameraSource(index, width, height, fps)
+    if source.fourcc != 'MJPG':
+        print(f"Kamera tidak mendukung MJPEG, memakai {source.fourcc!r}")
+    return MjpegCapture(source, workers, reduce, flip)
+
+
+def benchmark(path, workers=(1, 2, 4), reduces=(1, 2), fps=60.0, pace=False, limit=None):
+    """Biaya decode dan FPS terkirim: decode di main thread vs MjpegCapture"""
+    source = MjpegFileSource(path, fps, pace=False)
+    packets = source.packets[:limit] if limit else source.packets
+    t0 = time.perf_counter()
+    for packet in packets:
+        frame = cv2.imdecode(packet, cv2.IMREAD_COLOR)
+    base = (time.perf_counter() - t0) / len(packets)
+    h, w = frame.shape[:2]
+    print(f"{len(packets)} frame {w}x{h}, decode main thread: {base * 1000:.2f} ms ({1 / base:.0f} FPS)")
+    print(f"{'worker':>6} {'reduce':>6} {'full ms':>8} {'kecil ms':>9} {'FPS':>7} {'skip':>6} {'drop':>6}")
+    for reduce in reduces:
+        for n in workers:
+            source = MjpegFileSource(path, fps, pace=pace)
+            source.packets = packets
+            cap = MjpegCapture(source, n, reduce)
+            t0 = time.perf_counter()
+            delivered = 0
+            while True:
+                success, full, small = cap.read_pair()
+                if not success:
+                    break
+                delivered += 1
+            elapsed = time.perf_counter() - t0
+            cap.release()
+            full_ms = cap.decode_time / cap.decoded * 1000 if cap.decoded else 0.0
+            small_ms = cap.reduced_time / cap.decoded * 1000 if cap.decoded else 0.0
+            print(f"{n:>6} {reduce:>6} {full_ms:>8.2f} {small_ms:>9.2f} {delivered / elapsed:>7.1f} "
+                  f"{cap.skipped:>6} {cap.dropped:>6}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark capture MJPEG dengan decode di thread pool")
+    parser.add_argument('mjpeg', help="file .mjpeg (buat dengan --from-video)")
+    parser.add_argument('--from-video', help="buat file .mjpeg dari video ini dulu")
+    parser.add_argument('--quality', type=int, default=85)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--reduce', type=int, nargs='+', default=[1, 2])
+    parser.add_argument('--fps', type=float, default=60.0)
+    parser.add_argument('--pace', action='store_true', help="beri frame sesuai --fps seperti kamera")
+    parser.add_argument('--limit', type=int)
+    args = parser.parse_args()
+    if args.from_video:
+        print(f"{write_mjpeg(args.from_video, args.mjpeg, args.quality, args.limit)} frame -> {args.mjpeg}")
+    benchmark(args.mjpeg, args.workers, args.reduce, args.fps, args.pace, args.limit)
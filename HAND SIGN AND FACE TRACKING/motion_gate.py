@@ -0,0 +1,202 @@
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from landmark_results import HandResults
+
+
+class MotionGate:
+    """Deteksi gerak murah dari frame grayscale kecil untuk melewati inferensi saat adegan diam"""
+
+    def __init__(self, threshold=3.0, size=(64, 36), alpha=0.05,
+                 idle_after=10.0, idle_interval=0.2, clock=time.time):
+        self.threshold = threshold          # selisih rata-rata level abu-abu yang dianggap gerak
+        self.size = size
+        self.alpha = alpha                  # kecepatan update background
+        self.idle_after = idle_after        # detik tanpa gerak/tangan sebelum masuk mode idle
+        self.idle_interval = idle_interval  # jeda antar capture saat idle (0.2 = 5 FPS)
+        self.clock = clock
+
+        self.background = None
+        self.last_active = clock()
+        self.score = 0.0
+
+        # Statistik
+        self.inferred = 0
+        self.skipped = 0
+        self.wakeups = 0
+
+    @property
+    def idle(self):
+        return self.clock() - self.last_active > self.idle_after
+
+    def frame_interval(self):
+        """Jeda yang disarankan sebelum capture berikutnya"""
+        return self.idle_interval if self.idle else 0.0
+
+    def motion(self, frame, code=cv2.COLOR_BGR2GRAY):
+        """True jika frame berbeda cukup jauh dari background"""
+        # Resize dulu baru konversi warna, jauh lebih murah dari full frame
+        small = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, code).astype(np.float32)
+        if self.background is None:
+            self.background = gray
+            return True
+        self.score = float(cv2.mean(cv2.absdiff(gray, self.background))[0])
+        cv2.accumulateWeighted(gray, self.background, self.alpha)
+        return self.score > self.threshold
+
+    def should_infer(self, frame, hand_tracked, code=cv2.COLOR_BGR2GRAY):
+        was_idle = self.idle
+        if self.motion(frame, code) or hand_tracked:
+            if was_idle:
+                self.wakeups += 1
+            self.last_active = self.clock()
+            self.inferred += 1
+            return True
+        self.skipped += 1
+        return False
+
+    def report(self):
+        total = self.inferred + self.skipped
+        skipped = self.skipped / total * 100 if total else 0.0
+        return f"Inferensi: {self.inferred}, dilewati: {self.skipped} ({skipped:.0f}%), bangun: {self.wakeups}"
+
+
+class MotionGatedHands:
+    """Pembungkus Hands: process() hanya memanggil model jika ada gerak atau tangan masih dilacak"""
+
+    def __init__(self, hands, gate=None):
+        self.hands = hands
+        self.gate = gate or MotionGate()
+        self.hand_tracked = False
+        self.empty = HandResults()
+
+    def process(self, image_rgb):
+        if not self.gate.should_infer(image_rgb, self.hand_tracked, cv2.COLOR_RGB2GRAY):
+            return self.empty
+        results = self.hands.process(image_rgb)
+        self.hand_tracked = bool(results.multi_hand_landmarks)
+        return results
+
+    def close(self):
+        self.hands.close()
+
+
+class SegmentVideoSource:
+    """Sumber video sintetis real-time: segmen diam dan segmen aktif (kotak bergerak) bergantian"""
+
+    def __init__(self, segments, fps=30, size=(640, 480)):
+        self.segments = segments    # list (durasi detik, aktif?)
+        self.fps = fps
+        self.size = size
+        self.rng = np.random.default_rng(0)
+        self.base = self.rng.integers(60, 120, size=(size[1], size[0], 3), dtype=np.uint8)
+        self.start = None
+        self.duration = sum(d for d, _ in segments)
+
+    def segment_at(self, t):
+        end = 0.0
+        for duration, active in self.segments:
+            end += duration
+            if t < end:
+                return end - duration, active
+        return None, False
+
+    def read(self):
+        now = time.perf_counter()
+        if self.start is None:
+            self.start = now
+        t = now - self.start
+        seg_start, active = self.segment_at(t)
+        if seg_start is None:
+            return False, None, t
+        frame = self.base.copy()
+        # Noise sensor kecil agar adegan diam tidak benar-benar identik
+        frame[::8, ::8] += self.rng.integers(0, 3, size=frame[::8, ::8].shape, dtype=np.uint8)
+        if active:
+            x = int((t * 200) % (self.size[0] - 100))
+            cv2.rectangle(frame, (x, 150), (x + 100, 300), (220, 200, 180), -1)
+        time.sleep(max(0.0, 1.0 / self.fps - (time.perf_counter() - now)))
+        return True, frame, t
+
+
+def measure(segments, infer_cost=0.02, idle_after=2.0, use_gate=True):
+    """Ukur CPU per segmen dan latensi bangun dari idle saat gerak dimulai
+
+    Hasil: (fraksi core {aktif?: cpu/wall}, [latensi bangun detik]). Jeda idle ikut dihitung
+    ke waktu wall frame berikutnya, karena justru jeda itu yang menghemat CPU.
+    """
+    source = SegmentVideoSource(segments)
+    gate = MotionGate(idle_after=idle_after, clock=time.perf_counter)
+    cpu = {True: 0.0, False: 0.0}
+    wall = {True: 0.0, False: 0.0}
+    wake_latencies = []
+    waiting_wake = None
+
+    while True:
+        c0, w0 = time.process_time(), time.perf_counter()
+        if use_gate:
+            time.sleep(gate.frame_interval())
+        ok, frame, t = source.read()
+        if not ok:
+            break
+        seg_start, active = source.segment_at(t)
+        if active and waiting_wake is None and (not wake_latencies or wake_latencies[-1][0] != seg_start):
+            waiting_wake = seg_start
+
+        if not use_gate or gate.should_infer(frame, False):
+            # Pengganti Hands.process: beban CPU tetap
+            deadline = time.process_time() + infer_cost
+            while time.process_time() < deadline:
+                pass
+            if waiting_wake is not None and active:
+                wake_latencies.append((waiting_wake, t - waiting_wake))
+                waiting_wake = None
+
+        cpu[active] += time.process_time() - c0
+        wall[active] += time.perf_counter() - w0
+
+    usage = {active: cpu[active] / max(wall[active], 1e-9) for active in (False, True)}
+    print("Dengan motion gate:" if use_gate else "Tanpa motion gate:")
+    for active in (False, True):
+        name = "aktif" if active else "diam"
+        print(f"  CPU segmen {name}: {usage[active] * 100:5.1f}% core")
+    for seg_start, latency in wake_latencies:
+        print(f"  bangun di t={seg_start:.1f}s: {latency * 1000:.0f} ms")
+    if use_gate:
+        print("  " + gate.report())
+    return usage, [latency for _, latency in wake_latencies]
+
+
+def check(usage, latencies, max_idle_cpu=0.15, max_wake=0.4):
+    """Daftar pelanggaran batas: CPU segmen diam dan latensi bangun (kosong = lolos)"""
+    failures = []
+    if usage[False] > max_idle_cpu:
+        failures.append(f"CPU segmen diam {usage[False] * 100:.1f}% > {max_idle_cpu * 100:.0f}%")
+    for latency in latencies:
+        if latency > max_wake:
+            failures.append(f"latensi bangun {latency * 1000:.0f} ms > {max_wake * 1000:.0f} ms")
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ukur CPU dan latensi bangun motion gate")
+    parser.add_argument('--idle', type=float, default=6.0, help="durasi segmen diam (detik)")
+    parser.add_argument('--active', type=float, default=3.0, help="durasi segmen aktif (detik)")
+    parser.add_argument('--infer-ms', type=float, default=20.0, help="biaya inferensi tiruan")
+    parser.add_argument('--max-idle-cpu', type=float, default=15.0, help="batas CPU segmen diam (%% core)")
+    parser.add_argument('--max-wake-ms', type=float, default=400.0, help="batas latensi bangun")
+    args = parser.parse_args()
+
+    segments = [(args.active, True), (args.idle, False), (args.active, True), (args.idle, False)]
+    measure(segments, args.infer_ms / 1000.0, use_gate=False)
+    usage, latencies = measure(segments, args.infer_ms / 1000.0, use_gate=True)
+    failures = check(usage, latencies, args.max_idle_cpu / 100.0, args.max_wake_ms / 1000.0)
+    if not latencies:
+        failures.append("tidak ada bangun dari idle yang terukur")
+    for failure in failures:
+        print(f"GAGAL: {failure}")
+    raise SystemExit(1 if failures else 0)
@@ -0,0 +1,341 @@
+import argparse
+import multiprocessing as mproc
+import os
+import queue
+import time
+from collections import deque
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from landmark_results import (FACE_POINTS, HAND_POINTS, array_to_faces,
+                              array_to_hands, faces_to_array, hands_to_array)
+
+
+def make_slot_dtype(max_hands, max_faces):
+    """Layout satu slot hasil landmark di shared memory"""
+    return np.dtype([
+        ('seq', np.int64),
+        ('timestamp', np.float64),
+        ('infer_time', np.float64),
+        ('hand_count', np.int32),
+        ('face_count', np.int32),
+        ('handedness', np.int8, (max_hands,)),
+        ('hands', np.float32, (max_hands, HAND_POINTS, 3)),
+        ('faces', np.float32, (max_faces, FACE_POINTS, 3)),
+    ])
+
+
+def _open_source(source):
+    import cv2
+    # Angka = index kamera, selain itu dianggap path file video
+    if isinstance(source, str) and source.isdigit():
+        source = int(source)
+    return cv2.VideoCapture(source), isinstance(source, int)
+
+
+def _camera_worker(cam_idx, source, shm_name, num_cams, ring_size, max_hands, max_faces,
+                   with_face, max_frames, out_queue, stop_event):
+    """Proses worker: capture + Hands/FaceMesh sendiri untuk satu kamera"""
+    import cv2
+    import mediapipe as mp
+
+    slot_dtype = make_slot_dtype(max_hands, max_faces)
+    shm = shared_memory.SharedMemory(name=shm_name)
+    ring = np.ndarray((num_cams, ring_size), dtype=slot_dtype, buffer=shm.buf)[cam_idx]
+
+    cap, is_live = _open_source(source)
+    hands = mp.solutions.hands.Hands(
+        max_num_hands=max_hands,
+        model_complexity=0,
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5
+    )
+    face_mesh = None
+    if with_face:
+        face_mesh = mp.solutions.face_mesh.FaceMesh(
+            max_num_faces=max_faces,
+            refine_landmarks=True,
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5
+        )
+
+    seq = 0
+    slot = None
+    try:
+        while cap.isOpened() and not stop_event.is_set():
+            success, frame = cap.read()
+            if not success:
+                break
+            # Kamera live pakai jam dinding, file video pakai posisi frame
+            timestamp = time.time() if is_live else cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+
+            t0 = time.perf_counter()
+            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            frame_rgb.flags.writeable = False
+            hand_lms, handedness, hand_count = hands_to_array(hands.process(frame_rgb), max_hands)
+            face_lms, face_count = None, 0
+            if face_mesh is not None:
+                face_lms, face_count = faces_to_array(face_mesh.process(frame_rgb), max_faces)
+            infer_time = time.perf_counter() - t0
+
+            # Tulis data dulu, seq paling akhir sebagai penanda slot sudah lengkap
+            slot = ring[seq % ring_size]
+            slot['seq'] = -1
+            slot['timestamp'] = timestamp
+            slot['infer_time'] = infer_time
+            slot['hand_count'] = hand_count
+            slot['face_count'] = face_count
+            slot['handedness'] = handedness
+            slot['hands'] = hand_lms
+            if face_lms is not None:
+                slot['faces'] = face_lms
+            slot['seq'] = seq
+
+            out_queue.put((cam_idx, seq))
+            seq += 1
+            if max_frames and seq >= max_frames:
+                break
+    finally:
+        out_queue.put((cam_idx, None))
+        cap.release()
+        hands.close()
+        if face_mesh is not None:
+            face_mesh.close()
+        # Lepas semua view ke buffer sebelum shared memory ditutup
+        ring = slot = None
+        shm.close()
+
+
+class CameraFrame:
+    """Hasil landmark satu frame dari satu kamera"""
+    __slots__ = ('cam_idx', 'seq', 'timestamp', 'infer_time', 'hand_results', 'face_results')
+
+    def __init__(self, cam_idx, seq, timestamp, infer_time, hand_results, face_results):
+        self.cam_idx = cam_idx
+        self.seq = seq
+        self.timestamp = timestamp
+        self.infer_time = infer_time
+        self.hand_results = hand_results
+        self.face_results = face_results
+
+
+class TimestampMerger:
+    """Gabungkan frame dari banyak kamera yang timestamp-nya berdekatan"""
+
+    def __init__(self, num_cams, window=0.02, max_pending=8):
+        self.window = window
+        self.max_pending = max_pending
+        self.pending = [deque() for _ in range(num_cams)]
+        self.active = set(range(num_cams))
+
+    def push(self, frame):
+        self.pending[frame.cam_idx].append(frame)
+
+    def finish(self, cam_idx):
+        """Kamera sudah berhenti, jangan ditunggu lagi"""
+        self.active.discard(cam_idx)
+
+    def pop_ready(self, flush=False):
+        merged = []
+        while True:
+            heads = [q[0] for q in self.pending if q]
+            if not heads:
+                break
+            # Tunggu semua kamera aktif punya frame, kecuali ada yang sudah menumpuk
+            all_ready = all(self.pending[c] for c in self.active)
+            overflow = any(len(q) > self.max_pending for q in self.pending)
+            if not (all_ready or overflow or flush):
+                break
+
+            ref = min(f.timestamp for f in heads)
+            group = {}
+            for cam_idx, q in enumerate(self.pending):
+                if q and q[0].timestamp - ref <= self.window:
+                    group[cam_idx] = q.popleft()
+            merged.append((ref, group))
+        return merged
+
+
+class CameraStats:
+    def __init__(self):
+        self.frames = 0
+        self.dropped = 0
+        self.infer_total = 0.0
+        self.first_time = None
+        self.last_time = None
+
+    def update(self, infer_time):
+        now = time.perf_counter()
+        if self.first_time is None:
+            self.first_time = now
+        self.last_time = now
+        self.frames += 1
+        self.infer_total += infer_time
+
+    @property
+    def fps(self):
+        if self.frames < 2:
+            return 0.0
+        return (self.frames - 1) / max(self.last_time - self.first_time, 1e-9)
+
+    @property
+    def avg_infer_ms(self):
+        return 1000.0 * self.infer_total / self.frames if self.frames else 0.0
+
+
+class MultiCameraRunner:
+    """Satu proses inferensi per kamera, hasil dikirim lewat shared memory ke koordinator"""
+
+    def __init__(self, sources, with_face=False, max_hands=2, max_faces=1,
+                 ring_size=16, merge_window=0.02, max_frames=0):
+        self.sources = [str(s) for s in sources]
+        self.with_face = with_face
+        self.max_hands = max_hands
+        self.max_faces = max_faces
+        self.ring_size = ring_size
+        self.max_frames = max_frames
+        self.merger = TimestampMerger(len(self.sources), window=merge_window)
+        self.stats = [CameraStats() for _ in self.sources]
+
+        self.slot_dtype = make_slot_dtype(max_hands, max_faces)
+        self.shm = None
+        self.ring = None
+        self.processes = []
+        self.ctx = mproc.get_context('spawn')  # MediaPipe tidak aman di-fork
+        self.out_queue = self.ctx.Queue()
+        self.stop_event = self.ctx.Event()
+
+    def start(self):
+        num_cams = len(self.sources)
+        size = self.slot_dtype.itemsize * num_cams * self.ring_size
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+        self.ring = np.ndarray((num_cams, self.ring_size), dtype=self.slot_dtype, buffer=self.shm.buf)
+        self.ring['seq'] = -1
+
+        for cam_idx, source in enumerate(self.sources):
+            p = self.ctx.Process(
+                target=_camera_worker,
+                args=(cam_idx, source, self.shm.name, num_cams, self.ring_size,
+                      self.max_hands, self.max_faces, self.with_face, self.max_frames,
+                      self.out_queue, self.stop_event),
+                daemon=True)
+            p.start()
+            self.processes.append(p)
+
+    def _read_slot(self, cam_idx, seq):
+        live_slot = self.ring[cam_idx, seq % self.ring_size]
+        slot = live_slot.copy()
+        # Slot sudah/sedang ditimpa worker (koordinator terlalu lambat) -> frame hilang
+        if slot['seq'] != seq or live_slot['seq'] != seq:
+            return None
+        hand_results = array_to_hands(slot['hands'], slot['handedness'], slot['hand_count'])
+        face_results = array_to_faces(slot['faces'], slot['face_count']) if self.with_face else None
+        return CameraFrame(cam_idx, seq, float(slot['timestamp']), float(slot['infer_time']),
+                           hand_results, face_results)
+
+    def merged_frames(self, timeout=0.5):
+        """Generator hasil gabungan (timestamp, {cam_idx: CameraFrame})"""
+        running = set(range(len(self.sources)))
+        while running:
+            try:
+                cam_idx, seq = self.out_queue.get(timeout=timeout)
+            except queue.Empty:
+                if not any(p.is_alive() for p in self.processes):
+                    break
+                continue
+
+            if seq is None:
+                running.discard(cam_idx)
+                self.merger.finish(cam_idx)
+            else:
+                frame = self._read_slot(cam_idx, seq)
+                if frame is None:
+                    self.stats[cam_idx].dropped += 1
+                else:
+                    self.stats[cam_idx].update(frame.infer_time)
+                    self.merger.push(frame)
+
+            for merged in self.merger.pop_ready():
+                yield merged
+
+        for merged in self.merger.pop_ready(flush=True):
+            yield merged
+
+    def stop(self):
+        self.stop_event.set()
+        for p in self.processes:
+            p.join(timeout=2.0)
+            if p.is_alive():
+                p.terminate()
+        self.processes = []
+        if self.shm is not None:
+            self.ring = None
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def report(self):
+        lines = []
+        for cam_idx, (source, st) in enumerate(zip(self.sources, self.stats)):
+            lines.append(f"cam {cam_idx} ({source}): {st.frames} frame, {st.fps:.1f} FPS, "
+                         f"inferensi {st.avg_infer_ms:.1f} ms, drop {st.dropped}")
+        return "\n".join(lines)
+
+
+def benchmark_scaling(source, max_workers, frames_per_worker=200, with_face=False):
+    """Jalankan 1..max_workers salinan sumber yang sama, ukur throughput total"""
+    print(f"CPU cores: {os.cpu_count()}")
+    print(f"{'workers':>8} {'total FPS':>10} {'FPS/kamera':>11} {'speedup':>8}")
+    base_fps = None
+    for n in range(1, max_workers + 1):
+        runner = MultiCameraRunner([source] * n, with_face=with_face, max_frames=frames_per_worker)
+        runner.start()
+        try:
+            for _ in runner.merged_frames():
+                pass
+        finally:
+            runner.stop()
+        total_fps = sum(st.fps for st in runner.stats)
+        if base_fps is None:
+            base_fps = total_fps
+        print(f"{n:>8} {total_fps:>10.1f} {total_fps / n:>11.1f} {total_fps / max(base_fps, 1e-9):>7.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-camera hand/face tracking")
+    parser.add_argument('sources', nargs='*', default=['0'], help="index kamera atau path video")
+    parser.add_argument('--face', action='store_true', help="jalankan FaceMesh juga")
+    parser.add_argument('--max-hands', type=int, default=2)
+    parser.add_argument('--window', type=float, default=0.02, help="toleransi merge timestamp (detik)")
+    parser.add_argument('--benchmark', action='store_true', help="ukur skala terhadap jumlah worker")
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--frames', type=int, default=200)
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark_scaling(args.sources[0], args.max_workers, args.frames, args.face)
+        return
+
+    runner = MultiCameraRunner(args.sources, with_face=args.face, max_hands=args.max_hands,
+                               merge_window=args.window)
+    runner.start()
+    last_report = time.time()
+    merged_count = 0
+    try:
+        for timestamp, group in runner.merged_frames():
+            merged_count += 1
+            if time.time() - last_report > 1.0:
+                hands_seen = sum(len(f.hand_results.multi_hand_landmarks or []) for f in group.values())
+                print(f"[{timestamp:.3f}] merged {merged_count}, kamera {sorted(group)}, tangan {hands_seen}")
+                print(runner.report())
+                last_report = time.time()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        runner.stop()
+        print(runner.report())
+
+
+if __name__ == "__main__":
+    main()
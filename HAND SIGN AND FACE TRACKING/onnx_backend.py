@@ -0,0 +1,320 @@
+import argparse
+import math
+import os
+import time
+
+import cv2
+import numpy as np
+
+from landmark_results import ClassificationList, HandResults, LandmarkList
+
+# Model MediaPipe yang sudah dikonversi ke ONNX (mis. palm_detection_full & hand_landmark_full
+# dari PINTO model zoo); path bisa diatur lewat environment variable
+PALM_MODEL = os.environ.get('ONNX_PALM_MODEL', 'models/palm_detection_full.onnx')
+LANDMARK_MODEL = os.environ.get('ONNX_LANDMARK_MODEL', 'models/hand_landmark_full.onnx')
+THREADS = int(os.environ.get('ONNX_THREADS', '0'))  # 0 = biarkan ONNX Runtime memilih
+QUANTIZE = os.environ.get('ONNX_QUANTIZE', '0') == '1'
+
+PALM_SIZE = 192
+LANDMARK_SIZE = 224
+
+
+def quantize_model(path, out_path=None):
+    """Kuantisasi dinamis 8-bit (bobot), disimpan di samping model asli dan dipakai ulang
+
+    Bobot uint8: ConvInteger di CPU ONNX Runtime tidak mendukung bobot int8 bertanda.
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    out_path = out_path or os.path.splitext(path)[0] + '.int8.onnx'
+    if not os.path.exists(out_path) or os.path.getmtime(out_path) < os.path.getmtime(path):
+        quantize_dynamic(path, out_path, weight_type=QuantType.QUInt8)
+    return out_path
+
+
+def create_session(path, threads=0, quantize=False):
+    import onnxruntime as ort
+    if quantize:
+        path = quantize_model(path)
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = threads
+    options.inter_op_num_threads = 1
+    options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    return ort.InferenceSession(path, sess_options=options, providers=['CPUExecutionProvider'])
+
+
+def ssd_anchors(input_size=PALM_SIZE, strides=(8, 16, 16, 16), offset=0.5):
+    """Anchor SSD palm detection MediaPipe (2016 anchor untuk input 192), urutan y, x, anchor"""
+    anchors = []
+    layer = 0
+    while layer < len(strides):
+        stride = strides[layer]
+        repeats = 0
+        # Layer dengan stride sama berbagi satu grid; 2 anchor per layer (rasio 1 + skala interpolasi)
+        while layer < len(strides) and strides[layer] == stride:
+            repeats += 2
+            layer += 1
+        grid = math.ceil(input_size / stride)
+        ys, xs = np.meshgrid(np.arange(grid), np.arange(grid), indexing='ij')
+        centers = np.stack([(xs + offset) / grid, (ys + offset) / grid], axis=-1).reshape(-1, 1, 2)
+        anchors.append(np.repeat(centers, repeats, axis=1).reshape(-1, 2))
+    return np.concatenate(anchors).astype(np.float32)
+
+
+def sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-np.clip(x, -100.0, 100.0)))
+
+
+def nms(boxes, scores, iou_threshold=0.3):
+    """Greedy NMS; boxes (N, 4) = cx, cy, w, h"""
+    x0, y0 = boxes[:, 0] - boxes[:, 2] / 2, boxes[:, 1] - boxes[:, 3] / 2
+    x1, y1 = boxes[:, 0] + boxes[:, 2] / 2, boxes[:, 1] + boxes[:, 3] / 2
+    area = boxes[:, 2] * boxes[:, 3]
+    order = np.argsort(-scores)
+    keep = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        iw = np.clip(np.minimum(x1[i], x1[rest]) - np.maximum(x0[i], x0[rest]), 0, None)
+        ih = np.clip(np.minimum(y1[i], y1[rest]) - np.maximum(y0[i], y0[rest]), 0, None)
+        inter = iw * ih
+        iou = inter / (area[i] + area[rest] - inter + 1e-9)
+        order = rest[iou <= iou_threshold]
+    return keep
+
+
+def normalize_angle(angle):
+    return angle - 2 * math.pi * math.floor((angle + math.pi) / (2 * math.pi))
+
+
+class HandROI:
+    """Kotak persegi berotasi di piksel gambar (cx, cy, size, rotation)"""
+    __slots__ = ('cx', 'cy', 'size', 'rotation')
+
+    def __init__(self, cx, cy, size, rotation):
+        self.cx, self.cy, self.size, self.rotation = cx, cy, size, rotation
+
+    @classmethod
+    def from_box(cls, cx, cy, w, h, rotation, shift_y, scale):
+        # Geser sepanjang sumbu tangan (ke arah jari), lalu jadikan persegi dan perbesar
+        cx -= h * shift_y * math.sin(rotation)
+        cy += h * shift_y * math.cos(rotation)
+        return cls(cx, cy, max(w, h) * scale, rotation)
+
+    def crop_matrix(self, out_size):
+        """Matriks affine output (u, v) -> piksel sumber, untuk warpAffine + WARP_INVERSE_MAP"""
+        a = self.size / out_size
+        c, s = math.cos(self.rotation), math.sin(self.rotation)
+        half = out_size / 2
+        return np.array([[a * c, -a * s, self.cx - a * (c - s) * half],
+                         [a * s, a * c, self.cy - a * (s + c) * half]], dtype=np.float32)
+
+
+def hand_rotation(x0, y0, x1, y1):
+    """Rotasi agar arah pergelangan -> pangkal jari tengah menghadap ke atas"""
+    return normalize_angle(0.5 * math.pi - math.atan2(-(y1 - y0), x1 - x0))
+
+
+class OnnxHandBackend:
+    """Palm detection + hand landmark lewat ONNX Runtime CPU, hasil berbentuk Hands.process()
+
+    Seperti MediaPipe: palm detection hanya dijalankan saat jumlah tangan yang dilacak kurang
+    dari max_num_hands; tangan yang sudah dilacak memakai ROI dari landmark frame sebelumnya.
+    """
+    name = 'onnx'
+
+    def __init__(self, static_image_mode=False, max_num_hands=2, model_complexity=None,
+                 min_detection_confidence=0.5, min_tracking_confidence=0.5,
+                 palm_model=None, landmark_model=None, threads=None, quantize=None):
+        threads = THREADS if threads is None else threads
+        quantize = QUANTIZE if quantize is None else quantize
+        self.palm = create_session(palm_model or PALM_MODEL, threads, quantize)
+        self.landmark = create_session(landmark_model or LANDMARK_MODEL, threads, quantize)
+        self.static_image_mode = static_image_mode
+        self.max_num_hands = max_num_hands
+        self.min_detection_confidence = min_detection_confidence
+        self.min_tracking_confidence = min_tracking_confidence
+        self.anchors = ssd_anchors()
+        self.tracked = []  # HandROI dari frame sebelumnya
+
+        self._palm_input = self.palm.get_inputs()[0]
+        self._lm_input = self.landmark.get_inputs()[0]
+        self._palm_nchw = self._palm_input.shape[1] == 3
+        self._lm_nchw = self._lm_input.shape[1] == 3
+        self._lm_outputs = self._landmark_output_order()
+        self.palm_runs = 0
+        self.landmark_runs = 0
+
+    def _landmark_output_order(self):
+        """Urutan output model landmark: (landmark 63, presence, handedness)
+
+        Konversi model berbeda-beda nama outputnya; yang dipakai adalah ukuran dan urutan
+        seperti di tflite aslinya (landmark, flag tangan, handedness, world landmark).
+        """
+        outputs = self.landmark.get_outputs()
+        screen = [o.name for o in outputs if int(np.prod(o.shape[1:])) == 63 and 'world' not in o.name.lower()]
+        scalars = [o.name for o in outputs if int(np.prod(o.shape[1:])) == 1]
+        if not screen or len(scalars) < 2:
+            raise ValueError("output model landmark tidak dikenali (butuh landmark 63 + 2 skalar)")
+        return [screen[0], scalars[0], scalars[1]]
+
+    def _to_tensor(self, image, nchw):
+        tensor = image.astype(np.float32) / 255.0
+        if nchw:
+            tensor = tensor.transpose(2, 0, 1)
+        return tensor[None]
+
+    def detect_palms(self, image_rgb):
+        """Jalankan palm detection; hasil list HandROI dalam piksel gambar"""
+        h, w = image_rgb.shape[:2]
+        side = max(h, w)
+        pad_x, pad_y = (side - w) // 2, (side - h) // 2
+        # Letterbox ke persegi lalu resize ke 192
+        square = cv2.copyMakeBorder(image_rgb, pad_y, side - h - pad_y, pad_x, side - w - pad_x,
+                                    cv2.BORDER_CONSTANT, value=0)
+        tensor = self._to_tensor(cv2.resize(square, (PALM_SIZE, PALM_SIZE)), self._palm_nchw)
+        outputs = self.palm.run(None, {self._palm_input.name: tensor})
+        self.palm_runs += 1
+        regressors = next(o for o in outputs if o.shape[-1] == 18)[0]
+        scores = sigmoid(next(o for o in outputs if o.shape[-1] == 1)[0, :, 0])
+
+        mask = scores >= self.min_detection_confidence
+        if not mask.any():
+            return []
+        raw, anchors, scores = regressors[mask], self.anchors[mask], scores[mask]
+        boxes = raw[:, :4] / PALM_SIZE
+        boxes[:, :2] += anchors
+        keypoints = raw[:, 4:].reshape(-1, 7, 2) / PALM_SIZE + anchors[:, None, :]
+
+        rois = []
+        for i in nms(boxes, scores)[:self.max_num_hands]:
+            # Koordinat letterbox ternormalisasi -> piksel gambar asli
+            cx, cy = boxes[i, 0] * side - pad_x, boxes[i, 1] * side - pad_y
+            bw, bh = boxes[i, 2] * side, boxes[i, 3] * side
+            kp = keypoints[i] * side - (pad_x, pad_y)
+            # Keypoint 0 = pergelangan, 2 = pangkal jari tengah
+            rotation = hand_rotation(kp[0, 0], kp[0, 1], kp[2, 0], kp[2, 1])
+            rois.append(HandROI.from_box(cx, cy, bw, bh, rotation, shift_y=-0.5, scale=2.6))
+        return rois
+
+    def run_landmarks(self, image_rgb, roi):
+        """Landmark satu tangan di ROI; hasil (landmark (21, 3) piksel+z, presence, skor kanan)"""
+        matrix = roi.crop_matrix(LANDMARK_SIZE)
+        crop = cv2.warpAffine(image_rgb, matrix, (LANDMARK_SIZE, LANDMARK_SIZE),
+                              flags=cv2.INTER_LINEAR | cv2.WARP_INVERSE_MAP,
+                              borderMode=cv2.BORDER_CONSTANT)
+        tensor = self._to_tensor(crop, self._lm_nchw)
+        landmarks, presence, handedness = self.landmark.run(self._lm_outputs, {self._lm_input.name: tensor})
+        self.landmark_runs += 1
+        presence, handedness = float(presence.ravel()[0]), float(handedness.ravel()[0])
+        # Sebagian konversi mengeluarkan logit, bukan probabilitas
+        if not 0.0 <= presence <= 1.0:
+            presence = float(sigmoid(presence))
+        if not 0.0 <= handedness <= 1.0:
+            handedness = float(sigmoid(handedness))
+
+        points = landmarks.reshape(21, 3).astype(np.float64)
+        uv1 = np.concatenate([points[:, :2], np.ones((21, 1))], axis=1)
+        out = np.empty((21, 3))
+        out[:, :2] = uv1 @ matrix.T
+        out[:, 2] = points[:, 2] * roi.size / LANDMARK_SIZE
+        return out, presence, handedness
+
+    @staticmethod
+    def roi_from_landmarks(points):
+        """ROI frame berikutnya dari landmark (piksel) frame ini"""
+        rotation = hand_rotation(points[0, 0], points[0, 1], points[9, 0], points[9, 1])
+        c, s = math.cos(rotation), math.sin(rotation)
+        # Proyeksikan ke sumbu ROI (u = arah lebar, v = arah panjang tangan)
+        u = points[:, 0] * c + points[:, 1] * s
+        v = -points[:, 0] * s + points[:, 1] * c
+        cu, cv = (u.min() + u.max()) / 2, (v.min() + v.max()) / 2
+        cx, cy = cu * c - cv * s, cu * s + cv * c
+        return HandROI.from_box(cx, cy, u.max() - u.min(), v.max() - v.min(), rotation,
+                                shift_y=-0.1, scale=2.0)
+
+    def process(self, image_rgb):
+        h, w = image_rgb.shape[:2]
+        rois = [] if self.static_image_mode else list(self.tracked)
+        if len(rois) < self.max_num_hands:
+            for roi in self.detect_palms(image_rgb):
+                # Lewati deteksi yang jatuh di tangan yang sudah dilacak
+                if all(math.hypot(roi.cx - t.cx, roi.cy - t.cy) > 0.5 * t.size for t in rois):
+                    rois.append(roi)
+            rois = rois[:self.max_num_hands]
+
+        hands, labels, self.tracked = [], [], []
+        for roi in rois:
+            points, presence, right = self.run_landmarks(image_rgb, roi)
+            if presence < self.min_tracking_confidence:
+                continue
+            self.tracked.append(self.roi_from_landmarks(points))
+            normalized = points / (w, h, w)
+            hands.append(LandmarkList(normalized))
+            # Konvensi MediaPipe: skor = probabilitas tangan kanan (gambar dianggap di-mirror)
+            labels.append(ClassificationList('Right' if right > 0.5 else 'Left', max(right, 1.0 - right)))
+        return HandResults(hands, labels)
+
+    def close(self):
+        self.tracked = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def hand_errors(reference, results):
+    """Error landmark rata-rata (relatif panjang telapak) untuk tangan yang cocok, per frame"""
+    if not reference.multi_hand_landmarks or not results.multi_hand_landmarks:
+        return []
+    errors = []
+    candidates = [np.array([(lm.x, lm.y) for lm in hand.landmark]) for hand in results.multi_hand_landmarks]
+    for ref_hand in reference.multi_hand_landmarks:
+        ref = np.array([(lm.x, lm.y) for lm in ref_hand.landmark])
+        palm = np.linalg.norm(ref[9] - ref[0]) + 1e-9
+        best = min(candidates, key=lambda c: np.linalg.norm(c[0] - ref[0]))
+        errors.append(np.linalg.norm(best - ref, axis=1).mean() / palm)
+    return errors
+
+
+def compare(path, threads=(1, 4), limit=None):
+    """Akurasi vs kecepatan: MediaPipe (acuan) vs ONNX fp32/int8 dengan beberapa jumlah thread"""
+    from inference_backend import LegacyHandBackend, read_frames
+    frames, _ = read_frames(path, limit)
+    print(f"{len(frames)} frame dari {path}")
+
+    reference = LegacyHandBackend(max_num_hands=2, model_complexity=1)
+    ref_results = []
+    t0 = time.perf_counter()
+    for frame in frames:
+        ref_results.append(reference.process(frame))
+    ref_ms = (time.perf_counter() - t0) / len(frames) * 1000
+    reference.close()
+
+    print(f"{'backend':<20} {'ms/frame':>9} {'jumlah sama':>12} {'error':>7}")
+    print(f"{'mediapipe (acuan)':<20} {ref_ms:>9.2f} {'100%':>12} {'-':>7}")
+    for quantize in (False, True):
+        for n in threads:
+            backend = OnnxHandBackend(max_num_hands=2, threads=n, quantize=quantize)
+            elapsed, agree, errors = 0.0, 0, []
+            for frame, ref in zip(frames, ref_results):
+                t0 = time.perf_counter()
+                results = backend.process(frame)
+                elapsed += time.perf_counter() - t0
+                agree += len(ref.multi_hand_landmarks or []) == len(results.multi_hand_landmarks or [])
+                errors.extend(hand_errors(ref, results))
+            name = f"onnx {'int8' if quantize else 'fp32'} {n} thread"
+            error = f"{np.mean(errors):.3f}" if errors else '-'
+            print(f"{name:<20} {elapsed / len(frames) * 1000:>9.2f} {agree / len(frames):>11.0%} {error:>7}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bandingkan backend ONNX dengan MediaPipe")
+    parser.add_argument('video', help="klip rekaman")
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4])
+    parser.add_argument('--limit', type=int, help="jumlah frame maksimum")
+    args = parser.parse_args()
+    compare(args.video, args.threads, args.limit)
@@ -0,0 +1,306 @@
+import argparse
+import queue
+import threading
+import time
+
+from thread_scheduler import ThreadScheduler
+
+DROP_POLICIES = ('block', 'drop_oldest', 'drop_newest')
+
+
+class FramePacket:
+    """Satu frame yang mengalir antar stage, membawa nomor urut dan waktu capture"""
+    __slots__ = ('seq', 'capture_time', 'image', 'data')
+
+    def __init__(self, seq, capture_time, image):
+        self.seq = seq
+        self.capture_time = capture_time
+        self.image = image
+        self.data = {}
+
+
+class StageStats:
+    def __init__(self, name):
+        self.name = name
+        self.busy = 0.0
+        self.wait = 0.0     # capture: menunggu frame dari kamera, tidak dihitung busy
+        self.processed = 0
+        self.dropped = 0
+
+    def utilization(self, wall):
+        return self.busy / wall if wall > 0 else 0.0
+
+
+class BoundedChannel:
+    """Queue terbatas antar stage dengan kebijakan drop saat stage hilir tertinggal"""
+
+    def __init__(self, maxsize, policy, stats):
+        if policy not in DROP_POLICIES:
+            raise ValueError(f"drop policy tidak dikenal: {policy}")
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.policy = policy
+        self.stats = stats  # drop dicatat di stage pengirim
+
+    def put(self, packet, stop_event):
+        if self.policy == 'block':
+            while not stop_event.is_set():
+                try:
+                    self.queue.put(packet, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+        elif self.policy == 'drop_newest':
+            try:
+                self.queue.put_nowait(packet)
+            except queue.Full:
+                self.stats.dropped += 1
+        else:
+            # drop_oldest: buang frame paling lama agar hilir selalu dapat frame terbaru
+            while True:
+                try:
+                    self.queue.put_nowait(packet)
+                    return
+                except queue.Full:
+                    try:
+                        self.queue.get_nowait()
+                        self.stats.dropped += 1
+                    except queue.Empty:
+                        pass
+
+    def close(self, stop_event):
+        """Kirim sinyal selesai (None); tidak pernah di-drop"""
+        while not stop_event.is_set():
+            try:
+                self.queue.put(None, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def get(self, stop_event):
+        while not stop_event.is_set():
+            try:
+                return self.queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return None
+
+
+class PipelineRuntime:
+    """Capture -> stage worker -> render, tiap stage di thread sendiri dihubungkan queue terbatas
+
+    capture_fn() -> image atau None (selesai); setiap stage fn(packet) mengisi packet.data
+    dan mengembalikan packet (atau None untuk membuang frame); render_fn(packet) dijalankan
+    di thread pemanggil (cv2.imshow harus di main thread) dan mengembalikan False untuk berhenti.
+    grab_fn() opsional (mis. cap.grab, False = selesai) dipanggil sebelum capture_fn dan dihitung
+    sebagai waktu tunggu kamera, jadi utilisasi capture hanya decode/konversi (cap.retrieve).
+    scheduler (ThreadScheduler) memasang afinitas CPU 'capture', nama stage, dan 'render'.
+    """
+
+    def __init__(self, capture_fn, stages, render_fn, queue_size=2, drop_policy='drop_oldest',
+                 scheduler=None, grab_fn=None):
+        self.capture_fn = capture_fn
+        self.grab_fn = grab_fn
+        self.stages = stages
+        self.render_fn = render_fn
+        self.scheduler = scheduler if scheduler is not None else ThreadScheduler()
+        self.stop_event = threading.Event()
+
+        self.stats = [StageStats('capture')] + [StageStats(name) for name, _ in stages] + \
+                     [StageStats('render')]
+        self.channels = [BoundedChannel(queue_size, drop_policy, self.stats[i])
+                         for i in range(len(stages) + 1)]
+        self.threads = []
+        self.start_time = None
+        self.end_time = None
+        self.latencies = []
+
+    def _capture_loop(self):
+        self.scheduler.enter('capture')
+        st = self.stats[0]
+        seq = 0
+        while not self.stop_event.is_set():
+            t0 = time.perf_counter()
+            if self.grab_fn is not None:
+                if not self.grab_fn():
+                    break
+                t1 = time.perf_counter()
+                st.wait += t1 - t0
+                t0 = t1
+            image = self.capture_fn()
+            if image is None:
+                break
+            packet = FramePacket(seq, t0, image)
+            st.busy += time.perf_counter() - t0
+            st.processed += 1
+            seq += 1
+            self.channels[0].put(packet, self.stop_event)
+        # None = sinyal selesai, diteruskan ke semua stage
+        self.channels[0].close(self.stop_event)
+
+    def _stage_loop(self, index, fn):
+        self.scheduler.enter(self.stages[index][0])
+        st = self.stats[index + 1]
+        inbox, outbox = self.channels[index], self.channels[index + 1]
+        while not self.stop_event.is_set():
+            packet = inbox.get(self.stop_event)
+            if packet is None:
+                break
+            t0 = time.perf_counter()
+            packet = fn(packet)
+            st.busy += time.perf_counter() - t0
+            st.processed += 1
+            if packet is not None:
+                outbox.put(packet, self.stop_event)
+        outbox.close(self.stop_event)
+
+    def run(self):
+        self.start_time = time.perf_counter()
+        self.threads = [threading.Thread(target=self._capture_loop, name='capture', daemon=True)]
+        for i, (name, fn) in enumerate(self.stages):
+            self.threads.append(threading.Thread(target=self._stage_loop, args=(i, fn),
+                                                 name=name, daemon=True))
+        for t in self.threads:
+            t.start()
+
+        st = self.stats[-1]
+        last = self.channels[-1]
+        try:
+            # Render di main thread: afinitas hanya selama loop, dipulihkan setelahnya
+            with self.scheduler.scope('render'):
+                while True:
+                    packet = last.get(self.stop_event)
+                    if packet is None:
+                        break
+                    t0 = time.perf_counter()
+                    keep_going = self.render_fn(packet)
+                    st.busy += time.perf_counter() - t0
+                    st.processed += 1
+                    self.latencies.append(time.perf_counter() - packet.capture_time)
+                    if keep_going is False:
+                        break
+        finally:
+            self.stop()
+
+    def stop(self):
+        """Hentikan dan tunggu semua thread; sesudahnya cap.release() aman dipanggil
+
+        Tanpa timeout: capture bisa sedang di dalam grab_fn/capture_fn (cap.grab/retrieve),
+        dan release di tengah panggilan itu crash di backend kamera. Semua loop memeriksa
+        stop_event, jadi join hanya menunggu panggilan yang sedang berjalan.
+        """
+        self.stop_event.set()
+        for t in self.threads:
+            t.join()
+        if self.end_time is None:
+            self.end_time = time.perf_counter()
+
+    def bottleneck(self):
+        """Stage penghambat: hilir dari channel yang paling banyak membuang frame, atau (tanpa
+        drop) stage dengan waktu kerja terbesar; waktu tunggu kamera tidak dihitung"""
+        dropped = max(range(len(self.channels)), key=lambda i: self.stats[i].dropped)
+        if self.stats[dropped].dropped:
+            return self.stats[dropped + 1]
+        return max(self.stats, key=lambda s: s.busy)
+
+    def report(self):
+        wall = (self.end_time or time.perf_counter()) - self.start_time
+        lines = [f"{'stage':<12} {'frame':>6} {'ms/frame':>9} {'util':>6} {'tunggu':>7} {'drop':>6}"]
+        for st in self.stats:
+            per_frame = st.busy / st.processed * 1000 if st.processed else 0.0
+            lines.append(f"{st.name:<12} {st.processed:>6} {per_frame:>9.2f} "
+                         f"{st.utilization(wall) * 100:>5.0f}% {st.wait / wall * 100 if wall > 0 else 0:>6.0f}% "
+                         f"{st.dropped:>6}")
+        bottleneck = self.bottleneck()
+        lines.append(f"Throughput: {self.stats[-1].processed / wall:.1f} FPS, bottleneck: {bottleneck.name}")
+        if self.latencies:
+            ordered = sorted(self.latencies)
+            lines.append(f"Latensi capture->render: p50 {ordered[len(ordered) // 2] * 1000:.1f} ms, "
+                         f"p95 {ordered[int(len(ordered) * 0.95)] * 1000:.1f} ms")
+        return "\n".join(lines)
+
+
+def build_block_pipeline(source=0, display=True, queue_size=2, drop_policy='drop_oldest', streamer=None,
+                         scheduler=None):
+    """Contoh: UltimateHandBlock dipecah jadi capture / inferensi / logika / render"""
+    import cv2
+    from Block import UltimateHandBlock
+
+    scheduler = scheduler if scheduler is not None else ThreadScheduler()
+    scheduler.apply_process()
+    # Graph MediaPipe dibuat dengan afinitas inferensi agar thread internalnya ikut terkunci
+    with scheduler.scope('inference'):
+        app = UltimateHandBlock()
+    cap = cv2.VideoCapture(source)
+
+    def capture():
+        # Frame sudah di-grab (menunggu kamera); yang dihitung kerja hanya decode + flip
+        success, img = cap.retrieve()
+        return cv2.flip(img, 1) if success else None
+
+    def inference(packet):
+        packet.data['results'] = app.hands.process(cv2.cvtColor(packet.image, cv2.COLOR_BGR2RGB))
+        return packet
+
+    def logic(packet):
+        h, w = packet.image.shape[:2]
+        hands_info = app.get_hand_data(packet.data['results'], w, h)
+        app.update_blocks(hands_info)
+        # Salinan tangan & blok agar render tidak membaca state yang sedang diubah stage logika
+        # (HandFrame dan list pos blok dipakai ulang / diubah in-place)
+        packet.data['hands_info'] = hands_info.copy()
+        packet.data['blocks'] = [dict(b, pos=list(b['pos'])) for b in app.blocks]
+        return packet
+
+    state = {'p_time': 0.0}
+
+    def render(packet):
+        c_time = time.time()
+        fps = 1 / (c_time - state['p_time']) if c_time - state['p_time'] > 0 else 0
+        state['p_time'] = c_time
+        app.draw_scene(packet.image, packet.data['blocks'], packet.data['hands_info'], fps)
+        if streamer is not None:
+            streamer.publish(packet.image)
+        if not display:
+            return True
+        cv2.imshow("10-Finger Master Manipulator (pipeline)", packet.image)
+        return not (cv2.waitKey(1) & 0xFF == 27)
+
+    runtime = PipelineRuntime(capture, [('inference', inference), ('logic', logic)], render,
+                              queue_size=queue_size, drop_policy=drop_policy, scheduler=scheduler,
+                              grab_fn=cap.grab)
+    return runtime, cap
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Jalankan UltimateHandBlock sebagai pipeline")
+    parser.add_argument('--source', default='0', help="index kamera atau path video")
+    parser.add_argument('--queue-size', type=int, default=2)
+    parser.add_argument('--drop-policy', choices=DROP_POLICIES, default='drop_oldest')
+    parser.add_argument('--no-display', action='store_true')
+    parser.add_argument('--stream-port', type=int, help="stream MJPEG hasil render di port ini")
+    parser.add_argument('--stream-host', help="alamat bind stream (default STREAM_HOST / 127.0.0.1)")
+    parser.add_argument('--stream-quality', type=int, default=80)
+    parser.add_argument('--stream-scale', type=float, default=1.0)
+    parser.add_argument('--thread-config', help="JSON afinitas/thread per stage, atau 'auto'")
+    args = parser.parse_args()
+
+    streamer = None
+    if args.stream_port:
+        from stream_server import MjpegStreamer
+        streamer = MjpegStreamer(args.stream_host, args.stream_port, args.stream_quality, args.stream_scale).start()
+        print(f"Stream: http://{streamer.host}:{streamer.port}/")
+
+    source = int(args.source) if args.source.isdigit() else args.source
+    runtime, cap = build_block_pipeline(source, not args.no_display, args.queue_size, args.drop_policy,
+                                        streamer, ThreadScheduler.load(args.thread_config))
+    try:
+        runtime.run()
+    finally:
+        cap.release()
+        if streamer is not None:
+            print(streamer.report())
+            streamer.close()
+        if not args.no_display:
+            import cv2
+            cv2.destroyAllWindows()
+        print(runtime.report())
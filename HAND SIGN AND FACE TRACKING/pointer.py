@@ -0,0 +1,205 @@
+import argparse
+import time
+
+import numpy as np
+
+
+class ConstantVelocityKalman:
+    """Kalman filter 2D dengan state [x, y, vx, vy] dan model kecepatan konstan"""
+
+    def __init__(self, process_noise=3e5, measurement_noise=25.0):
+        self.q = process_noise      # variansi percepatan (px/s^2)^2
+        self.r = measurement_noise  # variansi pengukuran (px^2)
+        self.x = None
+        self.P = np.eye(4) * 1e3
+        self.H = np.array([[1.0, 0, 0, 0], [0, 1.0, 0, 0]])
+
+    def reset(self):
+        self.x = None
+        self.P = np.eye(4) * 1e3
+
+    def predict(self, dt):
+        F = np.array([[1, 0, dt, 0], [0, 1, 0, dt], [0, 0, 1, 0], [0, 0, 0, 1]], dtype=np.float64)
+        # Noise proses dari percepatan acak (model white-noise acceleration)
+        dt2, dt3, dt4 = dt * dt, dt ** 3 / 2, dt ** 4 / 4
+        Q = self.q * np.array([[dt4, 0, dt3, 0], [0, dt4, 0, dt3],
+                               [dt3, 0, dt2, 0], [0, dt3, 0, dt2]])
+        self.x = F @ self.x
+        self.P = F @ self.P @ F.T + Q
+
+    def update(self, z):
+        z = np.asarray(z, dtype=np.float64)
+        if self.x is None:
+            self.x = np.array([z[0], z[1], 0.0, 0.0])
+            return
+        y = z - self.H @ self.x
+        S = self.H @ self.P @ self.H.T + np.eye(2) * self.r
+        K = self.P @ self.H.T @ np.linalg.inv(S)
+        self.x = self.x + K @ y
+        self.P = (np.eye(4) - K @ self.H) @ self.P
+
+    def extrapolate(self, dt):
+        """Posisi perkiraan dt detik ke depan tanpa mengubah state"""
+        return self.x[:2] + self.x[2:] * dt
+
+    @property
+    def velocity(self):
+        return self.x[2:] if self.x is not None else np.zeros(2)
+
+
+class PointerEngine:
+    """Ujung jari -> posisi kursor: area aktif, prediksi latensi, dan kurva akselerasi"""
+
+    def __init__(self, screen_size, active_region=(0.15, 0.15, 0.85, 0.85),
+                 process_noise=3e5, measurement_noise=25.0, predict=True,
+                 accel_gain=0.5, accel_threshold=400.0, max_gain=2.0, recenter=0.15,
+                 latency_smoothing=0.1, clock=time.time):
+        self.screen_w, self.screen_h = screen_size
+        # Area aktif di frame kamera (x0, y0, x1, y1 ternormalisasi) dipetakan ke seluruh layar,
+        # jadi sudut layar bisa dicapai tanpa jari keluar frame
+        self.active_region = active_region
+        # q 3e5: error saat tampil di bawah EMA lama untuk latensi 30-150 ms, dan jitter saat jari
+        # diam setara EMA pada 80 ms (q lebih besar lebih akurat saat bergerak tapi lebih getar)
+        self.kalman = ConstantVelocityKalman(process_noise, measurement_noise)
+        self.predict = predict
+        self.accel_gain = accel_gain            # tambahan gain per kelipatan accel_threshold
+        self.accel_threshold = accel_threshold  # kecepatan (px/s) mulai akselerasi
+        self.max_gain = max_gain
+        self.recenter = recenter                # tarikan kembali ke posisi absolut agar tidak drift
+        self.latency_smoothing = latency_smoothing
+        self.clock = clock
+
+        self.latency = 0.0          # EMA latensi capture -> dispatch (detik)
+        self.last_capture = None
+        self.last_target = None
+        self.output = None
+
+    def reset(self):
+        """Panggil saat tangan hilang supaya filter tidak meluncur dari posisi lama"""
+        self.kalman.reset()
+        self.last_capture = None
+        self.last_target = None
+        self.output = None
+
+    def map_to_screen(self, x, y):
+        x0, y0, x1, y1 = self.active_region
+        u = min(max((x - x0) / (x1 - x0), 0.0), 1.0)
+        v = min(max((y - y0) / (y1 - y0), 0.0), 1.0)
+        return u * (self.screen_w - 1), v * (self.screen_h - 1)
+
+    def gain(self, speed):
+        """Kurva akselerasi: 1x di bawah threshold, naik linear sampai max_gain"""
+        extra = max(0.0, speed - self.accel_threshold) / self.accel_threshold
+        return min(1.0 + self.accel_gain * extra, self.max_gain)
+
+    def update(self, x, y, capture_time):
+        """Masukkan posisi ujung jari ternormalisasi; hasil (x, y) piksel layar untuk dikirim"""
+        measured = self.map_to_screen(x, y)
+        if self.last_capture is not None:
+            dt = max(capture_time - self.last_capture, 1e-3)
+            self.kalman.predict(dt)
+        self.kalman.update(measured)
+        self.last_capture = capture_time
+
+        # Latensi terukur capture -> sekarang (saat kursor akan dikirim)
+        latency = max(self.clock() - capture_time, 0.0)
+        self.latency += self.latency_smoothing * (latency - self.latency)
+
+        target = self.kalman.extrapolate(self.latency) if self.predict else self.kalman.x[:2].copy()
+
+        if self.output is None:
+            self.output = target.copy()
+        else:
+            speed = float(np.hypot(*self.kalman.velocity))
+            self.output = self.output + self.gain(speed) * (target - self.last_target)
+            self.output += self.recenter * (target - self.output)
+        self.last_target = target
+
+        # Satu piksel dari tepi: sudut (0, 0) memicu fail-safe pyautogui (FailSafeException)
+        self.output[0] = min(max(self.output[0], 1.0), self.screen_w - 2)
+        self.output[1] = min(max(self.output[1], 1.0), self.screen_h - 2)
+        return int(self.output[0]), int(self.output[1])
+
+
+def evaluate(timestamps, points, latency, screen_size=(1920, 1080), **engine_kwargs):
+    """Error posisi saat kursor tampil (t + latency) dibanding jejak jari sebenarnya
+
+    Dibandingkan: tanpa filter, EMA lama (HandScrollCursor, 0.7) dan prediktor Kalman.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    points = np.asarray(points, dtype=np.float64)
+    clock_now = {'t': 0.0}
+    engine = PointerEngine(screen_size, accel_gain=0.0, recenter=1.0,
+                           clock=lambda: clock_now['t'], **engine_kwargs)
+    truth = np.array([engine.map_to_screen(x, y) for x, y in points])
+
+    errors = {'mentah': [], 'EMA 0.7': [], 'Kalman+prediksi': []}
+    ema = None
+    for t, (x, y), raw in zip(timestamps, points, truth):
+        shown_at = t + latency
+        if shown_at > timestamps[-1]:
+            break
+        clock_now['t'] = shown_at
+        actual = np.array([np.interp(shown_at, timestamps, truth[:, 0]),
+                           np.interp(shown_at, timestamps, truth[:, 1])])
+        ema = raw if ema is None else 0.7 * raw + 0.3 * ema
+        predicted = np.array(engine.update(x, y, t))
+        errors['mentah'].append(np.hypot(*(raw - actual)))
+        errors['EMA 0.7'].append(np.hypot(*(ema - actual)))
+        errors['Kalman+prediksi'].append(np.hypot(*(predicted - actual)))
+    return {name: np.asarray(e) for name, e in errors.items()}
+
+
+def jitter(latency, noise=0.003, duration=5.0, fps=30.0, screen_size=(1920, 1080), seed=1, **engine_kwargs):
+    """Getaran kursor (std piksel) saat jari diam dengan noise deteksi: (mentah, EMA 0.7, Kalman)"""
+    rng = np.random.default_rng(seed)
+    timestamps = np.arange(0, duration, 1.0 / fps)
+    points = 0.5 + rng.normal(0, noise, size=(len(timestamps), 2))
+    clock_now = {'t': 0.0}
+    engine = PointerEngine(screen_size, clock=lambda: clock_now['t'], **engine_kwargs)
+    raw, ema, out = [], [], []
+    for t, (x, y) in zip(timestamps, points):
+        clock_now['t'] = t + latency
+        raw.append(np.array(engine.map_to_screen(x, y)))
+        ema.append(raw[-1] if not ema else 0.7 * raw[-1] + 0.3 * ema[-1])
+        out.append(engine.update(x, y, t))
+    skip = int(fps)  # lewati konvergensi awal filter
+    return tuple(float(np.asarray(s, dtype=np.float64)[skip:].std(axis=0).mean()) for s in (raw, ema, out))
+
+
+def synthetic_trajectory(duration=10.0, fps=30.0, seed=0):
+    """Jejak jari sintetis: gerakan halus + noise deteksi"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(0, duration, 1.0 / fps)
+    x = 0.5 + 0.3 * np.sin(2 * np.pi * 0.3 * t) + 0.05 * np.sin(2 * np.pi * 1.1 * t)
+    y = 0.5 + 0.25 * np.cos(2 * np.pi * 0.2 * t)
+    pts = np.stack([x, y], axis=1) + rng.normal(0, 0.002, size=(len(t), 2))
+    return t, pts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluasi error prediksi kursor")
+    parser.add_argument('--session', help="rekaman .npz dari session_replay.py (default: sintetis)")
+    parser.add_argument('--latency-ms', type=float, default=80.0)
+    args = parser.parse_args()
+
+    if args.session:
+        from session_replay import Session
+        session = Session(args.session)
+        has_hand = session.hand_count > 0
+        timestamps = session.timestamps[has_hand]
+        points = session.hand_landmarks[has_hand, 0, 8, :2]  # ujung telunjuk tangan pertama
+    else:
+        timestamps, points = synthetic_trajectory()
+
+    results = evaluate(timestamps, points, args.latency_ms / 1000.0)
+    print(f"Latensi {args.latency_ms:.0f} ms, {len(timestamps)} frame")
+    for name, err in results.items():
+        print(f"  {name:<16} rata-rata {err.mean():6.1f} px, p95 {np.percentile(err, 95):6.1f} px")
+    raw_jitter, ema_jitter, engine_jitter = jitter(args.latency_ms / 1000.0)
+    print(f"  Jitter jari diam: mentah {raw_jitter:.1f} px, EMA {ema_jitter:.1f} px, Kalman {engine_jitter:.1f} px")
+
+    # Engine harus lebih baik dari EMA lama yang digantikannya
+    if results['Kalman+prediksi'].mean() >= results['EMA 0.7'].mean():
+        raise SystemExit("GAGAL: error Kalman+prediksi tidak lebih kecil dari EMA 0.7")
+    print("OK: Kalman+prediksi lebih akurat dari EMA 0.7")
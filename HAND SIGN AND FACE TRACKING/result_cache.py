@@ -0,0 +1,367 @@
+import argparse
+import atexit
+import hashlib
+import json
+import os
+import shutil
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+
+import numpy as np
+
+from landmark_results import (HANDEDNESS_CODES, HandResults, array_to_faces, array_to_hands,
+                              landmarks_to_array)
+
+# Satu entri: MAGIC, jenis (0 tangan, 1 wajah), jumlah, titik per struktur, lalu
+# label int8[jumlah] (pad 4) dan landmark float32[jumlah, titik, 3]
+MAGIC = b'LMRC'
+ENTRY_HEADER = struct.Struct('<4sBBH')
+KINDS = {'hand': 0, 'face': 1}
+INDEX_FILE = 'index.json'
+
+
+def config_digest(kind, backend_kind, settings):
+    """Hash konfigurasi model: hasil hanya dipakai ulang untuk konfigurasi yang persis sama"""
+    payload = json.dumps([kind, backend_kind, sorted(settings.items())], default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).digest()
+
+
+def frame_key(image, config, previous=b''):
+    """blake2b(frame + konfigurasi [+ kunci frame sebelumnya]) sebagai hex 32 karakter"""
+    h = hashlib.blake2b(config, digest_size=16)
+    h.update(previous)
+    h.update(struct.pack('<3I', *image.shape[:2], image.shape[2] if image.ndim == 3 else 1))
+    h.update(np.ascontiguousarray(image).data)
+    return h.hexdigest()
+
+
+def encode_results(kind, results):
+    """HandResults/FaceResults -> bytes entri"""
+    if kind == 'hand':
+        lists = results.multi_hand_landmarks or []
+        labels = [HANDEDNESS_CODES.get(h.classification[0].label, -1) for h in (results.multi_handedness or [])]
+        labels += [-1] * (len(lists) - len(labels))
+    else:
+        lists = results.multi_face_landmarks or []
+        labels = [0] * len(lists)
+    points = len(lists[0].landmark) if lists else 0
+    landmarks = np.zeros((len(lists), points, 3), dtype=np.float32)
+    for i, lms in enumerate(lists):
+        landmarks_to_array(lms, landmarks[i])
+    label_bytes = np.asarray(labels, dtype=np.int8).tobytes()
+    label_bytes += b'\x00' * (-len(label_bytes) % 4)
+    return ENTRY_HEADER.pack(MAGIC, KINDS[kind], len(lists), points) + label_bytes + landmarks.tobytes()
+
+
+def decode_results(data):
+    """bytes entri -> (jenis, landmark (n, titik, 3), label int8 (n,))"""
+    magic, kind, count, points = ENTRY_HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("entri cache rusak")
+    offset = ENTRY_HEADER.size
+    labels = np.frombuffer(data, dtype=np.int8, count=count, offset=offset)
+    offset += count + (-count % 4)
+    landmarks = np.frombuffer(data, dtype=np.float32, count=count * points * 3,
+                              offset=offset).reshape(count, points, 3)
+    return ('hand', 'face')[kind], landmarks, labels
+
+
+def results_from_entry(data):
+    kind, landmarks, labels = decode_results(data)
+    if kind == 'hand':
+        return array_to_hands(landmarks, labels, len(labels))
+    return array_to_faces(landmarks, len(labels))
+
+
+def compare_entries(a, b, tolerance=1e-5):
+    """None bila sama, selain itu alasan perbedaan"""
+    kind_a, lm_a, labels_a = decode_results(a)
+    kind_b, lm_b, labels_b = decode_results(b)
+    if kind_a != kind_b or lm_a.shape != lm_b.shape:
+        return f"jumlah/bentuk berbeda: {lm_a.shape} vs {lm_b.shape}"
+    if not np.array_equal(labels_a, labels_b):
+        return f"handedness berbeda: {labels_a.tolist()} vs {labels_b.tolist()}"
+    if lm_a.size:
+        diff = float(np.abs(lm_a - lm_b).max())
+        if diff > tolerance:
+            return f"landmark berbeda maks {diff:.2e}"
+    return None
+
+
+class ResultCache:
+    """Cache hasil landmark di disk: satu file kecil per kunci, index LRU di memori
+
+    Lookup hanya memeriksa dict di memori lalu membaca beberapa KB dari disk (biasanya page
+    cache), jadi hit berbiaya mikrodetik; biaya utama sisi pemanggil adalah hash frame.
+    Saat total ukuran melebihi max_bytes, entri yang paling lama tidak dipakai dihapus.
+    Urutan LRU disimpan di index.json saat close(); tanpa index, direktori di-scan ulang.
+    """
+
+    def __init__(self, directory='result_cache', max_bytes=256 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self.index = self._load_index()   # key -> ukuran, urutan = LRU (terlama dulu)
+        self.total = sum(self.index.values())
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def _load_index(self):
+        index = OrderedDict()
+        try:
+            with open(os.path.join(self.directory, INDEX_FILE), encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            # Index hilang / rusak: scan file entri, urutkan menurut waktu ubah
+            entries = []
+            for sub in os.listdir(self.directory):
+                folder = os.path.join(self.directory, sub)
+                if len(sub) == 2 and os.path.isdir(folder):
+                    for name in os.listdir(folder):
+                        if len(name) != 32:
+                            continue   # sisa file sementara
+                        st = os.stat(os.path.join(folder, name))
+                        entries.append((st.st_mtime, name, st.st_size))
+            entries = [[name, size] for _, name, size in sorted(entries)]
+        for key, size in entries:
+            if os.path.exists(self._path(key)):
+                index[key] = size
+        return index
+
+    def __len__(self):
+        return len(self.index)
+
+    def get(self, key):
+        """bytes entri atau None"""
+        with self._lock:
+            if key not in self.index:
+                self.misses += 1
+                return None
+            self.index.move_to_end(key)
+        try:
+            with open(self._path(key), 'rb') as f:
+                data = f.read()
+        except OSError:
+            with self._lock:
+                self.total -= self.index.pop(key, 0)
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def put(self, key, data):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Tulis ke file sementara lalu rename agar pembaca tidak pernah melihat entri setengah jadi
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+        with self._lock:
+            self.total += len(data) - self.index.pop(key, 0)
+            self.index[key] = len(data)
+            self._evict()
+
+    def _evict(self):
+        """Hapus entri LRU sampai total <= max_bytes (dipanggil dengan lock dipegang)"""
+        while self.total > self.max_bytes and len(self.index) > 1:
+            key, size = self.index.popitem(last=False)
+            self.total -= size
+            self.evicted += 1
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def flush(self):
+        with self._lock:
+            entries = [[key, size] for key, size in self.index.items()]
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.json.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(entries, f)
+        os.replace(tmp, os.path.join(self.directory, INDEX_FILE))
+
+    def close(self):
+        self.flush()
+
+    def clear(self):
+        with self._lock:
+            self.index.clear()
+            self.total = 0
+        shutil.rmtree(self.directory, ignore_errors=True)
+        os.makedirs(self.directory, exist_ok=True)
+
+
+_caches = {}
+
+
+def open_cache(directory, max_bytes=256 * 1024 * 1024):
+    """Satu ResultCache per direktori untuk seluruh proses, index disimpan saat keluar"""
+    directory = os.path.abspath(directory)
+    if directory not in _caches:
+        cache = ResultCache(directory, max_bytes)
+        atexit.register(cache.close)
+        _caches[directory] = cache
+    return _caches[directory]
+
+
+class CachedBackend:
+    """Pembungkus backend tangan/wajah dengan process() yang memakai ResultCache
+
+    Mode tracking (static_image_mode=False) membuat hasil bergantung pada frame sebelumnya,
+    jadi kunci dirantai dengan kunci frame sebelumnya: klip yang sama dari awal akan hit,
+    urutan lain tidak pernah salah ambil. Saat miss setelah beberapa hit, `warmup` frame
+    terakhir diputar ulang ke backend dulu agar tracker-nya mendekati kondisi run penuh.
+
+    strict=True menjalankan backend di setiap frame dan membandingkan hasilnya dengan entri
+    cache; perbedaan menimbulkan ValueError (mis. versi model / MediaPipe berubah).
+    """
+
+    def __init__(self, backend, cache, kind, config, chained=True, strict=False, warmup=15,
+                 tolerance=1e-5):
+        if kind not in KINDS:
+            raise ValueError(f"jenis hasil tidak dikenal: {kind}")
+        self.backend = backend
+        self.cache = cache
+        self.kind = kind
+        self.config = config
+        self.chained = chained
+        self.strict = strict
+        self.tolerance = tolerance
+        self.recent = deque(maxlen=warmup)   # frame yang dilayani dari cache sejak run backend terakhir
+        self._previous = b''
+        self.hits = 0
+        self.misses = 0
+        self.verified = 0
+        self.hash_time = 0.0
+        self.lookup_time = 0.0
+
+    def process(self, image_rgb):
+        t0 = time.perf_counter()
+        key = frame_key(image_rgb, self.config, self._previous if self.chained else b'')
+        t1 = time.perf_counter()
+        data = self.cache.get(key)
+        t2 = time.perf_counter()
+        self.hash_time += t1 - t0
+        self.lookup_time += t2 - t1
+        if self.chained:
+            self._previous = bytes.fromhex(key)
+
+        if data is not None and not self.strict:
+            self.hits += 1
+            self.recent.append(image_rgb)
+            return results_from_entry(data)
+
+        if data is None and self.chained and self.recent:
+            # Tracker belum melihat frame yang dilayani cache; putar ulang beberapa terakhir
+            for frame in self.recent:
+                self.backend.process(frame)
+        self.recent.clear()
+        results = self.backend.process(image_rgb)
+        fresh = encode_results(self.kind, results)
+        if data is None:
+            self.misses += 1
+            self.cache.put(key, fresh)
+        else:
+            self.hits += 1
+            reason = compare_entries(data, fresh, self.tolerance)
+            if reason is not None:
+                raise ValueError(f"hasil cache berbeda dari {type(self.backend).__name__}: {reason}")
+            self.verified += 1
+        return results
+
+    def reset(self):
+        """Mulai rantai kunci baru (mis. klip baru dari awal)"""
+        self._previous = b''
+        self.recent.clear()
+
+    def report(self):
+        frames = self.hits + self.misses
+        if not frames:
+            return f"cache {self.kind}: belum ada frame"
+        return (f"cache {self.kind}: {self.hits}/{frames} hit, hash {self.hash_time / frames * 1e6:.0f} us, "
+                f"lookup {self.lookup_time / frames * 1e6:.0f} us per frame"
+                + (f", {self.verified} diverifikasi" if self.strict else ""))
+
+    def close(self):
+        self.backend.close()
+        self.cache.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _SyntheticHands:
+    """Backend uji tanpa MediaPipe: landmark deterministik dari isi frame + waktu proses tetap"""
+
+    def __init__(self, cost=0.01):
+        self.cost = cost
+        self.calls = 0
+
+    def process(self, image_rgb):
+        from landmark_results import ClassificationList, LandmarkList
+        self.calls += 1
+        time.sleep(self.cost)
+        seed = int(image_rgb[0, 0, 0]) * 256 + int(image_rgb[0, 1, 0])
+        points = np.random.default_rng(seed).random((21, 3)).astype(np.float32)
+        return HandResults([LandmarkList(points)], [ClassificationList('Right')])
+
+    def close(self):
+        pass
+
+
+def benchmark(video=None, frames=300, size=(1280, 720), max_bytes=256 * 1024 * 1024):
+    """Run dingin (miss), run hangat (hit) dan run strict pada klip yang sama"""
+    directory = tempfile.mkdtemp(prefix='result_cache_')
+    try:
+        if video:
+            from inference_backend import create_hand_backend, read_frames
+            clip, _ = read_frames(video, frames)
+            settings = {'max_num_hands': 2, 'model_complexity': 0}
+
+            def make_backend():
+                return create_hand_backend('legacy', cache=False, **settings)
+        else:
+            rng = np.random.default_rng(0)
+            clip = [rng.integers(0, 255, (size[1], size[0], 3), dtype=np.uint8) for _ in range(frames)]
+            settings = {'synthetic': True}
+            make_backend = _SyntheticHands
+        config = config_digest('hand', 'bench', settings)
+        print(f"{len(clip)} frame {clip[0].shape[1]}x{clip[0].shape[0]}")
+        print(f"{'run':<8} {'ms/frame':>9} {'hit':>6} {'hash us':>8} {'lookup us':>10} {'total us':>9}")
+        for name, strict in (('dingin', False), ('hangat', False), ('strict', True)):
+            cache = ResultCache(directory, max_bytes)
+            backend = CachedBackend(make_backend(), cache, 'hand', config, strict=strict)
+            t0 = time.perf_counter()
+            for frame in clip:
+                backend.process(frame)
+            elapsed = (time.perf_counter() - t0) / len(clip)
+            n = len(clip)
+            print(f"{name:<8} {elapsed * 1000:>9.2f} {backend.hits / n:>6.0%} "
+                  f"{backend.hash_time / n * 1e6:>8.0f} {backend.lookup_time / n * 1e6:>10.1f} "
+                  f"{elapsed * 1e6:>9.0f}")
+            backend.close()
+        print(f"{len(cache)} entri, {cache.total / 1024:.0f} KiB di disk")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark cache hasil landmark")
+    parser.add_argument('--video', help="klip untuk Hands sungguhan (default: frame + backend sintetis)")
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--max-mb', type=int, default=256)
+    args = parser.parse_args()
+    benchmark(args.video, args.frames, max_bytes=args.max_mb * 1024 * 1024)
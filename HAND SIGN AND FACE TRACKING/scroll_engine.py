@@ -0,0 +1,205 @@
+import argparse
+import threading
+import time
+
+import numpy as np
+
+from input_backend import FakeInputBackend, create_input_backend
+from thread_scheduler import ThreadScheduler
+
+# Kecepatan dasar per gesture (unit scroll/detik), setara burst lama 3*15 dan 8*15 per 100 ms
+GESTURE_SPEEDS = {'SCROLL_UP': 450.0, 'SCROLL_DOWN': -450.0, 'FAST_SCROLL': 1200.0}
+
+
+class ScrollEngine:
+    """Scroll kontinu: kecepatan dari gesture + gerak ujung jari, diintegrasikan di thread sendiri
+
+    Thread engine berjalan pada `rate` Hz: kecepatan mendekati target selama gesture dipegang,
+    lalu meluncur (momentum) dan melambat dengan gesekan eksponensial saat gesture dilepas.
+    Posisi pecahan diakumulasi dan hanya bagian bulatnya yang dikirim, jadi delta kecil dan
+    tergabung dengan sendirinya bila backend lambat.
+    """
+
+    def __init__(self, backend=None, rate=120.0, speeds=None, finger_gain=1500.0,
+                 response=12.0, friction=4.0, max_speed=3000.0, stop_speed=5.0,
+                 tracer=None, clock=time.perf_counter, scheduler=None):
+        # Backend apa pun dengan scroll(units), mis. dari input_backend.create_input_backend()
+        self.backend = backend if backend is not None else create_input_backend()
+        self.period = 1.0 / rate
+        self.speeds = speeds if speeds is not None else GESTURE_SPEEDS
+        self.finger_gain = finger_gain  # unit/detik per tinggi frame ujung jari digeser dari titik awal
+        self.response = response        # 1/detik, seberapa cepat kecepatan mengejar target
+        self.friction = friction        # 1/detik, peluruhan momentum setelah gesture dilepas
+        self.max_speed = max_speed
+        self.stop_speed = stop_speed
+        self.tracer = tracer
+        self.clock = clock
+        # Thread dispatch berjalan dengan afinitas stage 'input'
+        self.scheduler = scheduler if scheduler is not None else ThreadScheduler()
+
+        self._lock = threading.Lock()
+        self._target = None     # None = tidak ada gesture scroll, momentum saja
+        self._anchor = None
+        self._gesture = None
+        self._trace = None
+        self.velocity = 0.0
+        self.accumulator = 0.0
+
+        self.ticks = 0
+        self.events = 0
+        self.units = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def update_hand(self, gesture, tip_y=None, trace=None):
+        """Dipanggil per frame dari loop kamera; tip_y ternormalisasi (0 = atas frame)"""
+        base = self.speeds.get(gesture)
+        with self._lock:
+            if base is None:
+                self._target = None
+                self._anchor = None
+                self._gesture = None
+                return
+            if gesture != self._gesture or self._anchor is None:
+                # Gesture baru: posisi jari sekarang jadi titik nol
+                self._gesture = gesture
+                self._anchor = tip_y
+                self._trace = trace
+            target = base
+            if tip_y is not None and self._anchor is not None:
+                # Jari digeser naik = scroll naik lebih cepat, turun = lebih lambat / berbalik
+                target += self.finger_gain * (self._anchor - tip_y)
+            self._target = float(np.clip(target, -self.max_speed, self.max_speed))
+
+    def release(self):
+        self.update_hand(None)
+
+    def step(self, dt):
+        """Satu langkah integrasi; hasil: delta bulat yang harus dikirim (0 bila tidak ada)"""
+        with self._lock:
+            target = self._target
+        if target is not None:
+            self.velocity += (target - self.velocity) * (1.0 - np.exp(-self.response * dt))
+        else:
+            self.velocity *= np.exp(-self.friction * dt)
+            if abs(self.velocity) < self.stop_speed:
+                self.velocity = 0.0
+                self.accumulator = 0.0
+        self.accumulator += self.velocity * dt
+        delta = int(self.accumulator)
+        self.accumulator -= delta
+        self.ticks += 1
+        if delta:
+            self.backend.scroll(delta)
+            self.events += 1
+            self.units += abs(delta)
+            # Dispatch pertama setelah gesture dimulai dicatat pada frame pemicunya
+            with self._lock:
+                trace, self._trace = self._trace, None
+            if trace is not None and self.tracer is not None:
+                self.tracer.action('scroll', trace)
+        return delta
+
+    def _loop(self):
+        next_tick = self.clock()
+        last = next_tick
+        while not self._stop.is_set():
+            next_tick += self.period
+            wait = next_tick - self.clock()
+            if wait > 0:
+                time.sleep(wait)
+            else:
+                # Tertinggal (mis. GC atau CPU sibuk): jangan kejar tick yang hilang satu per satu
+                next_tick = self.clock()
+            now = self.clock()
+            self.step(now - last)
+            last = now
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = self.scheduler.thread('input', self._loop, name='scroll')
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    @property
+    def moving(self):
+        return self.velocity != 0.0
+
+
+def smoothness(events, window=0.05):
+    """(event/detik, CV kecepatan per jendela) selama scroll aktif; CV kecil = lebih halus"""
+    if len(events) < 2:
+        return 0.0, float('nan')
+    times = np.array([t for t, _ in events])
+    units = np.abs(np.array([u for _, u in events], dtype=np.float64))
+    span = times[-1] - times[0]
+    bins = np.arange(times[0], times[-1] + window, window)
+    per_window = np.histogram(times, bins=bins, weights=units)[0]
+    return len(events) / span if span > 0 else 0.0, per_window.std() / per_window.mean()
+
+
+def legacy_bursts(gestures, fps, cooldown=0.1, sensitivity=15):
+    """Simulasi AdvancedHandScroll lama: burst tetap maksimal sekali per cooldown"""
+    events = []
+    last = -1.0
+    for i, gesture in enumerate(gestures):
+        t = i / fps
+        if gesture in GESTURE_SPEEDS and t - last > cooldown:
+            clicks = 8 if gesture == 'FAST_SCROLL' else 3
+            events.append((t, clicks * sensitivity * (-1 if gesture == 'SCROLL_DOWN' else 1)))
+            last = t
+    return events
+
+
+def _run_engine(gestures, fps, rate, call_cost):
+    """Jalankan engine dengan backend palsu berbiaya call_cost per scroll(); (event, waktu lepas, momentum)"""
+    backend = FakeInputBackend(call_cost=call_cost)
+    engine = ScrollEngine(backend, rate=rate).start()
+    for gesture in gestures:
+        engine.update_hand(gesture, tip_y=0.5)
+        time.sleep(1.0 / fps)
+    engine.release()
+    release_time = time.perf_counter()
+    while engine.moving:
+        time.sleep(0.01)
+    coast = time.perf_counter() - release_time
+    engine.stop()
+    return backend.scrolls(), release_time, coast
+
+
+def measure(duration=3.0, fps=30.0, rate=120.0, call_cost=0.002):
+    """Burst lama vs engine; engine diukur tanpa biaya backend, dengan biaya pyautogui tanpa
+    pause (call_cost, ukur dengan input_backend.py) dan dengan PAUSE bawaan 0.1 s"""
+    gestures = ['SCROLL_UP'] * int(duration * fps)
+    rows = [('burst', legacy_bursts(gestures, fps))]
+    coasts = []
+    for name, cost in (('engine', 0.0), ('pyautogui', call_cost), ('pyautogui+P', 0.1)):
+        scrolls, release_time, coast = _run_engine(gestures, fps, rate, cost)
+        rows.append((name, [e for e in scrolls if e[0] <= release_time]))
+        coasts.append((name, coast, sum(abs(u) for t, u in scrolls if t > release_time)))
+
+    print(f"{'mode':<12} {'event/s':>8} {'unit/event':>11} {'CV 50ms':>8}")
+    for name, events in rows:
+        rate_, cv = smoothness(events)
+        per_event = np.mean([abs(u) for _, u in events]) if events else 0.0
+        print(f"{name:<12} {rate_:>8.1f} {per_event:>11.1f} {cv:>8.2f}")
+    for name, coast, units in coasts:
+        print(f"Momentum setelah dilepas ({name}): {coast * 1000:.0f} ms, {units} unit")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ukur laju event dan kehalusan scroll engine")
+    parser.add_argument('--duration', type=float, default=3.0)
+    parser.add_argument('--fps', type=float, default=30.0)
+    parser.add_argument('--rate', type=float, default=120.0)
+    parser.add_argument('--call-cost', type=float, default=0.002,
+                        help="biaya pyautogui.scroll() tanpa pause per panggilan (detik)")
+    args = parser.parse_args()
+    measure(args.duration, args.fps, args.rate, args.call_cost)
@@ -0,0 +1,201 @@
+import argparse
+import time
+
+import numpy as np
+
+from landmark_results import (FACE_POINTS, HAND_POINTS, array_to_faces,
+                              array_to_hands, faces_to_array, hands_to_array)
+
+
+class SessionRecorder:
+    """Simpan timestamp + hasil tangan/wajah MediaPipe setiap frame"""
+
+    def __init__(self, max_hands=2, max_faces=1):
+        self.max_hands = max_hands
+        self.max_faces = max_faces
+        self.frame_size = (0, 0)
+        self.timestamps = []
+        self.hand_landmarks = []
+        self.handedness = []
+        self.hand_count = []
+        self.face_landmarks = []
+        self.face_count = []
+
+    def record(self, timestamp, hand_results, face_results=None, frame_size=None):
+        if frame_size is not None:
+            self.frame_size = frame_size
+        hand_lms, handedness, hand_count = hands_to_array(hand_results, self.max_hands)
+        self.timestamps.append(timestamp)
+        self.hand_landmarks.append(hand_lms)
+        self.handedness.append(handedness)
+        self.hand_count.append(hand_count)
+        if face_results is None and not self.face_count:
+            return  # rekaman tanpa wajah (mis. Block.py) tidak menyimpan array wajah sama sekali
+        # Frame tanpa hasil wajah diisi nol dengan count 0, termasuk frame sebelum wajah
+        # pertama, supaya semua array sepanjang timestamps
+        face_lms, face_count = faces_to_array(face_results, self.max_faces)
+        for _ in range(len(self.timestamps) - len(self.face_count) - 1):
+            self.face_landmarks.append(np.zeros_like(face_lms))
+            self.face_count.append(0)
+        self.face_landmarks.append(face_lms)
+        self.face_count.append(face_count)
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def save(self, path):
+        arrays = {
+            'timestamps': np.asarray(self.timestamps, dtype=np.float64),
+            'frame_size': np.asarray(self.frame_size, dtype=np.int32),
+            'hand_landmarks': np.asarray(self.hand_landmarks, dtype=np.float32).reshape(
+                -1, self.max_hands, HAND_POINTS, 3),
+            'handedness': np.asarray(self.handedness, dtype=np.int8).reshape(-1, self.max_hands),
+            'hand_count': np.asarray(self.hand_count, dtype=np.int32),
+        }
+        if self.face_landmarks:
+            arrays['face_landmarks'] = np.asarray(self.face_landmarks, dtype=np.float32).reshape(
+                -1, self.max_faces, FACE_POINTS, 3)
+            arrays['face_count'] = np.asarray(self.face_count, dtype=np.int32)
+        np.savez_compressed(path, **arrays)
+
+
+class Session:
+    """Rekaman sesi yang sudah dimuat dari file .npz"""
+
+    def __init__(self, path):
+        data = np.load(path)
+        self.timestamps = data['timestamps']
+        self.frame_size = tuple(int(v) for v in data['frame_size'])
+        self.hand_landmarks = data['hand_landmarks']
+        self.handedness = data['handedness']
+        self.hand_count = data['hand_count']
+        self.face_landmarks = data['face_landmarks'] if 'face_landmarks' in data else None
+        self.face_count = data['face_count'] if 'face_count' in data else None
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def hand_results(self, i):
+        return array_to_hands(self.hand_landmarks[i], self.handedness[i], self.hand_count[i])
+
+    def face_results(self, i):
+        if self.face_landmarks is None:
+            return None
+        return array_to_faces(self.face_landmarks[i], self.face_count[i])
+
+
+class ReplayClock:
+    """Pengganti time.time(): mengembalikan timestamp frame rekaman yang sedang diputar"""
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+
+class ReplayHands:
+    """Pengganti Hands: process() mengembalikan hasil rekaman berikutnya"""
+
+    def __init__(self, session, clock=None):
+        self.session = session
+        self.clock = clock
+        self.index = 0
+
+    def process(self, image=None):
+        i = self.index
+        self.index += 1
+        if self.clock is not None:
+            self.clock.now = float(self.session.timestamps[i])
+        return self.session.hand_results(i)
+
+    def close(self):
+        pass
+
+
+class ReplayDriver:
+    """Putar ulang sesi ke kelas aplikasi tanpa kamera dan tanpa Hands.process"""
+
+    def __init__(self, session):
+        self.session = session
+        self.clock = ReplayClock(float(session.timestamps[0]) if len(session) else 0.0)
+
+    def frames(self):
+        """Generator (index, hand_results, face_results); clock ikut maju setiap frame"""
+        # Hasil dibangun dulu supaya benchmark hanya mengukur logika aplikasi
+        hand_results = [self.session.hand_results(i) for i in range(len(self.session))]
+        face_results = [self.session.face_results(i) for i in range(len(self.session))]
+        for i in range(len(self.session)):
+            self.clock.now = float(self.session.timestamps[i])
+            yield i, hand_results[i], face_results[i]
+
+    def replay_block(self, app):
+        """Jalankan logika UltimateHandBlock; app harus dibuat dengan clock=driver.clock"""
+        w, h = self.session.frame_size
+        for _, hand_results, _ in self.frames():
+            app.update_blocks(app.get_hand_data(hand_results, w, h))
+        return [(tuple(b['pos']), b['size'], b['id']) for b in app.blocks]
+
+    def replay_cube(self, app):
+        """Jalankan logika SpatialAutoCube, kembalikan state akhir"""
+        for _, hand_results, _ in self.frames():
+            app.update_state(app.get_hand_info(hand_results))
+            app.project_cube()
+        return (app.curr_pos.round(6).tolist(), app.curr_scale.round(6).tolist(),
+                round(float(app.curr_angle), 6))
+
+
+def make_app(name, clock):
+    if name == 'block':
+        from Block import UltimateHandBlock
+        return UltimateHandBlock(clock=clock)
+    from kegabutan import SpatialAutoCube
+    return SpatialAutoCube()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rekam / putar ulang sesi landmark")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    rec = sub.add_parser('record', help="jalankan aplikasi dengan kamera dan simpan hasilnya")
+    rec.add_argument('output')
+    rec.add_argument('--app', choices=['block', 'cube'], default='block')
+
+    rep = sub.add_parser('replay', help="putar ulang rekaman ke logika aplikasi")
+    rep.add_argument('session')
+    rep.add_argument('--app', choices=['block', 'cube'], default='block')
+    rep.add_argument('--repeat', type=int, default=1, help="ulangi untuk benchmark")
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        recorder = SessionRecorder(max_hands=4)
+        try:
+            make_app(args.app, time.time).run(recorder=recorder)
+        finally:
+            recorder.save(args.output)
+            print(f"{len(recorder)} frame disimpan ke {args.output}")
+        return
+
+    session = Session(args.session)
+    final_state = None
+    total_time = 0.0
+    for _ in range(args.repeat):
+        driver = ReplayDriver(session)
+        app = make_app(args.app, driver.clock)
+        t0 = time.perf_counter()
+        if args.app == 'block':
+            final_state = driver.replay_block(app)
+        else:
+            final_state = driver.replay_cube(app)
+        total_time += time.perf_counter() - t0
+
+    frames = len(session) * args.repeat
+    duration = session.timestamps[-1] - session.timestamps[0] if len(session) > 1 else 0.0
+    print(f"State akhir: {final_state}")
+    print(f"{frames} frame dalam {total_time * 1000:.1f} ms "
+          f"({frames / max(total_time, 1e-9):.0f} frame/s, "
+          f"{duration * args.repeat / max(total_time, 1e-9):.0f}x real time)")
+
+
+if __name__ == "__main__":
+    main()
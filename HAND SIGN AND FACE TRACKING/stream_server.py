@@ -0,0 +1,330 @@
+import argparse
+import math
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import cv2
+import numpy as np
+
+BOUNDARY = 'frame'
+
+# Alamat bind default; endpoint tanpa autentikasi (dan /settings lewat GET), jadi hanya
+# loopback kecuali diminta eksplisit, mis. STREAM_HOST=0.0.0.0
+STREAM_HOST = os.environ.get('STREAM_HOST', '127.0.0.1')
+
+INDEX_PAGE = b"""<!doctype html>
+<html><head><title>Hand tracking</title></head>
+<body style="margin:0;background:#000"><img src="/stream.mjpg" style="width:100%"></body></html>
+"""
+
+
+class ClientStats:
+    def __init__(self, address):
+        self.address = address
+        self.sent = 0
+        self.dropped = 0   # frame terbaru yang terlewat karena klien masih mengirim frame sebelumnya
+        self.connected = time.perf_counter()
+
+
+class MjpegStreamer:
+    """Stream MJPEG lewat HTTP dari frame hasil render
+
+    publish(image) dipanggil dari stage render; encode JPEG berjalan sekali per frame di thread
+    pool dan bytes hasilnya dipakai bersama oleh semua klien. Setiap klien selalu mengirim frame
+    terbaru: klien lambat melewatkan frame di antaranya, tidak menumpuk antrean dan tidak
+    memperlambat render maupun klien lain. Bila semua worker encode masih sibuk, frame baru dibuang.
+
+    Endpoint: / (halaman), /stream.mjpg, /snapshot.jpg, /settings?quality=..&scale=..
+    """
+
+    def __init__(self, host=None, port=8080, quality=80, scale=1.0, workers=2):
+        self.host = host or STREAM_HOST
+        self.port = port
+        self.quality = quality
+        self.scale = scale
+        self.workers = workers
+
+        self._cond = threading.Condition()
+        self._jpeg = None
+        self._jpeg_seq = 0
+        self._seq = 0
+        self._in_flight = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='jpeg')
+        self._server = None
+        self._thread = None
+        self._closed = False
+        self.clients = []
+
+        self.encoded = 0
+        self.skipped = 0          # frame dibuang karena worker encode penuh
+        self.encode_time = 0.0
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}/"
+
+    def start(self):
+        handler = type('Handler', (_StreamHandler,), {'streamer': self})
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self._server.daemon_threads = True
+        # port=0: biarkan OS memilih port bebas
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name='mjpeg-http', daemon=True)
+        self._thread.start()
+        return self
+
+    def set_quality(self, quality=None, scale=None):
+        if quality is not None:
+            self.quality = int(min(max(quality, 1), 100))
+        if scale is not None:
+            self.scale = float(min(max(scale, 0.05), 1.0))
+
+    def publish(self, image):
+        """Jadwalkan encode frame BGR; tidak blocking, dan tidak melakukan apa pun tanpa klien"""
+        with self._cond:
+            if self._closed or (not self.clients and self._server is not None):
+                return False
+            if self._in_flight >= self.workers:
+                self.skipped += 1
+                return False
+            self._in_flight += 1
+            self._seq += 1
+            seq = self._seq
+        # Salinan karena frame render biasanya dipakai ulang / ditimpa di frame berikutnya
+        self._executor.submit(self._encode, seq, image.copy(), self.quality, self.scale)
+        return True
+
+    def _encode(self, seq, image, quality, scale):
+        try:
+            t0 = time.perf_counter()
+            if scale != 1.0:
+                image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            ok, buf = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            elapsed = time.perf_counter() - t0
+            if not ok:
+                return
+            data = buf.tobytes()
+            with self._cond:
+                self.encode_time += elapsed
+                self.encoded += 1
+                # Encode paralel bisa selesai tidak berurutan; jangan mundur ke frame lama
+                if seq > self._jpeg_seq:
+                    self._jpeg, self._jpeg_seq = data, seq
+                    self._cond.notify_all()
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+
+    def latest(self, after_seq=0, timeout=1.0):
+        """(seq, jpeg) pertama yang lebih baru dari after_seq, atau (after_seq, None) saat timeout"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._closed or self._jpeg_seq > after_seq, timeout)
+            if self._closed or self._jpeg_seq <= after_seq:
+                return after_seq, None
+            return self._jpeg_seq, self._jpeg
+
+    def _add_client(self, stats):
+        with self._cond:
+            self.clients.append(stats)
+
+    def _remove_client(self, stats):
+        with self._cond:
+            self.clients.remove(stats)
+
+    def report(self):
+        encode_ms = self.encode_time / self.encoded * 1000 if self.encoded else 0.0
+        return (f"MJPEG: {self.encoded} frame di-encode ({encode_ms:.1f} ms/frame), "
+                f"{self.skipped} dilewati, {len(self.clients)} klien terhubung")
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _StreamHandler(BaseHTTPRequestHandler):
+    streamer = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/':
+            self._send_bytes('text/html', INDEX_PAGE)
+        elif url.path == '/stream.mjpg':
+            self._stream()
+        elif url.path == '/snapshot.jpg':
+            # Terdaftar sebagai klien sebentar agar publish() mulai meng-encode
+            stats = ClientStats(self.client_address)
+            self.streamer._add_client(stats)
+            try:
+                _, jpeg = self.streamer.latest(self.streamer._jpeg_seq, timeout=2.0)
+            finally:
+                self.streamer._remove_client(stats)
+            if jpeg is None:
+                self.send_error(503, "belum ada frame")
+            else:
+                self._send_bytes('image/jpeg', jpeg)
+        elif url.path == '/settings':
+            query = parse_qs(url.query)
+            try:
+                quality = int(query['quality'][0]) if 'quality' in query else None
+                scale = float(query['scale'][0]) if 'scale' in query else None
+                if scale is not None and not math.isfinite(scale):
+                    raise ValueError(scale)
+            except ValueError:
+                self.send_error(400, "quality harus bilangan bulat, scale bilangan desimal")
+                return
+            self.streamer.set_quality(quality, scale)
+            self._send_bytes('text/plain', f"quality={self.streamer.quality} scale={self.streamer.scale}\n".encode())
+        else:
+            self.send_error(404)
+
+    def _send_bytes(self, content_type, body):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self):
+        self.send_response(200)
+        self.send_header('Cache-Control', 'no-cache, private')
+        self.send_header('Pragma', 'no-cache')
+        self.send_header('Content-Type', f'multipart/x-mixed-replace; boundary={BOUNDARY}')
+        self.end_headers()
+        stats = ClientStats(self.client_address)
+        self.streamer._add_client(stats)
+        seq = 0
+        try:
+            while True:
+                new_seq, jpeg = self.streamer.latest(seq)
+                if jpeg is None:
+                    if self.streamer._closed:
+                        break
+                    continue
+                if seq:
+                    stats.dropped += new_seq - seq - 1
+                seq = new_seq
+                self.wfile.write(f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                                 f"Content-Length: {len(jpeg)}\r\n\r\n".encode('ascii'))
+                self.wfile.write(jpeg)
+                self.wfile.write(b"\r\n")
+                stats.sent += 1
+        except (BrokenPipeError, ConnectionResetError, socket.timeout):
+            pass
+        finally:
+            self.streamer._remove_client(stats)
+
+
+def synthetic_frame(size, t, out=None):
+    """Frame uji BGR: gradien + kotak yang bergerak (tidak sepenuhnya mudah dikompres)"""
+    w, h = size
+    if out is None:
+        out = np.empty((h, w, 3), dtype=np.uint8)
+        out[:] = np.linspace(0, 255, w, dtype=np.uint8)[None, :, None]
+        out[h // 2:] = np.random.default_rng(0).integers(0, 255, (h - h // 2, w, 3), dtype=np.uint8)
+    x = int((np.sin(t) * 0.5 + 0.5) * (w - 100))
+    frame = out.copy()
+    cv2.rectangle(frame, (x, 50), (x + 100, 150), (0, 255, 0), -1)
+    cv2.putText(frame, f"{t:.2f}", (10, 40), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 255, 255), 2)
+    return frame, out
+
+
+def _loopback_client(port, stop, result, read_delay=0.0):
+    """Klien HTTP mentah yang menghitung frame dengan mencari boundary di stream"""
+    marker = f"--{BOUNDARY}".encode('ascii')
+    count, tail = 0, b""
+    with socket.create_connection(('127.0.0.1', port)) as sock:
+        sock.settimeout(1.0)
+        sock.sendall(b"GET /stream.mjpg HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        while not stop.is_set():
+            try:
+                chunk = sock.recv(65536)
+            except socket.timeout:
+                continue
+            if not chunk:
+                break
+            data = tail + chunk
+            count += data.count(marker)
+            tail = data[-len(marker) + 1:]
+            if read_delay:
+                time.sleep(read_delay)
+    result.append(count)
+
+
+def benchmark(client_counts=(1, 8, 32, 64), seconds=5.0, size=(1280, 720), fps=30,
+              quality=80, scale=1.0, workers=2, slow_fraction=0.25):
+    """FPS yang diterima klien loopback, drop klien lambat dan biaya encode per jumlah klien"""
+    print(f"{size[0]}x{size[1]} @ {fps} FPS, quality {quality}, scale {scale}, {workers} worker encode")
+    print(f"{'klien':>6} {'encode/s':>9} {'ms/enc':>7} {'FPS cepat':>10} {'FPS lambat':>11} "
+          f"{'drop':>6} {'CPU':>6}")
+    for n in client_counts:
+        streamer = MjpegStreamer('127.0.0.1', 0, quality=quality, scale=scale, workers=workers).start()
+        stop = threading.Event()
+        fast, slow = [], []
+        n_slow = int(n * slow_fraction)
+        threads = [threading.Thread(target=_loopback_client,
+                                    args=(streamer.port, stop, slow if i < n_slow else fast,
+                                          0.2 if i < n_slow else 0.0), daemon=True)
+                   for i in range(n)]
+        for t in threads:
+            t.start()
+        deadline = time.perf_counter() + 2.0
+        while len(streamer.clients) < n and time.perf_counter() < deadline:
+            time.sleep(0.01)
+
+        base = None
+        cpu0, t0 = time.process_time(), time.perf_counter()
+        next_frame = t0
+        while time.perf_counter() - t0 < seconds:
+            frame, base = synthetic_frame(size, time.perf_counter() - t0, base)
+            streamer.publish(frame)
+            next_frame += 1.0 / fps
+            time.sleep(max(0.0, next_frame - time.perf_counter()))
+        elapsed = time.perf_counter() - t0
+        cpu = time.process_time() - cpu0
+
+        dropped = sum(c.dropped for c in streamer.clients)
+        sent = sum(c.sent for c in streamer.clients)
+        stop.set()
+        streamer.close()
+        for t in threads:
+            t.join(timeout=2.0)
+        encode_ms = streamer.encode_time / streamer.encoded * 1000 if streamer.encoded else 0.0
+        fast_fps = np.mean(fast) / elapsed if fast else 0.0
+        slow_fps = np.mean(slow) / elapsed if slow else 0.0
+        drop = dropped / (sent + dropped) if sent + dropped else 0.0
+        print(f"{n:>6} {streamer.encoded / elapsed:>9.1f} {encode_ms:>7.1f} {fast_fps:>10.1f} "
+              f"{slow_fps:>11.1f} {drop:>6.0%} {cpu / elapsed:>6.0%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark server MJPEG dengan banyak klien loopback")
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 8, 32, 64])
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--width', type=int, default=1280)
+    parser.add_argument('--height', type=int, default=720)
+    parser.add_argument('--fps', type=int, default=30)
+    parser.add_argument('--quality', type=int, default=80)
+    parser.add_argument('--scale', type=float, default=1.0)
+    parser.add_argument('--workers', type=int, default=2)
+    args = parser.parse_args()
+    benchmark(args.clients, args.seconds, (args.width, args.height), args.fps,
+              args.quality, args.scale, args.workers)
@@ -0,0 +1,288 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# File konfigurasi default untuk semua aplikasi, bisa diganti lewat environment variable
+THREAD_CONFIG = os.environ.get('THREAD_CONFIG')
+
+STAGES = ('capture', 'inference', 'render', 'audio', 'input')
+
+# Variabel pool thread BLAS/OpenMP; hanya berlaku bila di-set sebelum numpy di-import
+BLAS_ENV = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS', 'NUMEXPR_NUM_THREADS')
+
+HAS_AFFINITY = hasattr(os, 'sched_setaffinity')
+
+
+def available_cpus():
+    return sorted(os.sched_getaffinity(0)) if HAS_AFFINITY else list(range(os.cpu_count() or 1))
+
+
+def default_config(cpus=None):
+    """Pembagian core yang masuk akal: capture+audio+input berbagi satu core, render satu core,
+    sisanya untuk inferensi (graph MediaPipe/ONNX dan pool OpenCV)"""
+    cpus = list(cpus) if cpus is not None else available_cpus()
+    n = len(cpus)
+    if n <= 2:
+        # Terlalu sedikit core untuk dipisah; cukup batasi pool agar tidak oversubscribe
+        return {'process': {'cv2_threads': 1, 'blas_threads': 1},
+                'stages': {'inference': {'threads': n}}}
+    light, render, heavy = cpus[:1], cpus[-1:], cpus[1:-1]
+    return {
+        'process': {'cv2_threads': len(heavy), 'blas_threads': 1},
+        'stages': {
+            'capture': {'cpus': light},
+            'inference': {'cpus': heavy, 'threads': len(heavy)},
+            'render': {'cpus': render},
+            'audio': {'cpus': light, 'nice': 5},
+            'input': {'cpus': light},
+        },
+    }
+
+
+def set_blas_env(threads):
+    """Batasi pool thread NumPy/BLAS; harus dipanggil sebelum `import numpy`"""
+    for name in BLAS_ENV:
+        os.environ.setdefault(name, str(threads))
+
+
+class ThreadScheduler:
+    """Jumlah thread dan afinitas CPU per stage dari konfigurasi JSON
+
+    {"process": {"cv2_threads": 2, "blas_threads": 1},
+     "stages": {"inference": {"cpus": [1, 2], "threads": 2}, "audio": {"cpus": [0], "nice": 5}, ...}}
+
+    Afinitas dipasang per thread (Linux: sched_setaffinity(0) hanya mengenai thread pemanggil)
+    dan diwarisi thread yang dibuat sesudahnya. Karena itu graph MediaPipe sebaiknya dibuat di
+    dalam scope('inference'): thread internal graph ikut terkunci ke core inferensi, tidak
+    berebut dengan capture/render/audio. Stage yang tidak ada di konfigurasi tidak diubah.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or {}
+        self.process = self.config.get('process', {})
+        self.stages = self.config.get('stages', {})
+        unknown = set(self.stages) - set(STAGES)
+        if unknown:
+            raise ValueError(f"stage tidak dikenal: {', '.join(sorted(unknown))} (pilihan: {', '.join(STAGES)})")
+        self.applied = {}
+
+    @classmethod
+    def load(cls, path=None):
+        """Scheduler dari file JSON (default THREAD_CONFIG); tanpa file = tidak mengubah apa pun"""
+        path = path or THREAD_CONFIG
+        if not path:
+            return cls()
+        if path == 'auto':
+            return cls(default_config())
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    @property
+    def enabled(self):
+        return bool(self.process or self.stages)
+
+    def apply_process(self):
+        """Batas pool OpenCV dan BLAS untuk seluruh proses
+
+        Tanpa cv2_threads/blas_threads eksplisit, dipakai jumlah thread stage 'inference'
+        (pool OpenCV dan BLAS hanya dipakai berat oleh inferensi).
+        """
+        inference = self.threads('inference', None)
+        blas = self.process.get('blas_threads', inference)
+        if blas is not None:
+            set_blas_env(blas)
+            # Bila numpy sudah ter-import, env var tidak berpengaruh lagi; threadpoolctl bisa
+            try:
+                from threadpoolctl import threadpool_limits
+                threadpool_limits(blas)
+            except ImportError:
+                pass
+        cv2_threads = self.process.get('cv2_threads', inference)
+        if cv2_threads is not None:
+            import cv2
+            cv2.setNumThreads(cv2_threads)
+        return self
+
+    def threads(self, stage, default=0):
+        """Jumlah thread yang diminta untuk stage (intra_op_num_threads ONNX Runtime, pool cv2/BLAS)"""
+        return self.stages.get(stage, {}).get('threads', default)
+
+    def enter(self, stage, nice=True):
+        """Pasang afinitas/prioritas stage ke thread pemanggil; hasil afinitas sebelumnya"""
+        settings = self.stages.get(stage)
+        if not settings or not HAS_AFFINITY:
+            return None
+        previous = os.sched_getaffinity(0)
+        if 'cpus' in settings:
+            os.sched_setaffinity(0, settings['cpus'])
+        if nice and 'nice' in settings:
+            # Linux: nice per thread lewat TID
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), settings['nice'])
+        self.applied[threading.current_thread().name] = stage
+        return previous
+
+    @contextmanager
+    def scope(self, stage):
+        """Afinitas stage sementara, mis. saat membuat graph agar thread-nya mewarisi afinitas
+
+        Hanya afinitas: nice tidak dipasang karena menurunkannya kembali butuh CAP_SYS_NICE,
+        jadi tidak bisa dipulihkan dan akan tertinggal di thread pemanggil.
+        """
+        previous = self.enter(stage, nice=False)
+        try:
+            yield self
+        finally:
+            if previous is not None:
+                os.sched_setaffinity(0, previous)
+
+    def wrap(self, stage, target):
+        def run(*args, **kwargs):
+            self.enter(stage)
+            return target(*args, **kwargs)
+        return run
+
+    def thread(self, stage, target, args=(), daemon=True, name=None):
+        """threading.Thread yang memasang afinitas stage di awal"""
+        return threading.Thread(target=self.wrap(stage, target), args=args, daemon=daemon,
+                                name=name or stage)
+
+
+_scheduler = None
+
+
+def get_scheduler():
+    """Scheduler bersama untuk proses ini (dimuat sekali dari THREAD_CONFIG)"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = ThreadScheduler.load()
+    return _scheduler
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))] if ordered else 0.0
+
+
+def _workload(cores, mode, seconds, size):
+    """Dijalankan di proses anak: pipeline sintetis capture -> inference -> render + audio + input
+
+    Beban inferensi memakai pool OpenCV (filter) dan BLAS (matmul) seperti graph sungguhan
+    yang berebut core; thread input berdetak 120 Hz dan keterlambatannya diukur.
+    """
+    cpus = available_cpus()[:cores]
+    if HAS_AFFINITY:
+        os.sched_setaffinity(0, cpus)
+    scheduler = ThreadScheduler(default_config(cpus) if mode == 'scheduled' else None)
+    if 'blas_threads' in scheduler.process:
+        set_blas_env(scheduler.process['blas_threads'])
+    import cv2
+    import numpy as np
+    from pipeline import PipelineRuntime
+
+    scheduler.apply_process()
+    w, h = size
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 255, (h, w, 3), dtype=np.uint8)
+    weights = rng.standard_normal((256, 256)).astype(np.float32)
+    stop = threading.Event()
+    lateness = []
+
+    def audio():
+        # Sintesis suara kecil berulang (mirip TTS offline), prioritas rendah
+        t = np.arange(16000, dtype=np.float32)
+        while not stop.is_set():
+            np.sin(t * 0.05).astype(np.int16)
+            time.sleep(0.005)
+
+    def input_dispatch():
+        period = 1.0 / 120
+        next_tick = time.perf_counter()
+        while not stop.is_set():
+            next_tick += period
+            time.sleep(max(0.0, next_tick - time.perf_counter()))
+            lateness.append(time.perf_counter() - next_tick)
+
+    frames = {'n': 0}
+    deadline = time.perf_counter() + seconds
+
+    def capture():
+        if time.perf_counter() > deadline:
+            return None
+        frames['n'] += 1
+        return base.copy()
+
+    def inference(packet):
+        small = cv2.resize(packet.image, (w // 2, h // 2))
+        blurred = cv2.GaussianBlur(small, (15, 15), 0)
+        feats = blurred[:256, :256, 0].astype(np.float32)
+        for _ in range(4):
+            feats = np.tanh(feats @ weights * 0.01)
+        packet.data['score'] = float(feats.mean())
+        return packet
+
+    def render(packet):
+        cv2.putText(packet.image, f"{packet.data['score']:.3f}", (10, 30),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 255, 255), 2)
+        cv2.cvtColor(packet.image, cv2.COLOR_BGR2RGB)
+        return True
+
+    helpers = [scheduler.thread('audio', audio), scheduler.thread('input', input_dispatch)]
+    for t in helpers:
+        t.start()
+    runtime = PipelineRuntime(capture, [('inference', inference)], render, scheduler=scheduler)
+    runtime.run()
+    stop.set()
+    for t in helpers:
+        t.join(timeout=1.0)
+    wall = runtime.end_time - runtime.start_time
+    return {
+        'fps': runtime.stats[-1].processed / wall,
+        'p50': _percentile(runtime.latencies, 0.5) * 1000,
+        'p99': _percentile(runtime.latencies, 0.99) * 1000,
+        'input_p99': _percentile(lateness, 0.99) * 1000,
+    }
+
+
+def benchmark(core_counts=None, seconds=5.0, size=(1280, 720)):
+    """Throughput dan latensi ekor tanpa/dengan scheduler untuk beberapa jumlah core
+
+    Setiap kombinasi jalan di proses baru yang dibatasi ke N core pertama sebelum numpy/cv2
+    di-import, jadi ukuran pool thread bawaan mengikuti N seperti di mesin N core.
+    """
+    cpus = available_cpus()
+    core_counts = core_counts or sorted({c for c in (2, 4, 8, len(cpus)) if c <= len(cpus)})
+    print(f"{len(cpus)} CPU tersedia, {seconds:.0f} s per run, frame {size[0]}x{size[1]}")
+    print(f"{'core':>5} {'mode':<10} {'FPS':>7} {'p50 ms':>7} {'p99 ms':>7} {'input p99 ms':>13}")
+    for cores in core_counts:
+        for mode in ('default', 'scheduled'):
+            out = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', str(cores), mode,
+                                  '--seconds', str(seconds), '--size', str(size[0]), str(size[1])],
+                                 capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+            if out.returncode != 0:
+                print(f"{cores:>5} {mode:<10} gagal: {out.stderr.strip().splitlines()[-1:]}")
+                continue
+            r = json.loads(out.stdout.strip().splitlines()[-1])
+            print(f"{cores:>5} {mode:<10} {r['fps']:>7.1f} {r['p50']:>7.1f} {r['p99']:>7.1f} "
+                  f"{r['input_p99']:>13.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark pembagian thread/core per stage")
+    parser.add_argument('--cores', type=int, nargs='+', help="jumlah core yang diuji")
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--size', type=int, nargs=2, default=[1280, 720])
+    parser.add_argument('--print-default', action='store_true', help="cetak konfigurasi default mesin ini")
+    parser.add_argument('--child', nargs=2, metavar=('CORES', 'MODE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.print_default:
+        print(json.dumps(default_config(), indent=2))
+    elif args.child:
+        print(json.dumps(_workload(int(args.child[0]), args.child[1], args.seconds, tuple(args.size))))
+    else:
+        benchmark(args.cores, args.seconds, tuple(args.size))
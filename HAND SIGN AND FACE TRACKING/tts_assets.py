@@ -0,0 +1,251 @@
+import argparse
+import hashlib
+import json
+import math
+import os
+import shutil
+import struct
+import tempfile
+import threading
+import time
+import wave
+from array import array
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class GTTSBackend:
+    """Google TTS (butuh internet); voice = domain tld gTTS, mis. 'co.id'"""
+    name = 'gtts'
+    extension = 'mp3'
+
+    def __init__(self, slow=False):
+        from gtts import gTTS
+        self._gtts = gTTS
+        self.slow = slow
+
+    def synthesize(self, text, lang, voice, path):
+        self._gtts(text=text, lang=lang, tld=voice or 'com', slow=self.slow).save(path)
+
+
+class OfflineToneBackend:
+    """Pengganti lokal tanpa jaringan: WAV deterministik, satu nada per kata
+
+    Bukan suara manusia, tapi durasi dan ritmenya mengikuti teks sehingga alur aplikasi
+    (dan timing-nya) sama dengan backend sungguhan di mesin tanpa internet.
+    """
+    name = 'offline'
+    extension = 'wav'
+
+    def __init__(self, sample_rate=16000, seconds_per_char=0.06, gap=0.05, volume=0.3):
+        self.sample_rate = sample_rate
+        self.seconds_per_char = seconds_per_char
+        self.gap = gap
+        self.volume = volume
+
+    def synthesize(self, text, lang, voice, path):
+        samples = array('h')
+        amplitude = int(32767 * self.volume)
+        for word in text.split():
+            # Nada dari hash kata: kata yang sama selalu berbunyi sama
+            digest = hashlib.blake2b(f"{lang}:{voice}:{word.lower()}".encode('utf-8'), digest_size=2).digest()
+            freq = 220.0 + struct.unpack('<H', digest)[0] % 440
+            n = int(self.sample_rate * self.seconds_per_char * max(len(word), 2))
+            fade = max(n // 10, 1)
+            step = 2 * math.pi * freq / self.sample_rate
+            for i in range(n):
+                envelope = min(1.0, i / fade, (n - i) / fade)
+                samples.append(int(amplitude * envelope * math.sin(step * i)))
+            samples.extend([0] * int(self.sample_rate * self.gap))
+        with wave.open(path, 'wb') as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(self.sample_rate)
+            f.writeframes(samples.tobytes())
+
+
+BACKENDS = {'gtts': GTTSBackend, 'offline': OfflineToneBackend}
+
+
+def create_backend(name, **kwargs):
+    try:
+        return BACKENDS[name](**kwargs)
+    except KeyError:
+        raise ValueError(f"backend TTS tidak dikenal: {name} (pilihan: {', '.join(BACKENDS)})")
+
+
+class TTSAssetCache:
+    """Cache file suara berbasis hash isi (teks, bahasa, voice, backend)
+
+    File disimpan sebagai <hash>.<ext> di `directory` bersama manifest.json yang mencatat
+    teks, ukuran dan waktu pakai terakhir. Saat total ukuran melebihi `max_bytes`, file yang
+    paling lama tidak dipakai dihapus. Sintesis berjalan paralel di thread pool; permintaan
+    yang sama selagi masih diproses berbagi satu future.
+    """
+
+    MANIFEST = 'manifest.json'
+
+    def __init__(self, directory='audio_cache', backend=None, max_bytes=50 * 1024 * 1024,
+                 workers=4, lang='id', voice=None):
+        self.directory = directory
+        self.backend = backend if backend is not None else create_backend('gtts')
+        self.max_bytes = max_bytes
+        self.lang = lang
+        self.voice = voice
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='tts')
+        self.entries = self._load_manifest()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, text, lang=None, voice=None):
+        payload = json.dumps([self.backend.name, text, lang or self.lang, voice or self.voice],
+                             ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+    def _path(self, entry):
+        return os.path.join(self.directory, entry['file'])
+
+    def _load_manifest(self):
+        path = os.path.join(self.directory, self.MANIFEST)
+        try:
+            with open(path, encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # Buang entri yang filenya sudah hilang
+        return {k: e for k, e in entries.items() if os.path.exists(self._path(e))}
+
+    def _save_manifest(self):
+        # Tulis ke file sementara lalu rename agar manifest tidak pernah setengah jadi
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.json.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, os.path.join(self.directory, self.MANIFEST))
+
+    def lookup(self, text, lang=None, voice=None):
+        """Path file bila sudah ada di cache (dan tandai baru dipakai), selain itu None"""
+        key = self.key(text, lang, voice)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            entry['last_used'] = time.time()
+            self.hits += 1
+            return self._path(entry)
+
+    def get(self, text, lang=None, voice=None):
+        """Path file suara, disintesis dulu bila belum ada (blocking)"""
+        return self.submit(text, lang, voice).result()
+
+    def submit(self, text, lang=None, voice=None):
+        """Future berisi path file suara; langsung selesai bila sudah ada di cache"""
+        key = self.key(text, lang, voice)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                entry['last_used'] = time.time()
+                self.hits += 1
+                future = Future()
+                future.set_result(self._path(entry))
+                return future
+            future = self._pending.get(key)
+            if future is None:
+                self.misses += 1
+                future = self._executor.submit(self._generate, key, text, lang or self.lang,
+                                               voice or self.voice)
+                self._pending[key] = future
+        return future
+
+    def prefetch(self, texts, lang=None, voice=None):
+        """Sintesis paralel; hasil {teks: future}"""
+        return {text: self.submit(text, lang, voice) for text in texts}
+
+    def _generate(self, key, text, lang, voice):
+        try:
+            filename = f"{key}.{self.backend.extension}"
+            # Nama file sementara unik per permintaan, jadi sintesis paralel tidak bertabrakan
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.' + self.backend.extension)
+            os.close(fd)
+            try:
+                self.backend.synthesize(text, lang, voice, tmp)
+                os.replace(tmp, os.path.join(self.directory, filename))
+            except BaseException:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                raise
+            now = time.time()
+            with self._lock:
+                self.entries[key] = {'text': text, 'lang': lang, 'voice': voice,
+                                     'backend': self.backend.name, 'file': filename,
+                                     'size': os.path.getsize(os.path.join(self.directory, filename)),
+                                     'created': now, 'last_used': now}
+                self._evict(keep=key)
+                self._save_manifest()
+            return os.path.join(self.directory, filename)
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def total_bytes(self):
+        return sum(e['size'] for e in self.entries.values())
+
+    def _evict(self, keep=None):
+        """Hapus entri LRU sampai total <= max_bytes (dipanggil dengan lock dipegang)"""
+        total = self.total_bytes()
+        for key, entry in sorted(self.entries.items(), key=lambda item: item[1]['last_used']):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            try:
+                os.remove(self._path(entry))
+            except OSError:
+                pass
+            del self.entries[key]
+            total -= entry['size']
+
+    def flush(self):
+        """Simpan waktu pakai terakhir ke manifest"""
+        with self._lock:
+            self._save_manifest()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.flush()
+
+
+def benchmark(backend_name='offline', phrases=None, workers=(1, 4)):
+    """Startup dingin (cache kosong) sekuensial vs paralel, lalu startup hangat"""
+    phrases = phrases or ["Halo perkenalkan", "Nama saya", "Hafizh Karim Fauzi",
+                          "Saya berasal dari Teknik Komputer Institut Teknologi Sepuluh Nopember",
+                          "Salam kenal"]
+    for n in workers:
+        directory = tempfile.mkdtemp(prefix='tts_bench_')
+        try:
+            cache = TTSAssetCache(directory, create_backend(backend_name), workers=n)
+            t0 = time.perf_counter()
+            for future in cache.prefetch(phrases).values():
+                future.result()
+            cold = time.perf_counter() - t0
+            cache.close()
+
+            t0 = time.perf_counter()
+            cache = TTSAssetCache(directory, create_backend(backend_name), workers=n)
+            for future in cache.prefetch(phrases).values():
+                future.result()
+            warm = time.perf_counter() - t0
+            cache.close()
+            print(f"{backend_name:<8} workers={n}: dingin {cold * 1000:8.1f} ms, "
+                  f"hangat {warm * 1000:6.1f} ms, {cache.total_bytes() / 1024:.0f} KiB")
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ukur waktu siap aset TTS")
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='offline')
+    args = parser.parse_args()
+    benchmark(args.backend)